@@ -1,570 +1,725 @@
 ##############################################################
 # auto.py — 도로주행 자동 배정 (Quota+타입 2단계 + 1M 몰아주기 + 가중치 랜덤제외)
+#
+# Streamlit UI 껍데기. 배정 로직은 roadauto.engine 에 있다.
 ##############################################################
 
-import streamlit as st
-import json, os, re, random
+import os, json, random, time, tempfile, functools
 from datetime import date
+import streamlit as st
 import pandas as pd
 
-st.set_page_config(page_title="도로주행 자동 배정", layout="wide")
-
-DATA_DIR = "data"
-os.makedirs(DATA_DIR, exist_ok=True)
-HISTORY_FILE = os.path.join(DATA_DIR, "random_history.json")
-
-##############################################################
-# JSON LOAD / SAVE
-##############################################################
-def load_json(path, default):
-    if not os.path.exists(path):
-        return default
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return default
-
-def save_json(path, data):
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-##############################################################
-# 수동 가능자 세팅
-##############################################################
-MANUAL_SET = {
-    "권한솔", "김남균", "김성연",
-    "김주현", "이호석", "조정래"
-}
+from roadauto.engine import (
+    NEXT_EDU_PERIOD, TYPE_BIT, load_history, save_history,
+    assign_logic, commit_assignment, result_rows, SOLVERS, TYPE_ORDER, StaleHistoryError,
+)
+from roadauto.incremental import reassign
+from roadauto.llm_fallback import fallback_parse, get_backend, available_backends
+from roadauto.centers import load_centers, get_center
+from roadauto.planner import PERIODS, plan_day, commit_day, day_pairings, load_spread
+from roadauto.pairing import pair_staff, pairing_lines, PAIR_DAYS
+from roadauto.export import (
+    available_formats, to_bytes, export_rows, file_name, mime,
+    staff_rows, plan_rows, ledger_rows, render_message, render_day_message,
+)
+from roadauto.simulate import simulate_fairness
+from roadauto.scenario import make_scenarios, run_scenarios, worst as scenario_worst
+from roadauto.replay import verify_runs
+from roadauto.runlog import edited_record, record_ledger
+from roadauto.metrics import METRICS, stage
+
+_rerun_t0 = time.perf_counter()
 
-##############################################################
-# 텍스트 파싱 함수
-##############################################################
-def parse_staff(text):
-    staff = []
-    # 1종수동 : 00호 홍길동
-    m = re.findall(r"1종수동\s*:\s*[\d]+호\s*([가-힣]+)", text)
-    staff.extend([x.strip() for x in m])
-    # • 00호 홍길동
-    m2 = re.findall(r"•\s*[\d]+호\s*([가-힣]+)", text)
-    staff.extend([x.strip() for x in m2])
-    # 중복 제거
-    return list(dict.fromkeys(staff))
-
-def parse_extra(text):
-    edu = {}
-    # 1교시 : 홍길동
-    m = re.findall(r"(\d)교시\s*:\s*([가-힣]+)", text)
-    for gyo, nm in m:
-        edu[int(gyo)] = nm.strip()
-
-    # 코스점검 : A코스 홍길동 ...
-    course = []
-    m2 = re.findall(r"코스점검\s*:\s*(.*)", text)
-    if m2:
-        body = m2[0]
-        mm = re.findall(r"[A-Z]코스.*?:\s*([가-힣]+)", body)
-        course = [x.strip() for x in mm]
-
-    return edu, course
+st.set_page_config(page_title="도로주행 자동 배정", layout="wide")
 
 ##############################################################
-# Staff Class
+# 진단 메시지 표시
 ##############################################################
-class Staff:
-    def __init__(self, name):
-        self.name = name
-        self.is_manual = (name in MANUAL_SET)
-        # 배정 정보
-        self.assigned_counts = {"1M": 0, "1A": 0, "2A": 0, "2M": 0}
-        self.total_assigned = 0   # 이번 교시 내 총 배정수
-        self.weight_val = 0       # 코스/다음 교시 교양 가중치 (0 또는 1)
+def show_diags(diags):
+    for d in diags:
+        if d["level"] == "error":
+            st.error(d["msg"])
+        elif d["level"] == "warning":
+            st.warning(d["msg"])
+        elif d["level"] == "toast":
+            st.toast(d["msg"])
+        else:
+            st.info(d["msg"])
+
+def show_pairing(result):
+    for line in pairing_lines(result):
+        st.markdown(f"- **{line}**")
+    repeats = [p for p in result["pairs"] if p["cost"] > 0]
+    if repeats:
+        st.caption(
+            f"피하지 못한 짝 {len(repeats)}개 (최근 {PAIR_DAYS}일 안에 같이 했거나 수동/자동 섞임): "
+            + ", ".join(f"{p['a']}-{p['b'] or '단독'}" for p in repeats)
+        )
 
 ##############################################################
-# 히스토리 관리 (최근 3일, min_load 기록)
+# 내보내기 — 메신저 메시지 (복사 버튼) + 파일 다운로드
+# 결과가 교시 하나 / 하루치라 rerun 마다 bytes 를 만들어도 싸다.
 ##############################################################
-def load_history():
-    raw = load_json(HISTORY_FILE, [])
-    today = date.today()
-    valid = []
-    for h in raw:
-        try:
-            d = date.fromisoformat(h["date"])
-            if (today - d).days <= 3:
-                valid.append(h)
-        except:
-            pass
-    return valid
-
-def save_history(hist):
-    save_json(HISTORY_FILE, hist)
-
-def check_history_full(hist, current_staff_names):
-    hist_names = {h["name"] for h in hist}
-    current_set = set(current_staff_names)
-    return current_set.issubset(hist_names)
-
-def is_lucky_recently(hist, name):
-    for h in hist:
-        if h["name"] == name:
-            return True
-    return False
+def export_buttons(key, make_rows, stem, message):
+    with st.expander("📤 내보내기 (메시지 / 파일)"):
+        st.code(message, language=None)     # 오른쪽 위 복사 버튼으로 한 번에 복사
+        fmts = available_formats()
+        cols = st.columns(len(fmts) + 1)
+        cols[0].download_button(
+            "💬 TXT", message.encode("utf-8"), file_name=f"{stem}.txt", mime="text/plain",
+            key=f"dl_{key}_txt",
+        )
+        for col, fmt in zip(cols[1:], fmts):
+            col.download_button(
+                f"📥 {fmt.upper()}", to_bytes(make_rows(), fmt), file_name=file_name(stem, fmt),
+                mime=mime(fmt), key=f"dl_{key}_{fmt}",
+            )
 
 ##############################################################
-# 자격 / 변속기
+# 텍스트 분석 (텍스트가 같으면 캐시에서 바로)
 ##############################################################
-def eligible(staff_obj, typecode):
-    # 수동 가능자는 모든 종 가능, 그 외는 1A/2A만
-    if staff_obj.is_manual:
-        return True
-    return typecode in ("1A", "2A")
-
-def get_transmission_type(typecode):
-    if "M" in typecode:
-        return "Manual"
-    if "A" in typecode:
-        return "Auto"
-    return "Unknown"
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_parse(text, center_key):
+    r = get_center(center_key).parse(text)
+    return list(r.staff), dict(r.edu), list(r.course), list(r.unparsed), list(r.diags)
+
+@st.cache_resource(show_spinner=False)
+def llm_backend(name):
+    return get_backend(name)
+
+def parse_into(prefix, text, center):
+    staff, edu, course, unparsed, diags = cached_parse(text, center.key)
+    if llm_mode != "off" and unparsed:
+        # 인식 못 한 줄만 보조 인식 (줄 단위 디스크 캐시 → 같은 글은 호출 없음)
+        with st.spinner("인식하지 못한 줄을 보조 인식하는 중..."):
+            r = fallback_parse(center.parse(text), llm_backend(llm_mode), cache_dir=center.llm_cache)
+        staff, edu, course, unparsed, diags = list(r.staff), dict(r.edu), list(r.course), list(r.unparsed), list(r.diags)
+    st.session_state[f"{prefix}_staff"] = staff
+    st.session_state[f"{prefix}_edu"] = edu
+    st.session_state[f"{prefix}_course"] = course
+    st.success(f"근무자 {len(staff)}명 추출 완료")
+    show_diags(diags)
+    if unparsed:
+        with st.expander(f"인식하지 못한 줄 {len(unparsed)}개"):
+            st.text("\n".join(f"{no:>4}: {line}" for no, line in unparsed))
 
 ##############################################################
-# 1단계: quota 계산 (공평성 + cap)
+# 배정 실행 / 결과 / 확정 (오전·오후 탭 공용)
+#
+# 결과는 session_state[f"{prefix}_result"] 에 두고, 확정 전까지는
+# 히스토리를 쓰지 않는다. '실시간 수정'을 켜 두면 수요를 바꿀 때마다
+# 직전 결과에서 최소 이동으로 증분 재배정한다. 꺼져 있으면 수요가 바뀐 결과는
+# 보여 주지 않는다 (다시 실행). 수정을 거친 결과를 확정하면 그 수정까지 실행 기록에
+# 남겨서 (runlog.edited_record) 확정된 배정을 그대로 재현할 수 있다.
 ##############################################################
-CAP_MAP = {1: 2, 2: 3, 3: 3, 4: 3, 5: 2}
-
-def compute_quota(staff_objs, period, total_demand, hist):
-    """
-    이번 교시(period)에 각 감독관이 맡을 총 차량 수(quota)를 계산.
-    - 배정 수 차이 최대 1 보장 (가능한 경우)
-    - 교시별 cap(1:2,2:3,3:3,4:3,5:2) 적용
-    """
-    m = len(staff_objs)
-    if m == 0 or total_demand == 0:
-        return [0] * m, 0
+def run_section(prefix, label, names, period, demand, edu_map, course, center):
+    key = f"{prefix}_result"
+    inputs = (center.key, tuple(names), period, tuple(sorted(edu_map.items())), tuple(course))
 
-    cap = CAP_MAP.get(period, 3)
-    max_possible = m * cap
-    assignable = min(total_demand, max_possible)
-
-    base = assignable // m
-    rem = assignable % m
-
-    quotas = [base] * m  # 일단 모두 base
-
-    # 남은 rem명을 한 명씩 +1 (cap 이내)
-    for _ in range(rem):
-        candidates = [i for i in range(m) if quotas[i] < cap]
-        if not candidates:
-            break
-
-        min_q = min(quotas[i] for i in candidates)
-        tied = [i for i in candidates if quotas[i] == min_q]
+    if st.button(f"2. {label} 배정 실행", type="primary", key=f"btn_{prefix}_run"):
+        results, hist, diags = assign_logic(
+            names, period, demand, edu_map, course, solver=solver, commit=False, center=center,
+        )
+        st.session_state[key] = {
+            "inputs": inputs, "staff": results, "demand": dict(demand), "diags": diags,
+            "snapshot": hist,     # quota 가 본 히스토리 — 확정 때 그사이 바뀌었는지 비교
+            "reset": any(d["code"] == "history_reset" for d in diags),
+            "run_id": next((d["run_id"] for d in diags if d["code"] == "run_logged"), None),
+            "edits": [],          # 실시간 수정 [{"demand", "solver"}, ...] (확정 때 실행 기록으로)
+            "committed": False, "changes": 0,
+        }
+
+    res = st.session_state.get(key)
+    if not res:
+        return
+    if res["inputs"] != inputs:
+        st.info("근무자/교시/가중치가 바뀌었습니다. 배정을 다시 실행하세요.")
+        return
+
+    live = st.toggle(
+        "실시간 수정 (수요 변경 시 증분 재배정)", value=True, key=f"{prefix}_live",
+        disabled=res["committed"],
+    )
+    if not res["committed"] and res["demand"] != demand:
+        if not live:
+            st.info("수요가 바뀌었습니다. 배정을 다시 실행하세요 (또는 실시간 수정을 켜세요).")
+            return
+        if "ledger" not in res:
+            # quota 를 정할 때 본 원장 값 그대로 (실행 기록에 있음 — replay 와 같은 값)
+            base = center.store().runs(ids=[res["run_id"]]) if res["run_id"] else []
+            res["ledger"] = record_ledger(base[0]) if base else None
+        diags = []
+        res["changes"] = reassign(
+            res["staff"], period, demand, diags, solver=solver, cap_map=center.cap_map,
+            hist=() if res["reset"] else res["snapshot"], ledger=res["ledger"],
+        )
+        res["demand"] = dict(demand)
+        res["edits"].append({"demand": dict(demand), "solver": solver})
+        res["diags"] = [d for d in res["diags"] if d["code"] in ("history_reset", "run_logged")] + diags
 
-        # 최근 3일 '행운' 기록 없는 사람 우선
-        non_lucky = [i for i in tied if not is_lucky_recently(hist, staff_objs[i].name)]
-        pick_pool = non_lucky if non_lucky else tied
+    show_diags([d for d in res["diags"] if d["level"] != "toast"])
 
-        pick = random.choice(pick_pool)
-        quotas[pick] += 1
+    st.divider()
+    with stage("render"):
+        st.subheader(f"📋 {period}교시 배정 결과")
+        if res["changes"]:
+            st.caption(f"직전 결과에서 {res['changes']}건 변경")
+        st.dataframe(pd.DataFrame(result_rows(res["staff"])))
 
-    return quotas, assignable
+        st.subheader("🤝 페어링")
+        pairing = pair_staff(res["staff"], center.store().pair_counts(period=period))
+        show_pairing(pairing)
 
-##############################################################
-# 2단계: quota 안에서 타입(1M/1A/2A/2M) 배정
-##############################################################
-def assign_types_within_quota(staff_objs, period, quotas, demand):
-    """
-    이미 정해진 quota 안에서 종별/섞임/자격/가중치를 고려해 타입 배정.
-    - quota[i] 개수 이내에서만 배정 → 공평성 유지
-    - 1M는 가능한 한 한 사람(또는 소수)에게 몰아주는 방향
-    """
-    type_order = ["1M", "1A", "2A", "2M"]
-    remaining_quota = quotas[:]
-    total_before = sum(demand.values())
-
-    def general_type_score(staff, tcode):
-        """
-        1M 전용 로직 외의 타입(1A,2A,2M)에 대한 기본 점수.
-        """
-        current_types = [k for k, v in staff.assigned_counts.items() if v > 0]
-        mix_penalty = 0
-        new_tr = get_transmission_type(tcode)
-
-        if current_types:
-            existing_trs = {get_transmission_type(ct) for ct in current_types}
-            if tcode in current_types:
-                mix_penalty = 0
-            else:
-                if new_tr in existing_trs:
-                    mix_penalty = 1   # 같은 변속기 다른 종
-                else:
-                    mix_penalty = 10  # Manual vs Auto 혼합
-
-        # 남은 수요가 큰 타입 우선 (tail 줄이기)
-        demand_penalty = -demand[tcode]
-        # 가중치는 동점 시 일반인 먼저
-        weight_penalty = staff.weight_val
-        return (mix_penalty, demand_penalty, weight_penalty)
-
-    while True:
-        progress = False
-
-        for i, s in enumerate(staff_objs):
-            if remaining_quota[i] <= 0:
-                continue
-
-            # 이 감독관이 받을 수 있는 타입 후보
-            candidates = [
-                t for t in type_order
-                if demand.get(t, 0) > 0 and eligible(s, t)
-            ]
-            if not candidates:
-                continue
-
-            # 1M 수요가 남아있으면, 먼저 1M 몰아주기 로직 적용
-            if "1M" in candidates and demand.get("1M", 0) > 0:
-                manual_indices = [
-                    j for j, sj in enumerate(staff_objs)
-                    if remaining_quota[j] > 0 and sj.is_manual
-                ]
-                if manual_indices:
-                    # 아직 1M가 없는 사람 우선
-                    zero_1m = [
-                        j for j in manual_indices
-                        if staff_objs[j].assigned_counts.get("1M", 0) == 0
-                    ]
-                    target_group = zero_1m if zero_1m else manual_indices
-
-                    # 1M 적을수록, 2A 적을수록, 가중치 적을수록 우선
-                    def score_1m(j):
-                        sj = staff_objs[j]
-                        cnt_1m = sj.assigned_counts.get("1M", 0)
-                        cnt_2a = sj.assigned_counts.get("2A", 0)
-                        return (cnt_1m, cnt_2a, sj.weight_val)
-
-                    best_idx = min(target_group, key=score_1m)
-
-                    staff_objs[best_idx].assigned_counts["1M"] += 1
-                    staff_objs[best_idx].total_assigned += 1
-                    remaining_quota[best_idx] -= 1
-                    demand["1M"] -= 1
-                    progress = True
-                    continue  # 다음 사람으로
-
-            # 나머지 타입(1A/2A/2M)은 일반 점수 사용
-            best_t = min(candidates, key=lambda t: general_type_score(s, t))
-
-            s.assigned_counts[best_t] += 1
-            s.total_assigned += 1
-            remaining_quota[i] -= 1
-            demand[best_t] -= 1
-            progress = True
-
-        if not progress:
-            break
-        if sum(demand.values()) <= 0:
-            break
-
-    total_assigned = sum(s.total_assigned for s in staff_objs)
-    if total_assigned < total_before:
-        st.warning(
-            f"⚠️ 전체 수요 {total_before}명 중 {total_assigned}명만 배정되었습니다. "
-            "수동/자동 자격 및 종별 조합 제한으로 모든 수요를 채우지 못했습니다."
+        day = date.today().isoformat()
+        export_buttons(
+            prefix, lambda: staff_rows(res["staff"], period, day), f"배정-{day}-{period}교시",
+            render_message(res["staff"], period, day, pairing, center_tag),
         )
 
-    return staff_objs
+    if res["committed"]:
+        st.success("확정된 결과입니다 (히스토리 기록 완료).")
+    elif st.button("✅ 결과 확정 (히스토리 기록)", key=f"btn_{prefix}_commit"):
+        store = center.store()
+        try:
+            with store.transaction():
+                commit_assignment(
+                    res["staff"], store, reset=res["reset"], period=period, snapshot=res["snapshot"],
+                )
+                base = store.runs(ids=[res["run_id"]]) if res["edits"] and res["run_id"] else []
+                if base:
+                    # 확정한 건 수정된 결과 → 그 수정까지 기록 (원래 기록은 "base" 로 가리킴)
+                    store.log_run(edited_record(base[0], res["edits"], res["staff"], res["diags"]))
+        except StaleHistoryError as e:
+            st.error(str(e))
+            return
+        if res["reset"]:
+            st.toast("🔄 랜덤 히스토리가 한 바퀴 돌아 초기화되었습니다.")
+        res["committed"] = True
+        st.rerun(scope="fragment")
 
 ##############################################################
-# assign_logic 통합 (2단계 호출)
+# 탭별 fragment
+#
+# 탭 안의 위젯을 만지면 그 탭 fragment 만 다시 돈다 (st.fragment).
+# 전체 스크립트 rerun 은 사이드바 변경 / 첫 로드 때만.
+# 계산 결과는 session_state 에 두고 입력이 바뀔 때만 다시 계산한다.
 ##############################################################
-def assign_logic(staff_names, period, demand, edu_map, course_list):
-    # 0) Staff 객체 및 가중치 세팅
-    staff_objs = [Staff(nm) for nm in staff_names]
-
-    target_edu_period = None
-    if period == 1:
-        target_edu_period = 2
-    elif period == 3:
-        target_edu_period = 4
-    elif period == 4:
-        target_edu_period = 5
-
-    next_edu_name = edu_map.get(target_edu_period)
-
-    for s in staff_objs:
-        w = 0
-        if s.name in course_list:
-            w += 1
-        if next_edu_name and s.name == next_edu_name:
-            w += 1
-        if w > 1:
-            w = 1
-        s.weight_val = w
-
-    total_demand = sum(demand.values())
-    hist = load_history()
-    if check_history_full(hist, staff_names):
-        hist = []
-        st.toast("🔄 랜덤 히스토리가 한 바퀴 돌아 초기화되었습니다.")
-
-    # 1단계: quota 계산
-    quotas, assignable = compute_quota(staff_objs, period, total_demand, hist)
-    if assignable < total_demand:
-        st.error(
-            f"🚨 이 교시 최대 처리 가능 인원({assignable}명)을 초과하는 수요({total_demand}명)가 있습니다. "
-            "근무자 수 또는 교시별 최대 배정 인원을 확인하세요."
-        )
-
-    # 2단계: quota 안에서 타입 배정
-    demand_copy = dict(demand)
-    staff_objs = assign_types_within_quota(staff_objs, period, quotas, demand_copy)
-
-    # 히스토리 업데이트 (가중치 받은 사람은 제외)
-    if staff_objs:
-        min_assigned = min(s.total_assigned for s in staff_objs)
-        lucky_people = [
-            s.name for s in staff_objs
-            if s.total_assigned == min_assigned and s.weight_val == 0
-        ]
-        today_str = date.today().isoformat()
-        for name in lucky_people:
-            hist.append({"date": today_str, "name": name, "type": "min_load"})
-        save_history(hist)
-
-    return staff_objs, hist
-
-##############################################################
-# 페어링 문자열
-##############################################################
-def make_pairing_text(staff_objs):
-    ones = [s.name for s in staff_objs if s.total_assigned == 1]
-    zeros = [s.name for s in staff_objs if s.total_assigned == 0]
-    multi = [f"{s.name}({s.total_assigned}명)" for s in staff_objs if s.total_assigned > 1]
-
-    pairs = []
-    while len(ones) >= 2:
-        p1 = ones.pop(0)
-        p2 = ones.pop(0)
-        pairs.append(f"{p1} - {p2}")
-
-    if ones:
-        p1 = ones.pop(0)
-        if zeros:
-            z = zeros.pop(0)
-            pairs.append(f"{p1} - {z}(참관)")
-        else:
-            pairs.append(f"{p1} - (단독)")
-
-    for z in zeros:
-        pairs.append(f"{z}(참관)")
-
-    if multi:
-        return multi + pairs
-    return pairs
+def tab_fragment(name):
+    """st.fragment + 계측 (ui_<name> 단계로 fragment 한 번 도는 시간 기록)"""
+    def deco(fn):
+        @st.fragment
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(f"ui_{name}"):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
 
 ##############################################################
 # UI 구성
 ##############################################################
-tab1, tab2, tab3 = st.tabs(["🌅 오전 배정", "🌇 오후 배정", "🎲 데이터 관리"])
-
-if "m_staff" not in st.session_state:
-    st.session_state["m_staff"] = []
-if "a_staff" not in st.session_state:
-    st.session_state["a_staff"] = []
-if "m_edu" not in st.session_state:
-    st.session_state["m_edu"] = {}
-if "a_edu" not in st.session_state:
-    st.session_state["a_edu"] = {}
-if "m_course" not in st.session_state:
-    st.session_state["m_course"] = []
-if "a_course" not in st.session_state:
-    st.session_state["a_course"] = []
+centers = load_centers()
+if len(centers.keys()) > 1:
+    center_key = st.sidebar.selectbox(
+        "시험장", centers.keys(), index=centers.keys().index(centers.default),
+        format_func=centers.label, key="center",
+    )
+else:
+    center_key = centers.default
+center = centers.get(center_key)
+center_tag = center.label if len(centers.keys()) > 1 else None     # 메시지에 붙일 센터 이름
+for _e in centers.errors:
+    st.sidebar.warning(f"센터 설정 오류: {_e}")
+
+SOLVER_LABELS = {"greedy": "기본 (그리디)", "flow": "최적 (min-cost flow)"}
+solver = st.sidebar.radio(
+    "타입 배정 방식", SOLVERS, index=0,
+    format_func=lambda k: SOLVER_LABELS[k],
+    help="최적 모드는 자격/quota 안에서 가능한 최대 배정을 항상 찾습니다."
+)
+LLM_LABELS = {"off": "끄기 (정규식만)", "openai": "OpenAI"}
+llm_options = ["off"] + available_backends()
+llm_mode = st.sidebar.selectbox(
+    "인식 못 한 줄 보조 인식", llm_options, index=0, disabled=len(llm_options) == 1,
+    format_func=lambda k: LLM_LABELS.get(k, k),
+    help="정규식으로 읽지 못한 줄만 보냅니다. 결과는 줄마다 캐시되어 같은 글은 다시 호출하지 않습니다. "
+         "openai 패키지와 OPENAI_API_KEY 가 있어야 켤 수 있습니다."
+)
+
+for _prefix in ("m", "a", "d"):
+    st.session_state.setdefault(f"{_prefix}_staff", [])
+    st.session_state.setdefault(f"{_prefix}_edu", {})
+    st.session_state.setdefault(f"{_prefix}_course", [])
+if "d_seed" not in st.session_state:
+    # 같은 입력이면 rerun 사이에 같은 계획이 나오도록 (확정 버튼 포함)
+    st.session_state["d_seed"] = random.randrange(1 << 30)
 
 ##############################################################
-# 오전 탭
+# 오전 / 오후 탭 (같은 화면, 교시만 다름)
 ##############################################################
-with tab1:
-    st.header("오전 배정 (1, 2교시)")
+@tab_fragment("half")
+def half_tab(prefix, label, periods, solver, center):
+    periods = [p for p in periods if p in center.periods]
+    if not periods:
+        st.info(f"{center.label}: {label} 교시가 없습니다.")
+        return
+    st.header(f"{label} 배정 ({', '.join(map(str, periods))}교시)")
     col_txt, col_opt = st.columns([3, 1])
     with col_txt:
-        txt_m = st.text_area("오전 근무자/코스 텍스트 붙여넣기", height=150)
+        txt = st.text_area(f"{label} 근무자/코스 텍스트 붙여넣기", height=150, key=f"txt_{prefix}")
     with col_opt:
-        period_m = st.radio("오전 교시", [1, 2], index=0, horizontal=True)
+        period = st.radio(f"{label} 교시", periods, index=0, horizontal=True, key=f"{prefix}_period")
 
-    if st.button("1. 텍스트 분석", key="btn_m_parse"):
-        st.session_state["m_staff"] = parse_staff(txt_m)
-        e, c = parse_extra(txt_m)
-        st.session_state["m_edu"] = e
-        st.session_state["m_course"] = c
-        st.success(f"근무자 {len(st.session_state['m_staff'])}명 추출 완료")
+    if st.button("1. 텍스트 분석", key=f"btn_{prefix}_parse"):
+        parse_into(prefix, txt, center)
 
     st.subheader("근무자 및 담당 확인")
-    m_df = pd.DataFrame({"이름": st.session_state["m_staff"]})
-    edited_m = st.data_editor(m_df, num_rows="dynamic", key="editor_m")
-    final_m_staff = edited_m["이름"].dropna().unique().tolist()
+    edited = st.data_editor(
+        pd.DataFrame({"이름": st.session_state[f"{prefix}_staff"]}),
+        num_rows="dynamic", key=f"editor_{prefix}"
+    )
+    names = edited["이름"].dropna().unique().tolist()
 
     col_c, col_e = st.columns(2)
     with col_c:
-        m_course_real = st.multiselect(
+        course = st.multiselect(
             "코스 담당자",
-            final_m_staff,
-            default=[x for x in st.session_state["m_course"] if x in final_m_staff]
+            names,
+            default=[x for x in st.session_state[f"{prefix}_course"] if x in names],
+            key=f"{prefix}_crs"
         )
     with col_e:
-        target_edu_p = 2 if period_m == 1 else 0
+        target_edu_p = NEXT_EDU_PERIOD.get(period, 0)
         def_idx = 0
-        edu_cand = st.session_state["m_edu"].get(target_edu_p)
-        if edu_cand in final_m_staff:
-            def_idx = final_m_staff.index(edu_cand) + 1
+        edu_cand = st.session_state[f"{prefix}_edu"].get(target_edu_p)
+        if edu_cand in names:
+            def_idx = names.index(edu_cand) + 1
 
-        m_edu_real = st.selectbox(
+        edu_real = st.selectbox(
             f"{target_edu_p}교시 교양 담당자 (가중치 대상)",
-            ["없음"] + final_m_staff,
+            ["없음"] + names,
             index=def_idx,
             disabled=(target_edu_p == 0),
-            key=f"m_edu_sel_{period_m}"
+            key=f"{prefix}_edu_sel_{period}"
         )
 
     st.subheader("수요 입력")
     c1, c2, c3, c4 = st.columns(4)
-    d_m = {
-        "1M": c1.number_input("1종수동", 0, 20, 0, key="m1m"),
-        "1A": c2.number_input("1종자동", 0, 40, 0, key="m1a"),
-        "2A": c3.number_input("2종자동", 0, 40, 0, key="m2a"),
-        "2M": c4.number_input("2종수동", 0, 20, 0, key="m2m")
+    demand = {
+        "1M": c1.number_input("1종수동", 0, 20, 0, key=f"{prefix}1m"),
+        "1A": c2.number_input("1종자동", 0, 40, 0, key=f"{prefix}1a"),
+        "2A": c3.number_input("2종자동", 0, 40, 0, key=f"{prefix}2a"),
+        "2M": c4.number_input("2종수동", 0, 20, 0, key=f"{prefix}2m")
     }
 
-    if st.button("2. 오전 배정 실행", type="primary"):
-        edu_map_input = {}
-        if target_edu_p > 0 and m_edu_real != "없음":
-            edu_map_input[target_edu_p] = m_edu_real
-
-        results, _ = assign_logic(final_m_staff, period_m, d_m, edu_map_input, m_course_real)
-
-        st.divider()
-        st.subheader(f"📋 {period_m}교시 배정 결과")
-        res_data = []
-        for s in results:
-            details = []
-            for k, v in s.assigned_counts.items():
-                if v > 0:
-                    details.append(f"{k}:{v}")
-            res_data.append({
-                "이름": s.name,
-                "총 배정": s.total_assigned,
-                "상세": ", ".join(details) if details else "-",
-                "비고": "가중치 적용" if s.weight_val > 0 else ""
-            })
-        st.dataframe(pd.DataFrame(res_data))
+    edu_map_input = {}
+    if target_edu_p > 0 and edu_real != "없음":
+        edu_map_input[target_edu_p] = edu_real
 
-        st.subheader("🤝 페어링")
-        pairs = make_pairing_text(results)
-        for p in pairs:
-            st.markdown(f"- **{p}**")
+    run_section(prefix, label, names, period, demand, edu_map_input, course, center)
 
 ##############################################################
-# 오후 탭
+# 하루 계획 탭 (1~5교시 한 번에)
 ##############################################################
-with tab2:
-    st.header("오후 배정 (3, 4, 5교시)")
-    col_txt2, col_opt2 = st.columns([3, 1])
-    with col_txt2:
-        txt_a = st.text_area("오후 근무자/코스 텍스트 붙여넣기", height=150)
-    with col_opt2:
-        period_a = st.radio("오후 교시", [3, 4, 5], index=0, horizontal=True)
-
-    if st.button("1. 텍스트 분석", key="btn_a_parse"):
-        st.session_state["a_staff"] = parse_staff(txt_a)
-        e, c = parse_extra(txt_a)
-        st.session_state["a_edu"] = e
-        st.session_state["a_course"] = c
-        st.success(f"근무자 {len(st.session_state['a_staff'])}명 추출 완료")
+@tab_fragment("day")
+def day_tab(solver, center):
+    periods = center.periods
+    st.header(f"하루 계획 ({periods[0]}~{periods[-1]}교시 동시 배정)" if periods else "하루 계획")
+    st.caption("수요를 바꾸면 바로 하루 전체를 다시 계산합니다. 히스토리는 '확정' 때만 기록됩니다.")
+
+    txt_d = st.text_area("하루 근무자/코스 텍스트 붙여넣기", height=150, key="txt_day")
+    if st.button("1. 텍스트 분석", key="btn_d_parse"):
+        parse_into("d", txt_d, center)
 
     st.subheader("근무자 및 담당 확인")
-    a_df = pd.DataFrame({"이름": st.session_state["a_staff"]})
-    edited_a = st.data_editor(a_df, num_rows="dynamic", key="editor_a")
-    final_a_staff = edited_a["이름"].dropna().unique().tolist()
+    d_df = pd.DataFrame({"이름": st.session_state["d_staff"]})
+    edited_d = st.data_editor(d_df, num_rows="dynamic", key="editor_d")
+    final_d_staff = edited_d["이름"].dropna().unique().tolist()
+
+    d_course_real = st.multiselect(
+        "코스 담당자",
+        final_d_staff,
+        default=[x for x in st.session_state["d_course"] if x in final_d_staff],
+        key="d_crs"
+    )
+    if not periods:
+        return
+    edu_cols = st.columns(len(periods))
+    d_edu_real = {}
+    for col, p in zip(edu_cols, periods):
+        cand = st.session_state["d_edu"].get(p)
+        idx = final_d_staff.index(cand) + 1 if cand in final_d_staff else 0
+        pick = col.selectbox(f"{p}교시 교양", ["없음"] + final_d_staff, index=idx, key=f"d_edu_{p}")
+        if pick != "없음":
+            d_edu_real[p] = pick
+
+    st.subheader("교시별 수요")
+    demand_df = pd.DataFrame(0, index=[f"{p}교시" for p in periods], columns=TYPE_ORDER)
+    edited_dem = st.data_editor(demand_df, key=f"editor_day_demand_{center.key}")
+    day_demands = {
+        p: {t: int(edited_dem.loc[f"{p}교시", t] or 0) for t in TYPE_ORDER}
+        for p in periods
+    }
 
-    col_c2, col_e2 = st.columns(2)
-    with col_c2:
-        a_course_real = st.multiselect(
-            "코스 담당자",
-            final_a_staff,
-            default=[x for x in st.session_state["a_course"] if x in final_a_staff],
-            key="a_crs"
+    if not final_d_staff or not any(sum(d.values()) for d in day_demands.values()):
+        return
+
+    store = center.store()
+    input_key = (
+        center.key, tuple(final_d_staff),
+        tuple((p, tuple(d.items())) for p, d in day_demands.items()),
+        tuple(sorted(d_edu_real.items())), tuple(d_course_real), solver,
+    )
+    # 확정한 계획은 입력이 그대로인 동안 그대로 보여 준다
+    # (확정하면 행운 이름 / 원장 / 시드가 바뀌어서 다시 계산하면 다른 계획이 나온다)
+    done = st.session_state.get("d_committed")
+    committed = bool(done and done[0] == input_key)
+    if committed:
+        plan, pairings, lucky = done[1], done[2], None
+    else:
+        lucky = store.lucky_names()
+        ledger = store.ledger_totals(final_d_staff)
+        # 입력이 같으면 session_state 의 계획을 그대로 쓴다
+        plan_key = (
+            input_key, st.session_state["d_seed"], frozenset(lucky),
+            frozenset((nm, a["periods"], a["total"], a["1M"]) for nm, a in ledger.items()),
         )
-    with col_e2:
-        target_edu_p_a = 0
-        if period_a == 3:
-            target_edu_p_a = 4
-        elif period_a == 4:
-            target_edu_p_a = 5
-
-        def_idx_a = 0
-        edu_cand_a = st.session_state["a_edu"].get(target_edu_p_a)
-        if edu_cand_a in final_a_staff:
-            def_idx_a = final_a_staff.index(edu_cand_a) + 1
-
-        a_edu_real = st.selectbox(
-            f"{target_edu_p_a}교시 교양 담당자 (가중치 대상)",
-            ["없음"] + final_a_staff,
-            index=def_idx_a,
-            disabled=(target_edu_p_a == 0),
-            key=f"a_edu_sel_{period_a}"
+        cached = st.session_state.get("d_plan")
+        if cached and cached[0] == plan_key:
+            plan = cached[1]
+        else:
+            plan = plan_day(
+                final_d_staff, day_demands, d_edu_real, d_course_real,
+                hist=lucky, solver=solver,
+                rng=random.Random(st.session_state["d_seed"]), ledger=ledger,
+                quals=center.quals(), cap_map=center.cap_map,
+            )
+            st.session_state["d_plan"] = (plan_key, plan)
+        pairings = day_pairings(plan, store)
+    show_diags(plan["diags"])
+
+    lo, hi = load_spread(plan)
+    st.metric("하루 누적 배정 (최소 ~ 최대)", f"{lo} ~ {hi}")
+    with stage("render"):
+        st.dataframe(pd.DataFrame([
+            {"이름": nm, "하루 배정": plan["load"][nm], "가중치 횟수": plan["weight"][nm]}
+            for nm in final_d_staff
+        ]))
+        for p, results_p in plan["periods"].items():
+            with st.expander(f"📋 {p}교시 배정 결과"):
+                st.dataframe(pd.DataFrame(result_rows(results_p)))
+                show_pairing(pairings[p])
+        day = date.today().isoformat()
+        export_buttons(
+            "d", lambda: plan_rows(plan, day), f"하루계획-{day}",
+            render_day_message(plan, pairings, day, center_tag),
         )
 
-    st.subheader("수요 입력")
-    c1a, c2a, c3a, c4a = st.columns(4)
-    d_a = {
-        "1M": c1a.number_input("1종수동", 0, 20, 0, key="a1m"),
-        "1A": c2a.number_input("1종자동", 0, 40, 0, key="a1a"),
-        "2A": c3a.number_input("2종자동", 0, 40, 0, key="a2a"),
-        "2M": c4a.number_input("2종수동", 0, 20, 0, key="a2m")
-    }
-
-    if st.button("2. 오후 배정 실행", type="primary"):
-        edu_map_input_a = {}
-        if target_edu_p_a > 0 and a_edu_real != "없음":
-            edu_map_input_a[target_edu_p_a] = a_edu_real
-
-        results_a, _ = assign_logic(final_a_staff, period_a, d_a, edu_map_input_a, a_course_real)
-
-        st.divider()
-        st.subheader(f"📋 {period_a}교시 배정 결과")
-        res_data_a = []
-        for s in results_a:
-            details = []
-            for k, v in s.assigned_counts.items():
-                if v > 0:
-                    details.append(f"{k}:{v}")
-            res_data_a.append({
-                "이름": s.name,
-                "총 배정": s.total_assigned,
-                "상세": ", ".join(details) if details else "-",
-                "비고": "가중치 적용" if s.weight_val > 0 else ""
-            })
-        st.dataframe(pd.DataFrame(res_data_a))
-
-        st.subheader("🤝 페어링")
-        pairs_a = make_pairing_text(results_a)
-        for p in pairs_a:
-            st.markdown(f"- **{p}**")
+    if committed:
+        st.success(f"확정된 계획입니다 (히스토리 {done[3]}건 기록). 입력을 바꾸면 새 계획을 만듭니다.")
+    elif st.button("✅ 하루 계획 확정 (히스토리 기록)", type="primary"):
+        try:
+            entries = commit_day(plan, store, lucky=lucky)
+        except StaleHistoryError as e:
+            st.error(str(e))
+            return
+        st.session_state["d_committed"] = (input_key, plan, pairings, len(entries))
+        st.session_state["d_seed"] = random.randrange(1 << 30)
+        st.rerun(scope="fragment")
 
 ##############################################################
-# 관리/랜덤 탭
+# 관리 탭 — 구역마다 따로 fragment, 무거운 조회는 켤 때만
 ##############################################################
-with tab3:
+@tab_fragment("history")
+def history_section(center):
     st.header("랜덤 히스토리 / 관리")
+    st.caption(f"시험장: {center.label} ({center.data_dir})")
 
     col_reset, col_view = st.columns(2)
     with col_reset:
         if st.button("🗑️ 랜덤 히스토리 초기화", type="secondary"):
-            save_history([])
+            save_history([], center.store())
             st.warning("모든 랜덤 기록이 초기화되었습니다.")
-            st.rerun()
+    with col_view:
+        show = st.toggle("히스토리 불러오기", value=False, key="hist_open")
 
+    if not show:
+        return
     st.subheader("현재 랜덤 히스토리 (최근 3일)")
-    hist_data = load_history()
-    if hist_data:
-        st.dataframe(pd.DataFrame(hist_data))
+    hist_data = load_history(store=center.store())
+    with stage("render"):
+        if hist_data:
+            st.dataframe(pd.DataFrame(hist_data))
+        else:
+            st.info("기록이 없습니다.")
+
+@tab_fragment("quals")
+def quals_section(center):
+    st.divider()
+    st.subheader("🪪 종별 자격")
+    quals = center.quals()
+    st.caption(
+        f"설정 파일: {center.quals_file}" + ("" if quals.source else " (없음 — 기본 수동 가능자 명단 사용)")
+        + ". 파일이 바뀌면 다음 배정부터 바로 반영됩니다."
+    )
+    for e in quals.errors:
+        st.warning(f"자격 설정 오류: {e}")
+    if not st.toggle("자격 보기 / 편집", value=False, key="quals_open"):
+        return
+    roster = st.session_state["d_staff"] or st.session_state["m_staff"] or st.session_state["a_staff"]
+    names = list(dict.fromkeys(list(roster) + sorted(quals.people)))
+    with stage("render"):
+        st.dataframe(pd.DataFrame(
+            [["✔" if mask & TYPE_BIT[t] else "" for t in TYPE_ORDER] for mask in quals.masks(names)],
+            index=names, columns=TYPE_ORDER,
+        ))
+    raw = st.text_area(
+        "설정 JSON", json.dumps(quals.to_json(), ensure_ascii=False, indent=1),
+        height=240, key="quals_json",
+    )
+    if st.button("💾 자격 저장", key="btn_quals_save"):
+        try:
+            saved = center.save_quals(json.loads(raw))
+        except ValueError as e:
+            st.error(f"JSON 형식 오류: {e}")
+        else:
+            if saved.errors:
+                for e in saved.errors:
+                    st.error(e)
+            else:
+                st.success("저장했습니다.")
+                st.rerun(scope="fragment")
+
+@tab_fragment("ledger")
+def ledger_section(center):
+    st.divider()
+    st.subheader("📒 장기 배정 원장")
+    st.caption("확정된 배정이 교시마다 쌓입니다. quota +1 과 1M 순서의 동점 처리에 교시당 평균이 쓰입니다.")
+    if not st.toggle("누적 불러오기", value=False, key="ledger_open"):
+        return
+    totals = center.store().ledger_totals()
+    if not totals:
+        st.info("확정된 기록이 없습니다.")
+        return
+    with stage("render"):
+        st.dataframe(pd.DataFrame([
+            {"이름": nm, "교시 수": a["periods"], "총 배정": a["total"],
+             "교시당": round(a["total"] / a["periods"], 2) if a["periods"] else 0,
+             **{t: a[t] for t in TYPE_ORDER},
+             **{f"{p}교시": a[p] for p in PERIODS},
+             "가중치 횟수": a["weighted"], "마지막": a["last_day"]}
+            for nm, a in sorted(totals.items())
+        ]), hide_index=True)
+
+@tab_fragment("export")
+def export_section(center):
+    st.divider()
+    st.subheader("📤 확정 결과 일괄 내보내기")
+    st.caption("확정된 원장을 하루 / 한 달 단위로 파일로 만듭니다. 원장을 조금씩 읽어 바로 파일에 씁니다.")
+    c_span, c_day, c_fmt = st.columns(3)
+    span = c_span.radio("범위", ["하루", "한 달"], horizontal=True, key="exp_span")
+    when = c_day.date_input("날짜 (한 달이면 그 날짜가 있는 달)", key="exp_day")
+    fmt = c_fmt.selectbox("형식", available_formats(), key="exp_fmt")
+    if not st.button("파일 만들기", key="btn_export"):
+        return
+    if span == "하루":
+        stem, kw = f"원장-{when.isoformat()}", {"day": when.isoformat()}
     else:
-        st.info("기록이 없습니다.")
+        stem, kw = f"원장-{when:%Y-%m}", {"month": f"{when:%Y-%m}"}
+    # 임시 파일은 bytes 로 읽어 버튼에 넘기고 with 를 나가면서 바로 닫는다
+    with tempfile.TemporaryFile() as f:
+        with st.spinner("파일 만드는 중..."):
+            n = export_rows(ledger_rows(center.store(), **kw), fmt, f)
+        if not n:
+            st.info("그 기간에 확정된 기록이 없습니다.")
+            return
+        f.seek(0)
+        st.download_button(
+            f"📥 {file_name(stem, fmt)} ({n}행)", f.read(), file_name=file_name(stem, fmt), mime=mime(fmt),
+            key="dl_export",
+        )
+
+@tab_fragment("replay")
+def replay_section(center):
+    st.divider()
+    st.subheader("🔁 배정 재현 / 검증")
+    st.caption("배정 실행마다 입력·시드·결과가 기록됩니다. 같은 시드로 다시 돌려 결과가 똑같은지 확인합니다.")
+    if not st.toggle("실행 기록 불러오기", value=False, key="replay_open"):
+        return
+    run_store = center.store()
+    run_days = run_store.run_days()
+    if not run_days:
+        st.info("실행 기록이 없습니다.")
+        return
+    rday = st.selectbox(
+        "날짜", [d for d, _ in run_days],
+        format_func=lambda d: f"{d} ({dict(run_days)[d]}건)", key="replay_day"
+    )
+    day_runs = run_store.runs(day=rday)
+    st.dataframe(pd.DataFrame([
+        {"기록": f"#{r['id']}", "교시": r["period"], "시드": str(r["seed"]), "방식": r["solver"],
+         "근무자": len(r["staff"]), "수요": sum(r["demand"].values()), "수정": len(r.get("edits", ())),
+         "digest": r["digest"]}
+        for r in day_runs
+    ]))
+    if st.button("🔍 이 날짜 전부 재현해서 검증", key="btn_replay"):
+        checked = verify_runs(day_runs)
+        bad = [c for c in checked if not c["ok"]]
+        if bad:
+            st.error(f"{len(checked)}건 중 {len(bad)}건이 기록과 다릅니다.")
+            for c in bad:
+                st.text(f"#{c['id']}: " + "; ".join(f"{n} 기록 {a} / 재현 {b}" for n, a, b in c["diff"]))
+        else:
+            st.success(f"{len(checked)}건 모두 기록과 똑같이 재현되었습니다.")
+
+@tab_fragment("simulate")
+def simulate_section(solver, center):
+    st.divider()
+    st.subheader("📈 공평성 시뮬레이션")
+    st.caption(f"지금 규칙(quota 추첨 + 3일 행운 창 + 장기 원장 + 실제 배정과 같은 타입 배정, solver: {solver})을 "
+               "수백 일 돌려 사람별 부담 분포를 봅니다. 히스토리는 건드리지 않습니다.")
+
+    sim_default = st.session_state["d_staff"] or st.session_state["m_staff"] or st.session_state["a_staff"]
+    sim_names_txt = st.text_area("근무자 (한 줄에 한 명)", "\n".join(sim_default), height=120, key="sim_names")
+    sim_names = list(dict.fromkeys(x.strip() for x in sim_names_txt.splitlines() if x.strip()))
+
+    c1, c2, c3 = st.columns(3)
+    sim_days = c1.number_input("일수", 1, 3650, 365, key="sim_days")
+    sim_runs = c2.number_input("반복 (평행 세계 수)", 1, 1000, 20, key="sim_runs")
+    sim_seed = c3.number_input("시드", 0, 1 << 30, 0, key="sim_seed")
+
+    sim_periods = center.periods
+    sim_dem_df = pd.DataFrame(
+        [[2, 4, 4, 2]] * len(sim_periods), index=[f"{p}교시" for p in sim_periods], columns=TYPE_ORDER
+    )
+    sim_dem = st.data_editor(sim_dem_df, key=f"editor_sim_demand_{center.key}")
+
+    if st.button("▶️ 시뮬레이션 실행", key="btn_sim") and sim_names:
+        means = {
+            p: {t: float(sim_dem.loc[f"{p}교시", t] or 0) for t in TYPE_ORDER}
+            for p in sim_periods
+        }
+        with st.spinner("시뮬레이션 중..."):
+            st.session_state["sim_result"] = simulate_fairness(
+                sim_names, means, days=int(sim_days), sims=int(sim_runs), seed=int(sim_seed),
+                quals=center.quals(), cap_map=center.cap_map, solver=solver,
+            )
+
+    r = st.session_state.get("sim_result")
+    if not r:
+        return
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("누적 배정 최대-최소 (평균)", f"{r['spread_mean']:.1f}", help=f"최악 {r['spread_max']}")
+    m2.metric("사람 간 분산", f"{r['load_var']:.1f}")
+    m3.metric("수동/자동 섞임 비율", f"{r['mix_rate'] * 100:.1f}%")
+    m4.metric("1M 최다 보유자 몫", f"{r['concentration_1m'] * 100:.0f}%")
+    st.caption(
+        f"{r['days']}일 × {r['sims']}회 · 수동 가능자끼리 최대-최소 {r['manual_spread_mean']:.1f} · "
+        f"하루 미배정 {r['unfilled_per_day']:.2f}명 · 히스토리 초기화 주 {r['resets_per_week']:.2f}회"
+    )
+
+    sim_df = pd.DataFrame(r["mean_by_type"] / r["days"], index=r["names"], columns=TYPE_ORDER)
+    st.bar_chart(sim_df)
+    sim_df["하루 평균"] = sim_df.sum(axis=1)
+    st.dataframe(sim_df.round(2))
+
+@tab_fragment("scenario")
+def scenario_section(solver, center):
+    st.divider()
+    st.subheader("🧮 수요 시나리오 비교")
+    st.caption(
+        "예상 수요를 범위/분포로 넣으면 모든 조합을 배정해 보고 미배정·cap 초과·사람별 부담을 비교합니다. "
+        "히스토리는 읽지도 쓰지도 않습니다. 예: 3 (고정), 0-4 (범위), 2-8:2 (간격), 1,3,5 (목록), ~5 (포아송 평균 5)"
+    )
+    sc_default = st.session_state["d_staff"] or st.session_state["m_staff"] or st.session_state["a_staff"]
+    sc_names_txt = st.text_area("근무자 (한 줄에 한 명)", "\n".join(sc_default), height=120, key="sc_names")
+    sc_names = list(dict.fromkeys(x.strip() for x in sc_names_txt.splitlines() if x.strip()))
+
+    c_p, c_n = st.columns(2)
+    sc_period = c_p.selectbox("교시", center.periods, index=min(2, len(center.periods) - 1), key="sc_period")
+    sc_samples = c_n.number_input("분포일 때 시나리오 수", 100, 20000, 2000, step=100, key="sc_samples")
+    cols = st.columns(len(TYPE_ORDER))
+    specs = {
+        t: c.text_input(t, {"1M": "0-3", "1A": "2-8", "2A": "2-8", "2M": "0-3"}[t], key=f"sc_spec_{t}")
+        for t, c in zip(TYPE_ORDER, cols)
+    }
+
+    if st.button("▶️ 시나리오 실행", key="btn_scenario") and sc_names:
+        try:
+            scenarios = make_scenarios(specs, int(sc_samples))
+        except ValueError as e:
+            st.error(f"수요 지정 형식 오류: {e}")
+            return
+        if len(scenarios) > 50000:
+            st.error(f"조합이 {len(scenarios)}개로 너무 많습니다. 범위를 줄이거나 분포(~)로 바꾸세요.")
+            return
+        with st.spinner(f"{len(scenarios)}개 시나리오 계산 중..."):
+            st.session_state["sc_result"] = run_scenarios(
+                sc_names, sc_period, scenarios, solver=solver, jobs=os.cpu_count() or 1,
+                quals=center.quals(), cap_map=center.cap_map,
+            )
+
+    r = st.session_state.get("sc_result")
+    if not r:
+        return
+    s = r["summary"]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("시나리오", f"{s['시나리오']}개", help=f"{r['ms']:.0f} ms")
+    m2.metric("미배정 발생", f"{s['미배정 발생'] / max(s['시나리오'], 1) * 100:.0f}%", help=f"최대 {s['최대 미배정']}명")
+    m3.metric("cap 초과 발생", f"{s['cap 초과 발생'] / max(s['시나리오'], 1) * 100:.0f}%",
+              help=f"{r['period']}교시 최대 {r['capacity']}명 (1인 {r['cap']}명)")
+    m4.metric("최대 필요 인원", f"{s['최대 필요 인원']}명", delta=s["최대 필요 인원"] - len(r["names"]), delta_color="inverse")
+    with stage("render"):
+        st.dataframe(pd.DataFrame(r["people"]), hide_index=True)
+        st.caption("미배정 → cap 초과 → 부담 차이가 큰 시나리오")
+        st.dataframe(pd.DataFrame([
+            {**row["수요"], **{k: v for k, v in row.items() if k != "수요"}}
+            for row in scenario_worst(r, 30)
+        ]), hide_index=True)
+
+@tab_fragment("metrics")
+def metrics_section():
+    st.divider()
+    st.subheader("⏱️ 성능 계측")
+    st.caption(
+        f"최근 {METRICS.window}개 값 기준 백분위. 시간은 ms, 카운터는 실행 1회당 값입니다. "
+        "rerun = 화면 전체 다시 그리기, ui_* = 탭 하나만 다시 그리기, assign_total = 배정 실행 전체."
+    )
+    perf = METRICS.summary()
+    if perf:
+        st.dataframe(pd.DataFrame(perf), hide_index=True)
+    else:
+        st.info("아직 계측된 값이 없습니다.")
+    c_dl, c_rs = st.columns(2)
+    c_dl.download_button(
+        "📥 계측 JSON 내보내기",
+        json.dumps(METRICS.export(), ensure_ascii=False, indent=1),
+        file_name=f"metrics-{time.strftime('%Y%m%d-%H%M%S')}.json",
+        mime="application/json",
+    )
+    if c_rs.button("계측 초기화", key="btn_metrics_reset"):
+        METRICS.reset()
+        st.rerun(scope="fragment")
+
+##############################################################
+# 배치
+##############################################################
+tab1, tab2, tab_day, tab3 = st.tabs(["🌅 오전 배정", "🌇 오후 배정", "📅 하루 계획", "🎲 데이터 관리"])
+with tab1:
+    half_tab("m", "오전", [1, 2], solver, center)
+with tab2:
+    half_tab("a", "오후", [3, 4, 5], solver, center)
+with tab_day:
+    day_tab(solver, center)
+with tab3:
+    history_section(center)
+    quals_section(center)
+    ledger_section(center)
+    export_section(center)
+    replay_section(center)
+    simulate_section(solver, center)
+    scenario_section(solver, center)
+    metrics_section()
+
+# 화면 전체를 한 번 그리는 데 걸린 시간 (fragment 만 다시 돈 경우는 ui_* 로 따로 잡힌다)
+METRICS.add_time("rerun", (time.perf_counter() - _rerun_t0) * 1000)
@@ -0,0 +1,126 @@
+##############################################################
+# bench/history_stress.py — 히스토리 저장소 동시성 스트레스 벤치
+#
+#   python bench/history_stress.py --procs 16 --rounds 200
+#
+# 1) append  : 여러 프로세스가 고유 기록을 동시에 INSERT → 하나도 빠지지 않았는지
+# 2) assign  : 여러 프로세스가 assign_logic 을 동시에 실행 → 예외/락 타임아웃 없는지
+# 3) crash   : 쓰는 도중 SIGKILL → 커밋 확인된 기록은 모두 남고 DB 무결성 유지
+##############################################################
+
+import os, sys, time, json, random, signal, argparse, tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from roadauto.history import HistoryStore
+from roadauto.engine import assign_logic
+
+NAMES = [f"감독{i:03d}" for i in range(40)]
+
+##############################################################
+# workers
+##############################################################
+def _append_worker(db, wid, rounds, acked):
+    store = HistoryStore(db, legacy_json=None)
+    for k in range(rounds):
+        store.append([{"date": "2099-01-01", "name": f"w{wid}-{k}", "type": "stress"}])
+        acked[wid] = k + 1   # 커밋이 끝난 뒤에만 올린다
+    store.close()
+
+def _assign_worker(db, wid, rounds, errors):
+    store = HistoryStore(db, legacy_json=None)
+    rng = random.Random(wid)
+    for _ in range(rounds):
+        staff = rng.sample(NAMES, 12)
+        demand = {"1M": rng.randint(0, 4), "1A": rng.randint(0, 10),
+                  "2A": rng.randint(0, 10), "2M": rng.randint(0, 3)}
+        try:
+            assign_logic(staff, rng.randint(1, 5), demand, {}, [], store=store)
+        except Exception as e:
+            with errors.get_lock():
+                errors.value += 1
+            print(f"[worker {wid}] {type(e).__name__}: {e}", file=sys.stderr)
+    store.close()
+
+##############################################################
+# phases
+##############################################################
+def phase_append(db, procs, rounds):
+    acked = mp.Array("i", procs)
+    t0 = time.perf_counter()
+    ps = [mp.Process(target=_append_worker, args=(db, w, rounds, acked)) for w in range(procs)]
+    for p in ps:
+        p.start()
+    for p in ps:
+        p.join()
+    el = time.perf_counter() - t0
+
+    store = HistoryStore(db, legacy_json=None)
+    got = store.count()
+    want = procs * rounds
+    ok = got == want and store.integrity_ok()
+    store.close()
+    return {"phase": "append", "ok": ok, "expected": want, "rows": got,
+            "seconds": round(el, 3), "commits_per_sec": round(want / el, 1)}
+
+def phase_assign(db, procs, rounds):
+    errors = mp.Value("i", 0)
+    t0 = time.perf_counter()
+    ps = [mp.Process(target=_assign_worker, args=(db, w, rounds, errors)) for w in range(procs)]
+    for p in ps:
+        p.start()
+    for p in ps:
+        p.join()
+    el = time.perf_counter() - t0
+
+    store = HistoryStore(db, legacy_json=None)
+    ok = errors.value == 0 and store.integrity_ok()
+    store.close()
+    n = procs * rounds
+    return {"phase": "assign", "ok": ok, "runs": n, "errors": errors.value,
+            "seconds": round(el, 3), "runs_per_sec": round(n / el, 1)}
+
+def phase_crash(db, procs, rounds):
+    acked = mp.Array("i", procs)
+    ps = [mp.Process(target=_append_worker, args=(db, w, rounds, acked)) for w in range(procs)]
+    for p in ps:
+        p.start()
+    time.sleep(0.05)
+    rng = random.Random(0)
+    for p in ps:
+        time.sleep(rng.random() * 0.02)
+        os.kill(p.pid, signal.SIGKILL)
+    for p in ps:
+        p.join()
+
+    store = HistoryStore(db, legacy_json=None)
+    got = store.count()
+    min_rows = sum(acked[:])          # 확인된 커밋은 반드시 남아야 함
+    max_rows = min_rows + procs       # 확인 직전에 죽은 커밋은 최대 프로세스당 1개
+    ok = min_rows <= got <= max_rows and store.integrity_ok() and store.recovered is None
+    store.close()
+    return {"phase": "crash", "ok": ok, "acked": min_rows, "rows": got}
+
+##############################################################
+# main
+##############################################################
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="히스토리 저장소 동시성 스트레스 벤치")
+    ap.add_argument("--procs", type=int, default=max(4, os.cpu_count() or 1))
+    ap.add_argument("--rounds", type=int, default=200)
+    ap.add_argument("--json", action="store_true", help="결과를 JSON 한 줄씩 출력")
+    args = ap.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, fn in (("append", phase_append), ("assign", phase_assign), ("crash", phase_crash)):
+            db = os.path.join(tmp, f"{name}.sqlite3")
+            results.append(fn(db, args.procs, args.rounds))
+
+    for r in results:
+        print(json.dumps(r, ensure_ascii=False) if args.json else r)
+    return 0 if all(r["ok"] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
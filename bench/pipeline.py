@@ -0,0 +1,332 @@
+##############################################################
+# bench/pipeline.py — 배정 파이프라인 단계별 벤치 + 불변식 검사
+#
+#   python bench/pipeline.py                       # 표로 출력 + baseline 비교
+#   python bench/pipeline.py --json out.json       # 기계가 읽을 결과
+#   python bench/pipeline.py --save-baseline       # bench/baseline.json 갱신
+#   python bench/pipeline.py --quick               # 작은 크기만 (CI 용)
+#   python bench/pipeline.py --quals q.json        # 자격 설정 (기본: 저장소 data/qualifications.json)
+#
+# 단계: parse (캐시 없이 / 캐시) · quota · types(greedy/flow) · pairing ·
+#       history save/load (기록 수를 키워가며) · assign_logic 전체
+# 근무자 수: 실제 10~20명부터 수천 명까지, 수요 조합: 균형 / 1M 쏠림 / 2M 쏠림
+#
+# 불변식 (모든 배정 케이스, greedy/flow 둘 다):
+#   quota 최대-최소 ≤ 1, quota ≤ cap, 배정 ≤ quota, 자격(수동 타입은 수동 가능자만),
+#   타입별 배정 ≤ 수요, flow 배정 합 ≥ greedy 배정 합
+# 하나라도 깨지거나 (--check 일 때) baseline 보다 tolerance 배 넘게 느려지면 exit 1.
+##############################################################
+
+import os, sys, json, time, random, platform, argparse, tempfile, statistics
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from roadauto.engine import (
+    TYPE_ORDER, CAP_MAP, ALL_MASK, AUTO_MASK, StaffTable, compute_quota, assign_types_within_quota, eligible,
+    make_pairing_text, load_history, save_history, assign_logic,
+)
+from roadauto.parser import parse_roster
+from roadauto.history import HistoryStore
+from roadauto.quals import QUALS_FILE, load_quals
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# 자격 설정: 실행 위치(CWD)와 상관없이 저장소 기준 data/ 에서 (--quals 로 바꿀 수 있음)
+QUALS = os.path.join(ROOT, QUALS_FILE)
+
+SIZES = [10, 20, 100, 1000, 3000]
+QUICK_SIZES = [10, 20, 100]
+HIST_SIZES = [10, 1000, 100000]
+QUICK_HIST_SIZES = [10, 1000]
+MIXES = {
+    "balanced": {"1M": 0.2, "1A": 0.3, "2A": 0.3, "2M": 0.2},
+    "1M_heavy": {"1M": 0.55, "1A": 0.15, "2A": 0.15, "2M": 0.15},
+    "2M_heavy": {"1M": 0.15, "1A": 0.15, "2A": 0.15, "2M": 0.55},
+}
+PERIOD = 2              # cap 3
+MANUAL_SHARE = 0.4      # 실제 근무표 비율 (15명 중 6명 정도)
+LOAD_PER_STAFF = 2.2    # 평균 수요 / 근무자
+
+##############################################################
+# 합성 데이터
+##############################################################
+SYL = "가나다라마바사아자차카타파하거너더러머버서어저처커터퍼허고노도로모보소오조초"
+
+def make_names(n, seed=0):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        names.add("".join(rng.choice(SYL) for _ in range(3 + len(names) // 30000)))
+    return sorted(names)
+
+def make_roster_text(names, manual, seed=0):
+    """parse_roster 형식 텍스트 (수동 줄, • 줄, 교양, 코스, 잡음 줄 섞음)"""
+    rng = random.Random(seed)
+    lines = ["도로주행 근무표", ""]
+    for i, nm in enumerate(names):
+        if nm in manual:
+            lines.append(f"1종수동 : {i + 1}호 {nm}")
+        else:
+            lines.append(f"• {i + 1}호 {nm}")
+        if rng.random() < 0.05:
+            lines.append("(비고) 오전 반차")
+    for p in (1, 2, 3, 4, 5):
+        lines.append(f"{p}교시 : {rng.choice(names)}")
+    lines.append("코스점검 : " + " / ".join(f"{c}코스 : {rng.choice(names)}" for c in "AB"))
+    return "\n".join(lines) + "\n"
+
+def make_demand(n, mix, seed=0):
+    rng = random.Random(seed)
+    total = int(n * LOAD_PER_STAFF)
+    demand = {t: int(total * f) for t, f in MIXES[mix].items()}
+    for _ in range(total - sum(demand.values())):
+        demand[rng.choice(TYPE_ORDER)] += 1
+    return demand
+
+def make_staff(names, manual, weighted=()):
+    t = StaffTable(names, [ALL_MASK if nm in manual else AUTO_MASK for nm in names])
+    t.weight[:] = [1 if nm in weighted else 0 for nm in names]
+    return t.staff
+
+def make_hist(names, size, today, seed=0):
+    rng = random.Random(seed)
+    days = [(today.toordinal() - k) for k in range(6)]
+    return [
+        {"date": date.fromordinal(rng.choice(days)).isoformat(), "name": rng.choice(names), "type": "min_load"}
+        for _ in range(size)
+    ]
+
+##############################################################
+# 측정
+##############################################################
+def timeit(fn, setup=None, repeat=5):
+    """setup() 결과를 fn 에 넘겨서 repeat 번 → 초 단위 리스트 (setup 시간 제외)"""
+    out = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        t0 = time.perf_counter()
+        fn(arg)
+        out.append(time.perf_counter() - t0)
+    return out
+
+def record(results, stage, n, secs, **extra):
+    case = "/".join([stage, f"n={n}"] + [f"{k}={v}" for k, v in sorted(extra.items())])
+    results.append({
+        "case": case, "stage": stage, "n": n, **extra,
+        "median_ms": round(statistics.median(secs) * 1000, 4),
+        "min_ms": round(min(secs) * 1000, 4),
+    })
+
+##############################################################
+# 불변식
+##############################################################
+def check_invariants(staff_objs, quotas, demand, period):
+    """깨진 항목 설명 리스트 (비었으면 통과)"""
+    bad = []
+    cap = CAP_MAP.get(period, 3)
+    if quotas and max(quotas) - min(quotas) > 1:
+        bad.append(f"quota 차이 {max(quotas) - min(quotas)} > 1")
+    if any(q > cap for q in quotas):
+        bad.append(f"quota > cap {cap}")
+    for s, q in zip(staff_objs, quotas):
+        if s.total_assigned > q:
+            bad.append(f"{s.name}: 배정 {s.total_assigned} > quota {q}")
+        if s.total_assigned != sum(s.assigned_counts.values()):
+            bad.append(f"{s.name}: total_assigned 불일치")
+        for t in TYPE_ORDER:
+            if s.assigned_counts[t] < 0 or (s.assigned_counts[t] and not eligible(s, t)):
+                bad.append(f"{s.name}: {t} 자격 없음/음수")
+    for t in TYPE_ORDER:
+        got = sum(s.assigned_counts[t] for s in staff_objs)
+        if got > demand.get(t, 0):
+            bad.append(f"{t}: 배정 {got} > 수요 {demand.get(t, 0)}")
+    return bad
+
+##############################################################
+# 단계별 벤치
+##############################################################
+def bench_parse(results, sizes, repeat):
+    for n in sizes:
+        names = make_names(n)
+        text = make_roster_text(names, set(names[: int(n * MANUAL_SHARE)]))
+        secs = timeit(lambda _: parse_roster.__wrapped__(text), repeat=repeat)
+        record(results, "parse", n, secs)
+        parse_roster(text)
+        secs = timeit(lambda _: parse_roster(text), repeat=repeat)
+        record(results, "parse_cached", n, secs)
+
+def bench_assign(results, failures, sizes, repeat):
+    for n in sizes:
+        names = make_names(n)
+        manual = set(names[: int(n * MANUAL_SHARE)])
+        rng = random.Random(n)
+        lucky = set(rng.sample(names, n // 3))
+        weighted = set(rng.sample(names, min(3, n)))
+        for mix in MIXES:
+            demand = make_demand(n, mix, seed=n)
+            total = sum(demand.values())
+
+            secs = timeit(
+                lambda objs: compute_quota(objs, PERIOD, total, lucky, random.Random(1)),
+                setup=lambda: make_staff(names, manual, weighted), repeat=repeat,
+            )
+            record(results, "quota", n, secs, mix=mix)
+            quotas, _ = compute_quota(make_staff(names, manual), PERIOD, total, lucky, random.Random(1))
+
+            filled = {}
+            for solver in ("greedy", "flow"):
+                def setup():
+                    objs = make_staff(names, manual, weighted)
+                    for s, q in zip(objs, quotas):
+                        s.quota = q
+                    return objs
+                secs = timeit(
+                    lambda objs: assign_types_within_quota(objs, PERIOD, quotas, dict(demand), None, solver),
+                    setup=setup, repeat=repeat,
+                )
+                record(results, "types", n, secs, mix=mix, solver=solver)
+
+                objs = setup()
+                assign_types_within_quota(objs, PERIOD, quotas, dict(demand), None, solver)
+                bad = check_invariants(objs, quotas, demand, PERIOD)
+                if bad:
+                    failures.append({"case": f"types/n={n}/mix={mix}/solver={solver}", "errors": bad[:10]})
+                filled[solver] = sum(s.total_assigned for s in objs)
+
+                if solver == "greedy":
+                    secs = timeit(lambda _: make_pairing_text(objs), repeat=repeat)
+                    record(results, "pairing", n, secs, mix=mix)
+
+            if filled["flow"] < filled["greedy"]:
+                failures.append({
+                    "case": f"types/n={n}/mix={mix}",
+                    "errors": [f"flow {filled['flow']} < greedy {filled['greedy']}"],
+                })
+
+def bench_history(results, hist_sizes, repeat, tmp):
+    today = date(2024, 5, 10)
+    names = make_names(200)
+    for h in hist_sizes:
+        hist = make_hist(names, h, today)
+        store = HistoryStore(os.path.join(tmp, f"hist-{h}.sqlite3"), legacy_json=None)
+        secs = timeit(lambda _: save_history(hist, store), repeat=repeat)
+        record(results, "history_save", h, secs)
+        secs = timeit(lambda _: load_history(today, store), repeat=repeat)
+        record(results, "history_load", h, secs)
+        secs = timeit(lambda _: store.lucky_names(today), repeat=repeat)
+        record(results, "history_lucky", h, secs)
+        store.close()
+
+def bench_end_to_end(results, failures, sizes, repeat, quals):
+    today = date(2024, 5, 10)
+    for n in sizes:
+        names = make_names(n)
+        demand = make_demand(n, "balanced", seed=n)
+        store = HistoryStore(":memory:", legacy_json=None)
+        store.append(make_hist(names, n, today))
+        for solver in ("greedy", "flow"):
+            secs = timeit(
+                lambda _: assign_logic(names, PERIOD, demand, {1: names[0]}, names[1:3], today=today,
+                                       solver=solver, store=store, commit=False, seed=1, log=False,
+                                       quals=quals),
+                repeat=repeat,
+            )
+            record(results, "assign_logic", n, secs, solver=solver)
+        store.close()
+
+##############################################################
+# baseline 비교
+##############################################################
+def compare(results, baseline, tolerance, noise_ms=1.0):
+    """
+    baseline 대비 느려진 케이스 [(case, 기준 ms, 지금 ms, 배수)].
+    반복 중 최솟값(min_ms)끼리 비교하고, noise_ms 미만 차이는 잡음으로 본다.
+    """
+    base = {r["case"]: r for r in baseline.get("results", [])}
+    slow = []
+    for r in results:
+        b = base.get(r["case"])
+        if not b or b["min_ms"] <= 0:
+            continue
+        ratio = r["min_ms"] / b["min_ms"]
+        r["baseline_ms"] = b["min_ms"]
+        r["ratio"] = round(ratio, 3)
+        if ratio > tolerance and r["min_ms"] - b["min_ms"] > noise_ms:
+            slow.append((r["case"], b["min_ms"], r["min_ms"], round(ratio, 2)))
+    return slow
+
+##############################################################
+# main
+##############################################################
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="배정 파이프라인 단계별 벤치 + 불변식 검사")
+    ap.add_argument("--sizes", help="근무자 수 목록 (쉼표). 기본 10,20,100,1000,3000")
+    ap.add_argument("--hist-sizes", help="히스토리 기록 수 목록 (쉼표). 기본 10,1000,100000")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--quick", action="store_true", help="작은 크기만")
+    ap.add_argument("--json", metavar="PATH", help="결과 JSON 저장 ('-' 이면 stdout)")
+    ap.add_argument("--baseline", default=BASELINE, help="비교할 baseline JSON")
+    ap.add_argument("--save-baseline", action="store_true", help="이번 결과를 baseline 으로 저장")
+    ap.add_argument("--tolerance", type=float, default=1.5, help="baseline 대비 허용 배수")
+    ap.add_argument("--check", action="store_true", help="느려진 케이스가 있으면 exit 1")
+    ap.add_argument("--quals", default=QUALS, help="assign_logic 에 쓸 자격 설정 JSON (기본: 저장소 data/)")
+    args = ap.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(",")] if args.sizes else (QUICK_SIZES if args.quick else SIZES)
+    hist_sizes = (
+        [int(x) for x in args.hist_sizes.split(",")] if args.hist_sizes
+        else (QUICK_HIST_SIZES if args.quick else HIST_SIZES)
+    )
+
+    results, failures = [], []
+    t0 = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_parse(results, sizes, args.repeat)
+        bench_assign(results, failures, sizes, args.repeat)
+        bench_history(results, hist_sizes, args.repeat, tmp)
+        bench_end_to_end(results, failures, sizes, args.repeat, load_quals(args.quals))
+    elapsed = time.perf_counter() - t0
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    slow = compare(results, baseline, args.tolerance)
+
+    out = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform()},
+        "elapsed_s": round(elapsed, 2),
+        "results": results,
+        "invariant_failures": failures,
+        "regressions": [
+            {"case": c, "baseline_min_ms": b, "min_ms": m, "ratio": r} for c, b, m, r in slow
+        ],
+    }
+
+    if args.json == "-":
+        print(json.dumps(out, ensure_ascii=False, indent=1))
+    else:
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(out, f, ensure_ascii=False, indent=1)
+        for r in results:
+            extra = f"  x{r['ratio']:.2f}" if "ratio" in r else ""
+            print(f"{r['case']:<48} {r['median_ms']:>11.3f} ms{extra}")
+        print(f"[pipeline] {len(results)}케이스, {elapsed:.1f}s, "
+              f"불변식 위반 {len(failures)}, 느려짐 {len(slow)}", file=sys.stderr)
+        for fl in failures:
+            print(f"  ✗ {fl['case']}: {'; '.join(fl['errors'])}", file=sys.stderr)
+        for c, b, m, r in slow:
+            print(f"  ▲ {c}: {b:.3f} → {m:.3f} ms (x{r})", file=sys.stderr)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": out["machine"], "results": results}, f, ensure_ascii=False, indent=1)
+
+    if failures or (args.check and slow):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
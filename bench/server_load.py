@@ -0,0 +1,190 @@
+##############################################################
+# bench/server_load.py — roadauto.server 부하 테스트 (p50 / p99 지연)
+#
+#   python bench/server_load.py                          # 서버를 이 프로세스에 띄움 (임시 DB)
+#   python bench/server_load.py --url http://127.0.0.1:8765 --rate 300 --duration 20
+#   python bench/server_load.py --mix parse=4,assign=3,pair=2,history=1 --commit 0.2
+#   python bench/server_load.py --p99-max 50             # p99(ms) 넘으면 exit 1
+#
+# 개방 루프: 요청 k 는 시작 + k/rate 초에 나가야 한다. 지연은 그 예정 시각부터
+# 응답까지 재서, 서버가 밀려 요청이 늦게 나간 시간까지 포함된다
+# (닫힌 루프처럼 느린 서버가 부하를 스스로 줄여 지연을 낮게 보이게 하지 않음).
+# 클라이언트 스레드마다 keep-alive 연결 하나.
+##############################################################
+
+import os, sys, json, time, random, shutil, argparse, tempfile, threading, http.client
+from urllib.parse import urlsplit, urlencode
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from roadauto.engine import TYPE_ORDER, CAP_MAP
+from roadauto.metrics import percentile
+
+NAMES = [f"감독{i:03d}" for i in range(60)]
+
+##############################################################
+# 요청 만들기
+##############################################################
+def roster_text(names):
+    lines = [f"1종수동 : {k + 1:02d}호 {nm}" for k, nm in enumerate(names[:2])]
+    lines += [f"• {k + 3:02d}호 {nm}" for k, nm in enumerate(names[2:])]
+    lines.append(f"2교시 : {names[-1]}")
+    return "\n".join(lines)
+
+def make_request(kind, rng, commit_ratio, day):
+    staff = rng.sample(NAMES, rng.randint(10, 20))
+    period = rng.choice(sorted(CAP_MAP))
+    if kind == "parse":
+        return "POST", "/parse", {"text": roster_text(staff)}
+    if kind == "assign":
+        cap = len(staff) * CAP_MAP[period]
+        demand = {t: 0 for t in TYPE_ORDER}
+        for _ in range(rng.randint(cap // 3, cap)):
+            demand[rng.choice(TYPE_ORDER)] += 1
+        return "POST", "/assign", {
+            "text": roster_text(staff), "period": period, "demand": demand,
+            "commit": rng.random() < commit_ratio, "date": day,
+            "solver": rng.choice(["greedy", "flow"]),
+        }
+    if kind == "pair":
+        rows = [{"name": nm, "counts": {rng.choice(["1A", "2A"]): rng.randint(0, 2)}} for nm in staff]
+        return "POST", "/pair", {"staff": rows, "period": period, "date": day}
+    return "GET", "/history?" + urlencode({"date": day, "names": ",".join(staff[:5])}), None
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(","):
+        k, _, w = item.partition("=")
+        mix[k.strip()] = float(w or 1)
+    bad = set(mix) - {"parse", "assign", "pair", "history"}
+    if bad:
+        raise SystemExit(f"--mix 에 모르는 종류: {sorted(bad)}")
+    return mix
+
+##############################################################
+# 부하
+##############################################################
+def run_load(url, rate, duration, clients, mix, commit_ratio, seed=0, day="2026-01-05"):
+    rng = random.Random(seed)
+    kinds, weights = zip(*mix.items())
+    total = int(rate * duration)
+    plan = []
+    for _ in range(total):
+        kind = rng.choices(kinds, weights)[0]
+        plan.append((kind, *make_request(kind, rng, commit_ratio, day)))
+
+    u = urlsplit(url)
+    lat = {k: [] for k in kinds}
+    errors = {}
+    nxt = [0]
+    lock = threading.Lock()
+    t0 = time.perf_counter() + 0.2
+
+    def worker():
+        conn = http.client.HTTPConnection(u.hostname, u.port, timeout=60)
+        while True:
+            with lock:
+                k = nxt[0]
+                nxt[0] += 1
+            if k >= total:
+                break
+            kind, method, path, body = plan[k]
+            due = t0 + k / rate
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+            headers = {"Content-Type": "application/json"} if data else {}
+            try:
+                conn.request(method, path, data, headers)
+                resp = conn.getresponse()
+                resp.read()
+                status = resp.status
+            except Exception as e:
+                conn.close()
+                conn = http.client.HTTPConnection(u.hostname, u.port, timeout=60)
+                status = type(e).__name__
+            ms = (time.perf_counter() - due) * 1000
+            with lock:
+                if status == 200:
+                    lat[kind].append(ms)
+                else:
+                    errors[f"{kind}:{status}"] = errors.get(f"{kind}:{status}", 0) + 1
+        conn.close()
+
+    ts = [threading.Thread(target=worker, daemon=True) for _ in range(clients)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    def row(vals):
+        v = sorted(vals)
+        return {
+            "n": len(v),
+            "p50": round(percentile(v, 50), 2), "p90": round(percentile(v, 90), 2),
+            "p99": round(percentile(v, 99), 2), "max": round(v[-1], 2) if v else 0.0,
+        }
+
+    every = [x for v in lat.values() for x in v]
+    return {
+        "target_rps": rate, "achieved_rps": round(len(every) / elapsed, 1) if elapsed > 0 else 0,
+        "requests": total, "errors": errors,
+        "all": row(every), "by_kind": {k: row(v) for k, v in lat.items()},
+    }
+
+##############################################################
+# main
+##############################################################
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="roadauto.server 부하 테스트")
+    ap.add_argument("--url", default=None, help="이미 떠 있는 서버 (없으면 이 프로세스에 띄움)")
+    ap.add_argument("--rate", type=float, default=200, help="초당 요청 수 (목표)")
+    ap.add_argument("--duration", type=float, default=10, help="초")
+    ap.add_argument("--clients", type=int, default=32, help="클라이언트 스레드 (keep-alive 연결) 수")
+    ap.add_argument("--mix", default="parse=4,assign=3,pair=2,history=1")
+    ap.add_argument("--commit", type=float, default=0.2, help="/assign 중 commit 비율")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", default=None, help="결과를 JSON 파일로")
+    ap.add_argument("--p99-max", type=float, default=None, help="전체 p99(ms) 한도 — 넘거나 오류가 있으면 exit 1")
+    args = ap.parse_args(argv)
+
+    httpd = tmp = None
+    url = args.url
+    if url is None:
+        from roadauto.history import HistoryStore
+        from roadauto.server import Service, make_server
+        tmp = tempfile.mkdtemp(prefix="roadauto-load-")
+        httpd = make_server("127.0.0.1", 0, Service(HistoryStore(os.path.join(tmp, "h.sqlite3"), None)))
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    res = run_load(url, args.rate, args.duration, args.clients, parse_mix(args.mix), args.commit, args.seed)
+    if httpd is not None:
+        svc = httpd.RequestHandlerClass.service
+        b = svc.batcher(svc.center(None))
+        res["batches"] = {"batches": b.batches, "jobs": b.jobs, "largest": b.largest}
+        httpd.shutdown()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"[load] {url} 목표 {res['target_rps']} req/s → {res['achieved_rps']} req/s, "
+          f"요청 {res['requests']}, 오류 {sum(res['errors'].values())}")
+    print(f"{'kind':<10}{'n':>7}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (ms)")
+    for k, r in [*res["by_kind"].items(), ("all", res["all"])]:
+        print(f"{k:<10}{r['n']:>7}{r['p50']:>10}{r['p90']:>10}{r['p99']:>10}{r['max']:>10}")
+    if res.get("batches"):
+        b = res["batches"]
+        print(f"/assign 묶음 {b['batches']}개, 요청 {b['jobs']}개, 최대 묶음 {b['largest']}")
+    if res["errors"]:
+        print("오류: " + ", ".join(f"{k} {v}" for k, v in sorted(res["errors"].items())))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, ensure_ascii=False, indent=2)
+
+    if args.p99_max is not None and (res["errors"] or res["all"]["p99"] > args.p99_max):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
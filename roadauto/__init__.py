@@ -0,0 +1,21 @@
+##############################################################
+# roadauto — 도로주행 자동 배정 엔진 패키지
+#
+# 여기서는 streamlit / pandas 를 import 하지 않는다.
+# (스크립트·배치·테스트에서 가볍게 쓰기 위함)
+##############################################################
+
+from .engine import (
+    DATA_DIR, HISTORY_FILE, TYPE_ORDER, TYPE_BIT, MANUAL_SET, CAP_MAP, SOLVERS,
+    Staff, StaffTable, parse_staff, parse_extra,
+    load_history, save_history, check_history_full, is_lucky_recently, lucky_name_set,
+    eligible, get_transmission_type,
+    compute_quota, assign_types_within_quota, apply_weights, assign_logic,
+    lucky_entries, ledger_entries, ledger_rates, commit_assignment, StaleHistoryError,
+    make_pairing_text, result_rows,
+)
+from .history import HistoryStore, get_history_store
+from .parser import ParseResult, RosterFormat, parse_roster
+from .quals import Quals, load_quals
+from .centers import Center, get_center, load_centers
+from .export import EXPORT_COLUMNS, export_rows, staff_rows, render_message
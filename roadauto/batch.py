@@ -0,0 +1,242 @@
+##############################################################
+# batch.py — 과거 근무표 일괄 재현 (헤드리스 CLI)
+#
+#   python -m roadauto.batch --rosters rosters/ --demand demand.csv \
+#       --out result.csv [--solver flow] [--seed 1] [--center busan] [--ledger | --jobs 8]
+#
+# rosters/ : 날짜별 근무 텍스트 (parse_staff / parse_extra 형식)
+#            YYYY-MM-DD.txt           → 그날 모든 교시
+#            YYYY-MM-DD_am.txt / _pm  → 오전(1,2) / 오후(3,4,5) 따로 있으면 우선
+# demand   : CSV 헤더 date,period,1M,1A,2A,2M  (roster 열이 있으면 파일 이름 직접 지정)
+# center   : 센터 키 (근무표 형식 / cap / 자격은 그 센터 설정, 히스토리는 여전히 메모리)
+#
+# 히스토리는 메모리 SQLite 에 두고, date.today() 대신 CSV 의 날짜로
+# 시간을 진행시킨다. 실제 data/ 는 건드리지 않는다.
+#
+# 장기 원장(ledger): 기본은 쓰지 않는다 (quota 동점 처리는 3일 히스토리 + 시드만).
+# --ledger 면 메모리 원장을 쌓아 가며 화면과 같은 동점 처리를 한다. 원장은 첫날부터의
+# 누적이라 구간으로 나눌 수 없으므로 --ledger 는 순차(--jobs 1)에서만.
+#
+# 병렬(--jobs > 1, 기본은 1): 날짜를 --chunk-days 일 단위로 나눠 프로세스 풀에서 돌린다.
+# 각 구간은 직전 HISTORY_DAYS+1 일을 먼저 조용히 재현(warm-up)해서 히스토리
+# 상태를 만든 뒤 시작한다. 원장을 안 쓰므로 상태는 이 히스토리뿐이지만, 구간마다
+# 난수원이 새로 시작하고 warm-up 도 그 난수로 돌아서 결과가 순차 실행과 같지는 않다
+# (공평성 통계용 근사). 정확한 재현이 필요하면 --jobs 1 (기본).
+#
+# 출력: 순차에서는 하루 재현이 끝날 때마다 그 날 행을 바로 내보낸다 (iter_chunk) →
+# 기간이 길어도 결과 행을 메모리에 모아 두지 않는다. 병렬은 구간 단위로 모아서 돌려받는다.
+##############################################################
+
+import os, re, csv, sys, random, argparse
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+from .engine import TYPE_ORDER, HISTORY_DAYS, SOLVERS, assign_logic
+from .history import HistoryStore
+from .centers import get_center
+from .export import ParquetSink
+
+ROSTER_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})(?:_(am|pm))?\.txt$")
+AM_PERIODS = (1, 2)
+
+OUT_COLUMNS = [
+    "date", "period", "name", *TYPE_ORDER,
+    "total", "quota", "weight", "min_load", "diags",
+]
+
+##############################################################
+# 입력 읽기
+##############################################################
+def index_rosters(roster_dir):
+    """{(날짜 문자열, "am"|"pm"|None): 파일 경로}"""
+    idx = {}
+    for fn in os.listdir(roster_dir):
+        m = ROSTER_RE.match(fn)
+        if m:
+            idx[(m.group(1), m.group(2))] = os.path.join(roster_dir, fn)
+    return idx
+
+def read_demand(path):
+    """CSV → {날짜: [(교시, {타입: 수요}, roster 파일 or None), ...]} (날짜·교시 순)"""
+    days = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            d = row["date"].strip()
+            date.fromisoformat(d)
+            demand = {t: int(row.get(t) or 0) for t in TYPE_ORDER}
+            days.setdefault(d, []).append(
+                (int(row["period"]), demand, (row.get("roster") or "").strip() or None)
+            )
+    for rows in days.values():
+        rows.sort(key=lambda r: r[0])
+    return dict(sorted(days.items()))
+
+def roster_for(rosters, roster_dir, day, period, explicit):
+    if explicit:
+        return os.path.join(roster_dir, explicit)
+    half = "am" if period in AM_PERIODS else "pm"
+    return rosters.get((day, half)) or rosters.get((day, None))
+
+_text_cache = {}
+
+def read_roster(path):
+    if path not in _text_cache:
+        with open(path, encoding="utf-8") as f:
+            _text_cache[path] = f.read()
+    return _text_cache[path]
+
+##############################################################
+# 구간 재현 (워커)
+##############################################################
+def iter_chunk(job):
+    """
+    job: (warmup_days, days, roster_dir, solver, seed, center_key, use_ledger)
+      warmup_days / days: [(날짜, [(교시, 수요, roster), ...]), ...]
+    하루 재현이 끝날 때마다 그 날 출력 행 리스트를 yield (warm-up 구간은 출력하지 않음)
+    """
+    warmup_days, days, roster_dir, solver, seed, center_key, use_ledger = job
+    center = get_center(center_key)
+    quals = center.quals()
+    rosters = index_rosters(roster_dir)
+    store = HistoryStore(":memory:", legacy_json=None)
+    rng = random.Random(f"{seed}:{days[0][0]}" if days else seed)
+
+    try:
+        for emit, chunk in ((False, warmup_days), (True, days)):
+            for day, rows in chunk:
+                out = replay_day(day, rows, emit, rosters, roster_dir, center, quals, store, rng, solver, use_ledger)
+                if emit:
+                    yield out
+    finally:
+        store.close()
+
+def replay_day(day, rows, emit, rosters, roster_dir, center, quals, store, rng, solver, use_ledger):
+    """하루 재현 → 그 날 출력 행 리스트"""
+    today = date.fromisoformat(day)
+    out = []
+    for period, demand, explicit in rows:
+        path = roster_for(rosters, roster_dir, day, period, explicit)
+        if not path:
+            if emit:
+                print(f"[batch] {day} {period}교시: 근무표 파일 없음 — 건너뜀", file=sys.stderr)
+            continue
+        r = center.parse(read_roster(path))
+        staff_objs, _, diags = assign_logic(
+            list(r.staff), period, demand, dict(r.edu), list(r.course),
+            today=today, solver=solver, store=store,
+            seed=rng.getrandbits(63), log=False, ledger=use_ledger,
+            quals=quals, cap_map=center.cap_map,
+        )
+        if not emit or not staff_objs:
+            continue
+        min_assigned = min(s.total_assigned for s in staff_objs)
+        codes = ";".join(d["code"] for d in diags)
+        for s in staff_objs:
+            out.append([
+                day, period, s.name,
+                *(s.assigned_counts[t] for t in TYPE_ORDER),
+                s.total_assigned, s.quota, s.weight_val,
+                int(s.total_assigned == min_assigned and s.weight_val == 0),
+                codes,
+            ])
+    return out
+
+def run_chunk(job):
+    """iter_chunk 를 한 리스트로 (프로세스 풀 워커용 — 구간 결과를 한 번에 돌려준다)"""
+    return [r for day_rows in iter_chunk(job) for r in day_rows]
+
+def make_jobs(days, roster_dir, solver, seed, jobs, chunk_days, center=None, ledger=False):
+    items = list(days.items())
+    if jobs <= 1:
+        return [([], items, roster_dir, solver, seed, center, ledger)]
+    if ledger:
+        raise ValueError("장기 원장(--ledger)은 첫날부터 누적이라 순차(--jobs 1)에서만 쓸 수 있습니다")
+    warm = HISTORY_DAYS + 1
+    out = []
+    for k in range(0, len(items), chunk_days):
+        chunk = items[k:k + chunk_days]
+        first = date.fromisoformat(chunk[0][0])
+        # 달력상 직전 warm 일 안의 날짜만 warm-up 으로
+        warmup = [
+            it for it in items[max(0, k - warm):k]
+            if first - date.fromisoformat(it[0]) <= timedelta(days=warm)
+        ]
+        out.append((warmup, chunk, roster_dir, solver, seed, center, False))
+    return out
+
+##############################################################
+# 출력 (스트리밍)
+##############################################################
+class CsvSink:
+    def __init__(self, path):
+        self.f = open(path, "w", newline="", encoding="utf-8-sig")
+        self.w = csv.writer(self.f)
+        self.w.writerow(OUT_COLUMNS)
+
+    def write(self, rows):
+        self.w.writerows(rows)
+
+    def close(self):
+        self.f.close()
+
+def open_sink(path):
+    if path.endswith(".parquet"):
+        # export 와 같은 스트리밍 writer (열만 OUT_COLUMNS)
+        try:
+            return ParquetSink(path, OUT_COLUMNS)
+        except ImportError as e:
+            raise SystemExit(str(e))
+    return CsvSink(path)
+
+##############################################################
+# main
+##############################################################
+def run_batch(roster_dir, demand_csv, out_path, jobs=1, solver="greedy", seed=0, chunk_days=14,
+              center=None, ledger=False):
+    days = read_demand(demand_csv)
+    job_list = make_jobs(days, roster_dir, solver, seed, jobs, chunk_days, center, ledger)
+    sink = open_sink(out_path)
+    n = 0
+    try:
+        if jobs <= 1:
+            # 하루씩 받아서 바로 쓴다
+            for job in job_list:
+                for rows in iter_chunk(job):
+                    sink.write(rows)
+                    n += len(rows)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as ex:
+                # map 은 입력 순서대로 돌려준다 → 날짜 순서 그대로 스트리밍
+                for rows in ex.map(run_chunk, job_list):
+                    sink.write(rows)
+                    n += len(rows)
+    finally:
+        sink.close()
+    return n
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="과거 근무표 일괄 재현 (헤드리스)")
+    ap.add_argument("--rosters", required=True, help="근무 텍스트 폴더 (YYYY-MM-DD[_am|_pm].txt)")
+    ap.add_argument("--demand", required=True, help="수요 CSV (date,period,1M,1A,2A,2M[,roster])")
+    ap.add_argument("--out", required=True, help="결과 파일 (.csv 또는 .parquet)")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help=f"프로세스 수 (기본 1 = 정확한 순차 재현, >1 은 근사 — 이 컴퓨터 {os.cpu_count() or 1}코어)")
+    ap.add_argument("--chunk-days", type=int, default=14, help="병렬 구간 길이(일)")
+    ap.add_argument("--solver", choices=SOLVERS, default="greedy")
+    ap.add_argument("--seed", default="0", help="quota 추첨 시드")
+    ap.add_argument("--center", default=None, help="센터 키 (근무표 형식 / cap / 자격)")
+    ap.add_argument("--ledger", action="store_true", help="장기 원장 동점 처리도 재현 (--jobs 1 에서만)")
+    args = ap.parse_args(argv)
+    if args.ledger and args.jobs > 1:
+        ap.error("--ledger 는 --jobs 1 에서만 쓸 수 있습니다")
+
+    n = run_batch(
+        args.rosters, args.demand, args.out,
+        jobs=args.jobs, solver=args.solver, seed=args.seed, chunk_days=args.chunk_days,
+        center=args.center, ledger=args.ledger,
+    )
+    print(f"[batch] {n}행 → {args.out}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
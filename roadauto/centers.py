@@ -0,0 +1,213 @@
+##############################################################
+# centers.py — 시험장(센터)별 설정과 저장소 (data/centers.json)
+#
+#   {
+#     "default": "main",
+#     "centers": {
+#       "main":  {"label": "본 시험장"},
+#       "busan": {"label": "부산", "cap_map": {"1": 2, "5": 0},
+#                 "manual": ["홍길동"],                       # 자격 파일이 없을 때 수동 가능자
+#                 "format": {"bullet": "-[^\\S\\n]*(?P<bullet>[가-힣]+)"}}   # parser.DEFAULT_PATTERNS 중 바꿀 것
+#     }
+#   }
+#
+# 센터마다 따로 두는 것:
+#   - 교시별 cap (CAP_MAP 위에 덮어쓴다, 교시는 1~5)
+#   - 자격 설정 / 기본 수동 가능자 (qualifications.json)
+#   - 근무표 형식 (parser.RosterFormat)
+#   - 히스토리 DB (history / runs / ledger / pairs), LLM 보조 인식 캐시
+# 저장 위치: DEFAULT_CENTER 는 예전 그대로 data/ 바로 아래, 다른 센터는 data/<키>/.
+# 설정 파일이 없으면 DEFAULT_CENTER 하나만 있다 (예전과 똑같이 동작).
+#
+# 전부 게으르게: centers.json 은 mtime/크기가 바뀔 때만 다시 읽고, Center 객체는
+# 처음 요청될 때 만들고, 그 센터의 SQLite / 자격 파일은 처음 쓸 때 연다.
+# → 센터가 수십 개여도 프로세스 시작 때 읽는 건 없다.
+##############################################################
+
+import os, re, json, threading
+
+from .engine import DATA_DIR, HISTORY_FILE, CAP_MAP, save_json
+from .parser import RosterFormat, DEFAULT_FORMAT, parse_roster
+from . import metrics
+
+CENTERS_FILE = os.path.join(DATA_DIR, "centers.json")
+DEFAULT_CENTER = "main"
+KEY_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,31}$")     # 디렉터리 이름으로 쓰므로 좁게
+
+##############################################################
+# Center
+##############################################################
+class Center:
+    def __init__(self, key, label=None, cap_map=None, manual=None, fmt=None, data_dir=None):
+        self.key = key
+        self.label = label or key
+        self.cap_map = {**CAP_MAP, **(cap_map or {})}
+        self.manual = None if manual is None else frozenset(manual)   # None → engine.MANUAL_SET
+        self.fmt = fmt or DEFAULT_FORMAT
+        if data_dir is None:
+            data_dir = DATA_DIR if key == DEFAULT_CENTER else os.path.join(DATA_DIR, key)
+        self.data_dir = data_dir
+        self.history_db = os.path.join(data_dir, "history.sqlite3")
+        self.quals_file = os.path.join(data_dir, "qualifications.json")
+        self.llm_cache = os.path.join(data_dir, "llm_cache")
+        # 예전 random_history.json 마이그레이션은 기본 센터만
+        self.legacy_json = HISTORY_FILE if data_dir == DATA_DIR else None
+
+    def __repr__(self):
+        return f"Center({self.key!r})"
+
+    @property
+    def periods(self):
+        """cap 이 0 보다 큰 교시 (이 센터가 운영하는 교시)"""
+        return [p for p in sorted(self.cap_map) if self.cap_map[p] > 0]
+
+    def store(self):
+        from .history import get_history_store
+        return get_history_store(self.history_db, self.legacy_json)
+
+    def quals(self):
+        from .quals import load_quals
+        return load_quals(self.quals_file, self.manual)
+
+    def save_quals(self, raw):
+        from .quals import save_quals
+        return save_quals(raw, self.quals_file, self.manual)
+
+    def parse(self, text):
+        return parse_roster(text, None if self.fmt is DEFAULT_FORMAT else self.fmt)
+
+##############################################################
+# 설정 읽기
+##############################################################
+def _cap_map(raw, key, errors):
+    if raw is None:
+        return None
+    if not isinstance(raw, dict):
+        errors.append(f"{key}: cap_map 은 {{교시: cap}} 이어야 합니다")
+        return None
+    out = {}
+    for p, c in raw.items():
+        try:
+            p = int(p)
+        except ValueError:
+            errors.append(f"{key}: cap_map 의 교시가 숫자가 아닙니다 ({p!r})")
+            continue
+        if p not in CAP_MAP:
+            errors.append(f"{key}: 없는 교시 {p} (1~{max(CAP_MAP)})")
+            continue
+        if not isinstance(c, int) or isinstance(c, bool) or c < 0:
+            errors.append(f"{key}: {p}교시 cap 은 0 이상 정수여야 합니다")
+            continue
+        out[p] = c
+    return out
+
+def parse_center(key, spec):
+    """centers.json 의 센터 하나 → (Center 또는 None, errors)"""
+    errors = []
+    if not KEY_RE.match(key):
+        return None, [f"센터 키는 영문 소문자/숫자/-/_ 만: {key!r}"]
+    if not isinstance(spec, dict):
+        return None, [f"{key}: 설정은 객체여야 합니다"]
+    cap_map = _cap_map(spec.get("cap_map"), key, errors)
+    manual = spec.get("manual")
+    if manual is not None and not (isinstance(manual, list) and all(isinstance(x, str) for x in manual)):
+        errors.append(f"{key}: manual 은 이름 목록이어야 합니다")
+        manual = None
+    fmt = None
+    raw_fmt = spec.get("format")
+    if isinstance(raw_fmt, dict) and raw_fmt:
+        try:
+            fmt = RosterFormat(key, raw_fmt)
+        except ValueError as e:
+            errors.append(f"{key}: 근무표 형식 — {e}")
+    elif raw_fmt not in (None, "default", {}):
+        errors.append(f"{key}: format 은 {{종류: 정규식}} 이어야 합니다")
+    return Center(key, spec.get("label"), cap_map, manual, fmt), errors
+
+class CenterConfig:
+    """centers.json 한 번 읽은 것 (센터 설정은 원본 dict 로 두고 Center 는 필요할 때 만든다)"""
+    def __init__(self, specs=None, default=DEFAULT_CENTER, source=None, errors=None):
+        self.specs = dict(specs or {DEFAULT_CENTER: {}})
+        self.default = default if default in self.specs else next(iter(self.specs))
+        self.source = source
+        self.errors = list(errors or [])
+        self._built = {}
+        self._lock = threading.Lock()
+
+    def keys(self):
+        return list(self.specs)
+
+    def label(self, key):
+        spec = self.specs.get(key)
+        return (spec.get("label") if isinstance(spec, dict) else None) or key
+
+    def get(self, key=None):
+        key = key or self.default
+        with self._lock:
+            c = self._built.get(key)
+            if c is None:
+                if key not in self.specs:
+                    raise KeyError(f"없는 센터: {key}")
+                c, errs = parse_center(key, self.specs[key])
+                if c is None:
+                    raise KeyError(f"센터 설정 오류: {'; '.join(errs)}")
+                self.errors.extend(errs)
+                self._built[key] = c
+                metrics.count("center_load")
+            return c
+
+def parse_centers(raw, source=None):
+    if not isinstance(raw, dict) or not isinstance(raw.get("centers", {}), dict):
+        return CenterConfig(source=source, errors=["centers.json 형식: {\"centers\": {키: 설정}}"])
+    specs, errors = {}, []
+    for key, spec in (raw.get("centers") or {}).items():
+        if not KEY_RE.match(str(key)):
+            errors.append(f"센터 키는 영문 소문자/숫자/-/_ 만: {key!r}")
+            continue
+        specs[key] = spec
+    return CenterConfig(specs or None, raw.get("default", DEFAULT_CENTER), source, errors)
+
+##############################################################
+# 파일 캐시 (mtime/크기 기준 — quals 와 같은 방식)
+##############################################################
+_cache = {}
+_cache_lock = threading.Lock()
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def load_centers(path=CENTERS_FILE):
+    stamp = _stamp(path)
+    with _cache_lock:
+        hit = _cache.get(path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+    if stamp is None:
+        cfg = CenterConfig()
+    else:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cfg = parse_centers(json.load(f), path)
+        except (OSError, ValueError) as e:
+            cfg = CenterConfig(source=path, errors=[f"읽기 실패: {e}"])
+    with _cache_lock:
+        _cache[path] = (stamp, cfg)
+    return cfg
+
+def get_center(key=None, path=CENTERS_FILE):
+    """센터 키 → Center (없으면 기본 센터). 모르는 키는 KeyError."""
+    return load_centers(path).get(key)
+
+def save_centers(raw, path=CENTERS_FILE):
+    """dict 를 검사한 뒤 저장 (센터마다 한 번씩 만들어 본다). 반환: errors (있으면 저장 안 함)"""
+    cfg = parse_centers(raw, path)
+    errors = list(cfg.errors)
+    for key, spec in cfg.specs.items():
+        errors.extend(parse_center(key, spec)[1])
+    if not errors:
+        save_json(path, raw)
+    return errors
@@ -0,0 +1,710 @@
+##############################################################
+# engine.py — 도로주행 자동 배정 엔진 (UI 없는 순수 파이썬 코어)
+#
+# streamlit / pandas 를 import 하지 않는다. UI 알림(st.warning 등)은
+# 직접 호출하지 않고 diagnostics 리스트로 돌려준다.
+##############################################################
+
+import json, os, random
+from collections.abc import Mapping
+from datetime import date
+
+from .parser import parse_roster
+from . import metrics
+
+DATA_DIR = "data"
+HISTORY_FILE = os.path.join(DATA_DIR, "random_history.json")
+
+TYPE_ORDER = ["1M", "1A", "2A", "2M"]
+# 종별 비트 (자격 비트마스크용, roadauto.quals)
+TYPE_BIT = {t: 1 << k for k, t in enumerate(TYPE_ORDER)}
+TRANSMISSION = {t: ("Manual" if "M" in t else "Auto") for t in TYPE_ORDER}
+ALL_MASK = (1 << len(TYPE_ORDER)) - 1
+MANUAL_MASK = sum(TYPE_BIT[t] for t in TYPE_ORDER if TRANSMISSION[t] == "Manual")
+AUTO_MASK = ALL_MASK & ~MANUAL_MASK
+
+##############################################################
+# JSON LOAD / SAVE
+##############################################################
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except:
+        return default
+
+def save_json(path, data):
+    # data/ 는 import 시점이 아니라 첫 저장 시점에 만든다
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    # 임시 파일에 다 쓴 뒤 rename → 중간에 죽어도 잘린 JSON 이 남지 않음
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+##############################################################
+# 진단 메시지 (UI 대신 반환)
+##############################################################
+def add_diag(diags, level, code, msg, **extra):
+    """
+    level: "info" | "warning" | "error" | "toast"
+    UI 쪽에서 level 에 맞는 위젯으로 보여준다. extra 는 그대로 붙는다 (예: run_id).
+    """
+    if diags is not None:
+        diags.append({"level": level, "code": code, "msg": msg, **extra})
+
+##############################################################
+# 수동 가능자 세팅
+# data/qualifications.json 이 없을 때의 기본 자격 (roadauto.quals)
+##############################################################
+MANUAL_SET = {
+    "권한솔", "김남균", "김성연",
+    "김주현", "이호석", "조정래"
+}
+
+##############################################################
+# 텍스트 파싱 함수
+##############################################################
+# 실제 파싱은 roadauto.parser (한 번 훑기 + 캐시). 여기서는 예전 반환형 유지.
+def parse_staff(text):
+    return list(parse_roster(text).staff)
+
+def parse_extra(text):
+    r = parse_roster(text)
+    return dict(r.edu), list(r.course)
+
+##############################################################
+# 배정 상태 (StaffTable) + Staff 뷰
+#
+# 한 교시 배정 상태는 사람 수만큼의 평행 리스트로 들고 있다.
+#   counts[i] = [1M, 1A, 2A, 2M] (사람 × 타입 행렬의 한 행, TYPE_ORDER 순)
+#   total / quota / weight / elig / manual [i]
+# 타입 배정 루프는 이 리스트를 직접 만지고 (반복마다 리스트/dict 를 만들지 않음),
+# 예전 코드는 Staff 뷰로 같은 값을 읽고 쓴다 (s.assigned_counts["1M"] += 1 등).
+##############################################################
+TYPE_INDEX = {t: k for k, t in enumerate(TYPE_ORDER)}
+
+class StaffTable:
+    def __init__(self, names, masks=None, views=True):
+        """
+        masks: 사람별 자격 비트마스크 (TYPE_BIT 합). 자격 설정을 따르려면 호출하는 쪽에서
+               quals.masks(names) 를 넘긴다 — 여기서는 파일을 읽지 않는다. 안 주면 모두 ALL_MASK.
+        """
+        n = len(names)
+        if masks is None:
+            masks = [ALL_MASK] * n
+        self.names = list(names)
+        self.elig = list(masks)
+        self.manual = [bool(m & MANUAL_MASK) for m in self.elig]
+        self.counts = [[0, 0, 0, 0] for _ in range(n)]
+        self.total = [0] * n      # 이번 교시 내 총 배정수
+        self.weight = [0] * n     # 코스/다음 교시 교양 가중치 (0 또는 1)
+        self.quota = [0] * n      # 1단계에서 정해진 이번 교시 quota
+        self.staff = [Staff(None, table=self, idx=i) for i in range(n)] if views else []
+
+    def __len__(self):
+        return len(self.names)
+
+    def reset_counts(self):
+        for row in self.counts:
+            row[0] = row[1] = row[2] = row[3] = 0
+        self.total[:] = [0] * len(self.total)
+
+    @classmethod
+    def gather(cls, staff_objs):
+        """아무 Staff 리스트 → 값을 복사한 새 표 (scatter 로 결과를 되돌려 쓴다)"""
+        t = cls([s.name for s in staff_objs], [s.elig for s in staff_objs])
+        for i, s in enumerate(staff_objs):
+            t.counts[i][:] = s._t.counts[s._i]
+            t.total[i] = s.total_assigned
+            t.weight[i] = s.weight_val
+            t.quota[i] = s.quota
+        return t
+
+    def scatter(self, staff_objs):
+        """배정 결과(counts, total)를 원래 Staff 들에 쓴다"""
+        for i, s in enumerate(staff_objs):
+            s._t.counts[s._i][:] = self.counts[i]
+            s._t.total[s._i] = self.total[i]
+
+def table_of(staff_objs):
+    """staff_objs 가 한 StaffTable 의 뷰 전부(순서대로)면 그 표, 아니면 None"""
+    if not staff_objs:
+        return None
+    t = staff_objs[0]._t
+    if staff_objs is t.staff:
+        return t
+    if len(staff_objs) != len(t) or any(v._t is not t or v._i != k for k, v in enumerate(staff_objs)):
+        return None
+    return t
+
+class TypeCounts(Mapping):
+    """Staff.assigned_counts — 표 한 행을 dict 처럼 ({"1M": n, ...})"""
+    __slots__ = ("_row",)
+
+    def __init__(self, row):
+        self._row = row
+
+    def __getitem__(self, t):
+        return self._row[TYPE_INDEX[t]]
+
+    def __setitem__(self, t, v):
+        self._row[TYPE_INDEX[t]] = v
+
+    def __iter__(self):
+        return iter(TYPE_ORDER)
+
+    def __len__(self):
+        return len(TYPE_ORDER)
+
+    def __repr__(self):
+        return repr(dict(zip(TYPE_ORDER, self._row)))
+
+class Staff:
+    """
+    StaffTable 한 행의 뷰 (예전 Staff 와 같은 속성).
+    Staff(name) 처럼 혼자 만들면 1행짜리 표를 갖는다. copy.copy 는 표까지 떼어 복사.
+    """
+    __slots__ = ("_t", "_i", "_c")
+
+    def __init__(self, name, elig=None, table=None, idx=0):
+        if table is None:
+            # 자격 비트마스크 (TYPE_BIT 합). 안 주면 ALL_MASK (자격 설정은 읽지 않음).
+            table = StaffTable([name], None if elig is None else [elig], views=False)
+            table.staff.append(self)
+        self._t = table
+        self._i = idx
+        self._c = None
+
+    def __copy__(self):
+        t = StaffTable.gather([self])
+        return t.staff[0]
+
+    def __repr__(self):
+        return f"Staff({self.name!r}, q={self.quota}, {self.assigned_counts!r})"
+
+    @property
+    def name(self):
+        return self._t.names[self._i]
+
+    @property
+    def elig(self):
+        return self._t.elig[self._i]
+
+    @elig.setter
+    def elig(self, mask):
+        self._t.elig[self._i] = mask
+        self._t.manual[self._i] = bool(mask & MANUAL_MASK)
+
+    @property
+    def is_manual(self):
+        return self._t.manual[self._i]
+
+    @is_manual.setter
+    def is_manual(self, v):
+        self.elig = ALL_MASK if v else self.elig & ~MANUAL_MASK
+
+    @property
+    def assigned_counts(self):
+        if self._c is None:
+            self._c = TypeCounts(self._t.counts[self._i])
+        return self._c
+
+    @assigned_counts.setter
+    def assigned_counts(self, counts):
+        self._t.counts[self._i][:] = [counts.get(t, 0) for t in TYPE_ORDER]
+
+    @property
+    def total_assigned(self):
+        return self._t.total[self._i]
+
+    @total_assigned.setter
+    def total_assigned(self, v):
+        self._t.total[self._i] = v
+
+    @property
+    def weight_val(self):
+        return self._t.weight[self._i]
+
+    @weight_val.setter
+    def weight_val(self, v):
+        self._t.weight[self._i] = v
+
+    @property
+    def quota(self):
+        return self._t.quota[self._i]
+
+    @quota.setter
+    def quota(self, v):
+        self._t.quota[self._i] = v
+
+##############################################################
+# 히스토리 관리 (최근 3일, min_load 기록)
+#
+# 저장은 roadauto.history 의 SQLite 저장소가 맡는다.
+# 예전 random_history.json 은 처음 열 때 자동으로 옮겨진다.
+##############################################################
+HISTORY_DAYS = 3
+
+def load_history(today=None, store=None):
+    from .history import get_history_store
+    store = store or get_history_store()
+    with metrics.stage("history_load"):
+        return store.recent(today)
+
+def save_history(hist, store=None):
+    from .history import get_history_store
+    store = store or get_history_store()
+    with metrics.stage("history_save"):
+        store.replace(hist)
+
+def lucky_name_set(hist):
+    """hist(dict 리스트) 또는 이미 만든 이름 집합 → 이름 집합"""
+    if isinstance(hist, (set, frozenset)):
+        return hist
+    return {h["name"] for h in hist}
+
+def check_history_full(hist, current_staff_names):
+    # 근무자가 없으면 '한 바퀴' 가 아니다 (빈 집합은 항상 부분집합 → 히스토리를 지워 버림)
+    current_set = set(current_staff_names)
+    if not current_set:
+        return False
+    return current_set.issubset(lucky_name_set(hist))
+
+def is_lucky_recently(hist, name):
+    return name in lucky_name_set(hist)
+
+##############################################################
+# 자격 / 변속기
+##############################################################
+def eligible(staff_obj, typecode):
+    # 자격 비트마스크 (Staff.elig) 확인 — 설정은 roadauto.quals
+    return bool(staff_obj.elig & TYPE_BIT.get(typecode, 0))
+
+def get_transmission_type(typecode):
+    tr = TRANSMISSION.get(typecode)
+    if tr:
+        return tr
+    if "M" in typecode:
+        return "Manual"
+    if "A" in typecode:
+        return "Auto"
+    return "Unknown"
+
+##############################################################
+# 1단계: quota 계산 (공평성 + cap)
+##############################################################
+CAP_MAP = {1: 2, 2: 3, 3: 3, 4: 3, 5: 2}
+
+def ledger_rates(ledger, names, key="total"):
+    """
+    장기 원장 기준 교시당 평균 (key: "total" 또는 타입 "1M" 등) → names 순서 리스트.
+    ledger 는 HistoryStore.ledger_totals() 결과 (없으면 None → 전부 0).
+    기록이 없는 사람은 명단 평균으로 (새로 온 사람에게 몰리지 않게).
+    """
+    if not ledger:
+        return [0.0] * len(names)
+    rates = []
+    for nm in names:
+        a = ledger.get(nm)
+        rates.append(round(a[key] / a["periods"], 4) if a and a.get("periods") else None)
+    known = [r for r in rates if r is not None]
+    fill = round(sum(known) / len(known), 4) if known else 0.0
+    return [fill if r is None else r for r in rates]
+
+def compute_quota(staff_objs, period, total_demand, hist, rng=random, ledger=None, cap_map=None):
+    """
+    이번 교시(period)에 각 감독관이 맡을 총 차량 수(quota)를 계산.
+    - 배정 수 차이 최대 1 보장 (가능한 경우)
+    - 교시별 cap(1:2,2:3,3:3,4:3,5:2) 적용 — cap_map 을 주면 그 값 (센터별 설정)
+    - hist 는 히스토리 dict 리스트 또는 '행운' 이름 집합
+    - ledger 를 주면 '행운' 다음 동점 처리로 장기 교시당 평균 배정이 적은 사람 먼저
+    """
+    m = len(staff_objs)
+    if m == 0 or total_demand == 0:
+        return [0] * m, 0
+
+    cap = (cap_map or CAP_MAP).get(period, 3)
+    max_possible = m * cap
+    assignable = min(total_demand, max_possible)
+
+    base = assignable // m
+    rem = assignable % m
+    lucky = lucky_name_set(hist)  # 후보마다 O(1) 확인
+
+    quotas = [base] * m  # 일단 모두 base
+
+    # 남은 rem명을 한 명씩 +1.
+    # rem > 0 이면 base < cap 이고 한 사람이 두 번 받지 않으므로 후보는 늘 '아직 안 받은 사람'.
+    # (최근 3일 '행운' 없음, 장기 평균 적음) 순 묶음마다 그 안에서 랜덤 — 묶음을 한 번만 만든다.
+    if rem:
+        table = table_of(staff_objs)
+        names = table.names if table else [s.name for s in staff_objs]
+        rates = ledger_rates(ledger, names)
+        buckets = {}
+        for i, nm in enumerate(names):
+            buckets.setdefault((nm in lucky, rates[i]), []).append(i)
+        left = rem
+        for key in sorted(buckets):
+            pool = buckets[key]
+            while pool and left:
+                pick = rng.choice(pool)
+                pool.remove(pick)
+                quotas[pick] += 1
+                left -= 1
+            if not left:
+                break
+
+    return quotas, assignable
+
+##############################################################
+# 2단계: quota 안에서 타입(1M/1A/2A/2M) 배정
+##############################################################
+SOLVERS = ("greedy", "flow")
+
+# 타입별 변속기 (TYPE_ORDER 순): True = Manual
+_IS_MANUAL_TYPE = [TRANSMISSION[t] == "Manual" for t in TYPE_ORDER]
+
+def _greedy_types(table, quotas, demand, rate_1m):
+    """
+    그리디 타입 배정 (StaffTable 위에서, 반복마다 리스트/튜플을 만들지 않음).
+    한 바퀴마다 사람 순서대로 1대씩:
+    - 1M 자격이 있고 1M 수요가 남았으면 → 1M 몰아주기:
+      남은 quota 가 있는 1M 가능자 중 (1M 적음, 2A 적음, 가중치 없음, 장기 1M 비율 낮음) 첫 사람
+    - 아니면 자기 후보 타입 중 (섞임 벌점, 남은 수요 큰 순) 첫 타입
+    demand 는 남은 수요로 줄여서 돌려준다.
+    """
+    n = len(table)
+    cnt, tot, w, elig = table.counts, table.total, table.weight, table.elig
+    rq = list(quotas)
+    d = [demand.get(t, 0) for t in TYPE_ORDER]
+    bits = [TYPE_BIT[t] for t in TYPE_ORDER]
+    bit_1m = bits[0]
+    can_1m = [j for j in range(n) if elig[j] & bit_1m]
+    man = _IS_MANUAL_TYPE
+
+    loops = 0
+    while True:
+        progress = False
+        for i in range(n):
+            loops += 1
+            if rq[i] <= 0:
+                continue
+            e = elig[i]
+
+            # 1M 수요가 남아있으면, 먼저 1M 몰아주기 로직 적용
+            if d[0] > 0 and e & bit_1m:
+                best = -1
+                for j in can_1m:
+                    if rq[j] <= 0:
+                        continue
+                    r = cnt[j]
+                    if best < 0:
+                        best, b1, b2, bw, br = j, r[0], r[2], w[j], rate_1m[j]
+                        continue
+                    a1, a2 = r[0], r[2]
+                    if a1 != b1:
+                        better = a1 < b1
+                    elif a2 != b2:
+                        better = a2 < b2
+                    elif w[j] != bw:
+                        better = w[j] < bw
+                    else:
+                        better = rate_1m[j] < br
+                    if better:
+                        best, b1, b2, bw, br = j, a1, a2, w[j], rate_1m[j]
+                cnt[best][0] += 1
+                tot[best] += 1
+                rq[best] -= 1
+                d[0] -= 1
+                progress = True
+                continue  # 다음 사람으로
+
+            # 나머지 타입: (섞임 벌점, -남은 수요) 가 가장 작은 타입
+            r = cnt[i]
+            has_m = r[0] > 0 or r[3] > 0
+            has_a = r[1] > 0 or r[2] > 0
+            best_k, best_mix, best_d = -1, 0, 0
+            for k in range(4):
+                if d[k] <= 0 or not e & bits[k]:
+                    continue
+                if r[k] > 0 or not (has_m or has_a):
+                    mix = 0
+                elif has_m if man[k] else has_a:
+                    mix = 1    # 같은 변속기 다른 종
+                else:
+                    mix = 10   # Manual vs Auto 혼합
+                if best_k < 0 or mix < best_mix or (mix == best_mix and d[k] > best_d):
+                    best_k, best_mix, best_d = k, mix, d[k]
+            if best_k < 0:
+                continue
+            r[best_k] += 1
+            tot[i] += 1
+            rq[i] -= 1
+            d[best_k] -= 1
+            progress = True
+
+        if not progress:
+            break
+        if sum(d) <= 0:
+            break
+    metrics.count("types_loop", loops)
+    for k, t in enumerate(TYPE_ORDER):
+        if t in demand:
+            demand[t] = d[k]
+
+def assign_types_within_quota(staff_objs, period, quotas, demand, diags=None, solver="greedy",
+                              ledger=None, rate_1m=None):
+    """
+    이미 정해진 quota 안에서 종별/섞임/자격/가중치를 고려해 타입 배정.
+    - quota[i] 개수 이내에서만 배정 → 공평성 유지
+    - 1M는 가능한 한 한 사람(또는 소수)에게 몰아주는 방향
+      (ledger 를 주면 마지막 동점 처리로 장기 1M 비율이 낮은 사람 먼저)
+    - 수요를 다 못 채우면 diags 에 "partial_fill" 경고를 남긴다
+    - solver="flow" 이면 min-cost flow 로 최대 배정을 보장 (roadauto.solver)
+    - rate_1m: 사람별 장기 1M 비율을 직접 줄 때 (ledger_rates(ledger, 이름, "1M") 대신 — 시뮬레이터용)
+    """
+    if rate_1m is None:
+        rate_1m = ledger_rates(ledger, [s.name for s in staff_objs], "1M")
+    if solver == "flow":
+        from .solver import assign_types_flow
+        return assign_types_flow(staff_objs, period, quotas, demand, diags, rate_1m)
+    if solver != "greedy":
+        raise ValueError(f"unknown solver: {solver!r}")
+
+    total_before = sum(demand.values())
+    table = table_of(staff_objs)
+    gathered = table is None
+    if gathered:
+        table = StaffTable.gather(staff_objs)
+    _greedy_types(table, quotas, demand, rate_1m)
+    if gathered:
+        table.scatter(staff_objs)
+
+    total_assigned = sum(table.total)
+    if total_assigned < total_before:
+        add_diag(
+            diags, "warning", "partial_fill",
+            f"⚠️ 전체 수요 {total_before}명 중 {total_assigned}명만 배정되었습니다. "
+            "수동/자동 자격 및 종별 조합 제한으로 모든 수요를 채우지 못했습니다."
+        )
+
+    return staff_objs
+
+##############################################################
+# 가중치 (코스 담당 / 다음 교시 교양)
+##############################################################
+NEXT_EDU_PERIOD = {1: 2, 3: 4, 4: 5}
+
+def apply_weights(staff_objs, period, edu_map, course_list):
+    next_edu_name = edu_map.get(NEXT_EDU_PERIOD.get(period))
+    for s in staff_objs:
+        w = 0
+        if s.name in course_list:
+            w += 1
+        if next_edu_name and s.name == next_edu_name:
+            w += 1
+        if w > 1:
+            w = 1
+        s.weight_val = w
+    return staff_objs
+
+##############################################################
+# assign_logic 통합 (2단계 호출)
+##############################################################
+def assign_logic(staff_names, period, demand, edu_map, course_list, today=None,
+                 solver="greedy", store=None, commit=True, rng=None, seed=None, log=True,
+                 ledger=True, quals=None, center=None, cap_map=None):
+    """
+    반환: (staff_objs, hist, diags)
+    diags 는 add_diag 형식의 dict 리스트 (UI 가 알아서 표시).
+    solver: 2단계 타입 배정 방식 ("greedy" | "flow")
+    store: 히스토리 저장소 (기본: data/history.sqlite3)
+    commit: False 이면 히스토리를 건드리지 않는다 (미리보기 / what-if).
+            나중에 commit_assignment() 로 확정한다.
+    seed: quota 동점 추첨 시드 (없으면 새로 뽑는다). 같은 입력 + 같은 시드 = 같은 결과.
+    rng: 시드 대신 난수원을 직접 넘길 때 (이 경우 실행 기록의 seed 는 None → 재현 불가)
+    log: True 이면 입력/시드/결과를 store 의 runs 테이블에 남긴다 (replay.py 로 재현).
+         남기면 diags 에 "run_logged" (info) 가 붙는다.
+    ledger: True 이면 store 의 장기 원장 누적을 동점 처리에 쓴다 (quota +1, 1M 순서).
+            dict 를 주면 그 값을 그대로 (replay), False/None 이면 쓰지 않는다.
+            쓴 값은 실행 기록에 같이 남는다.
+    quals: 자격 설정 (roadauto.quals.Quals). 없으면 data/qualifications.json.
+           명단의 자격 비트마스크는 시작할 때 한 번 계산해서 모든 단계가 같이 쓴다.
+    center: 센터 (roadauto.centers.Center). 주면 store / quals / cap_map 의 기본값이
+            그 센터 것 (data/<센터>/). 없으면 예전 data/ 와 CAP_MAP.
+    cap_map: 교시별 cap (기본: 센터 설정 또는 CAP_MAP). 실행 기록에 같이 남는다.
+    """
+    from .history import get_history_store
+    from .runlog import new_seed, make_record
+    if center is not None:
+        store = store or center.store()
+        quals = quals or center.quals()
+        cap_map = cap_map or center.cap_map
+    store = store or get_history_store()
+    cap_map = cap_map or CAP_MAP
+    diags = []
+    today = today or date.today()
+    if rng is None:
+        seed = new_seed() if seed is None else seed
+        rng = random.Random(seed)
+    else:
+        seed = None
+
+    with metrics.run("assign"):
+        # 0) Staff 객체 (자격 비트마스크) 및 가중치 세팅
+        if quals is None:
+            from .quals import load_quals
+            quals = load_quals()
+        masks = quals.masks(staff_names)
+        staff_objs = StaffTable(staff_names, masks).staff
+        apply_weights(staff_objs, period, edu_map, course_list)
+
+        total_demand = sum(demand.values())
+
+        # 읽기 → quota → 기록 추가를 한 트랜잭션으로 (다른 세션/프로세스와 직렬화)
+        with store.transaction():
+            with metrics.stage("history_load"):
+                store.prune(today)
+                lucky = store.lucky_names(today)
+            snapshot = lucky
+            if ledger is True:
+                with metrics.stage("ledger_load"):
+                    ledger = store.ledger_totals(staff_names)
+            ledger = ledger or None
+            reset = check_history_full(lucky, staff_names)
+            if reset:
+                lucky = set()
+                add_diag(diags, "toast", "history_reset", "🔄 랜덤 히스토리가 한 바퀴 돌아 초기화되었습니다.")
+
+            # 1단계: quota 계산
+            with metrics.stage("quota"):
+                quotas, assignable = compute_quota(staff_objs, period, total_demand, lucky, rng, ledger, cap_map)
+            for s, q in zip(staff_objs, quotas):
+                s.quota = q
+            if assignable < total_demand:
+                add_diag(
+                    diags, "error", "over_capacity",
+                    f"🚨 이 교시 최대 처리 가능 인원({assignable}명)을 초과하는 수요({total_demand}명)가 있습니다. "
+                    "근무자 수 또는 교시별 최대 배정 인원을 확인하세요."
+                )
+
+            # 2단계: quota 안에서 타입 배정
+            demand_copy = dict(demand)
+            with metrics.stage("types"):
+                staff_objs = assign_types_within_quota(
+                    staff_objs, period, quotas, demand_copy, diags, solver, ledger
+                )
+
+            if log:
+                with metrics.stage("run_log"):
+                    run_id = store.log_run(make_record(
+                        staff_names, period, demand, edu_map, course_list, today, solver, seed,
+                        snapshot, staff_objs, diags, ledger, masks, cap_map,
+                    ))
+                add_diag(diags, "info", "run_logged", f"실행 기록 #{run_id} (시드 {seed})", run_id=run_id)
+
+            if commit:
+                commit_assignment(staff_objs, store, today, reset, period)
+
+            # 같은 트랜잭션 안에서 읽는다 → commit=False 면 quota 가 본 히스토리 그대로
+            # (commit_assignment(snapshot=hist) 로 확정할 때 그사이 바뀌었는지 비교)
+            with metrics.stage("history_recent"):
+                hist = store.recent(today)
+    return staff_objs, hist, diags
+
+##############################################################
+# 히스토리 확정 (가중치 받은 사람은 제외한 min_load 기록)
+##############################################################
+def lucky_entries(staff_objs, today=None):
+    if not staff_objs:
+        return []
+    today_str = (today or date.today()).isoformat()
+    min_assigned = min(s.total_assigned for s in staff_objs)
+    return [
+        {"date": today_str, "name": s.name, "type": "min_load"}
+        for s in staff_objs
+        if s.total_assigned == min_assigned and s.weight_val == 0
+    ]
+
+def ledger_entries(staff_objs):
+    """장기 원장에 넣을 한 교시 결과 (HistoryStore.ledger_put 의 rows)"""
+    return [
+        {"name": s.name, **s.assigned_counts, "quota": s.quota, "weight": s.weight_val}
+        for s in staff_objs
+    ]
+
+class StaleHistoryError(RuntimeError):
+    """미리보기 뒤에 다른 세션이 히스토리를 바꿔서, 그 결과로는 확정할 수 없음 (다시 실행해야 함)"""
+
+def commit_assignment(staff_objs, store=None, today=None, reset=False, period=None, snapshot=None):
+    """
+    배정 결과를 히스토리에 기록 (INSERT 만).
+    reset: 히스토리가 한 바퀴 돌았으면 먼저 비운다 (diags 의 "history_reset").
+    period: 주면 장기 원장(ledger)과 짝 기록(pairs)에도 같은 트랜잭션으로 기록한다.
+            짝은 make_pairing_text(staff_objs, store.pair_counts(today, period)) 와 같다.
+    snapshot: 미리보기 때의 히스토리 (assign_logic(commit=False) 가 돌려준 hist).
+              주면 확정 트랜잭션 안에서 히스토리를 다시 읽어, 그사이 다른 세션이 바꿨으면
+              아무것도 쓰지 않고 StaleHistoryError. reset 도 지금 히스토리로 다시 판단한다.
+              (안 주면 미리보기~확정 사이의 다른 확정을 reset 이 지울 수 있다)
+    """
+    from .history import get_history_store
+    from .pairing import pair_staff, pair_list
+    if not staff_objs:
+        # 근무자가 없으면 아무것도 쓰지 않는다 (reset 으로 히스토리를 비우지도 않음)
+        return []
+    store = store or get_history_store()
+    today = today or date.today()
+    entries = lucky_entries(staff_objs, today)
+    with metrics.stage("history_save"), store.transaction():
+        if snapshot is not None:
+            store.prune(today)
+            hist = store.recent(today)
+            if hist != list(snapshot):
+                raise StaleHistoryError(
+                    "미리보기 뒤에 다른 곳에서 히스토리가 바뀌었습니다. 배정을 다시 실행한 뒤 확정하세요."
+                )
+            reset = check_history_full(hist, [s.name for s in staff_objs])
+        if reset:
+            store.clear()
+        store.append(entries)
+        if period is not None:
+            day = today.isoformat()
+            store.ledger_put(day, period, ledger_entries(staff_objs))
+            store.pair_put(day, period, pair_list(pair_staff(staff_objs, store.pair_counts(today, period))))
+    return entries
+
+##############################################################
+# 페어링 문자열
+##############################################################
+def make_pairing_text(staff_objs, counts=None):
+    """
+    페어링 문자열 리스트. 짝 고르기는 roadauto.pairing (최소 비용 매칭).
+    counts: 최근 짝 기록 (HistoryStore.pair_counts) — 주면 반복 짝을 피한다.
+    """
+    from .pairing import pair_staff, pairing_lines
+    return pairing_lines(pair_staff(staff_objs, counts))
+
+##############################################################
+# 결과 요약 (UI/배치 공용, pandas 없이 dict 리스트)
+##############################################################
+def result_rows(staff_objs):
+    rows = []
+    for s in staff_objs:
+        details = []
+        for k, v in s.assigned_counts.items():
+            if v > 0:
+                details.append(f"{k}:{v}")
+        rows.append({
+            "이름": s.name,
+            "총 배정": s.total_assigned,
+            "상세": ", ".join(details) if details else "-",
+            "비고": "가중치 적용" if s.weight_val > 0 else ""
+        })
+    return rows
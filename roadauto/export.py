@@ -0,0 +1,270 @@
+##############################################################
+# export.py — 배정 결과 내보내기 (메신저 메시지 / CSV / XLSX / Parquet)
+#
+#   python -m roadauto.export --day 2026-10-17 --out day.csv
+#   python -m roadauto.export --month 2026-10 --out oct.xlsx [--center busan]
+#   python -m roadauto.export --since 2026-01-01 --until 2026-06-30 --out h1.parquet
+#
+# 행 하나 = 한 교시 한 사람 (EXPORT_COLUMNS 순, 원장 ledger 행과 같은 모양).
+# - 방금 배정한 결과: StaffTable 평행 리스트에서 바로 튜플을 만든다 (pandas / dict 없음)
+# - 하루 / 한 달 일괄: 원장(ledger)을 HistoryStore.ledger_iter 로 조금씩 읽어
+#   그대로 파일에 흘려 쓴다 → 행 리스트를 메모리에 다 만들지 않는다.
+# XLSX 는 openpyxl write-only 모드, Parquet 은 pyarrow (row group 단위) — 둘 다 선택 의존성.
+##############################################################
+
+import io, os, sys, csv, argparse, calendar, importlib.util
+from datetime import date
+
+from .engine import TYPE_ORDER, StaffTable, table_of
+from . import metrics
+
+EXPORT_COLUMNS = ["date", "period", "name", *TYPE_ORDER, "total", "quota", "weight"]
+ROW_GROUP = 50_000          # Parquet row group 행 수 (이만큼씩 모아서 쓴다)
+# Parquet 열 타입 (pyarrow 타입 이름). batch 의 OUT_COLUMNS 추가 열도 여기에
+PARQUET_TYPES = {
+    "date": "string", "period": "int8", "name": "string", **{t: "int16" for t in TYPE_ORDER},
+    "total": "int16", "quota": "int16", "weight": "int8", "min_load": "int8", "diags": "string",
+}
+
+# 메신저용 메시지. 필드: {date} {period} {center} {count} {rows} {pairs}
+MESSAGE_TEMPLATE = "[{date} {period}교시 도로주행 배정{center}]\n{rows}\n\n[페어링]\n{pairs}"
+# 사람 한 줄. 필드: {name} {total} {quota} {detail} {note} + 타입별 대수 {1M} {1A} {2A} {2M}
+ROW_TEMPLATE = "- {name}: {detail}{note}"
+PAIR_TEMPLATE = "- {line}"
+
+##############################################################
+# 행 만들기
+##############################################################
+def staff_rows(staff_objs, period, day):
+    """한 교시 배정 결과 → 출력 행 튜플 (EXPORT_COLUMNS 순)"""
+    t = table_of(staff_objs)
+    if t is None:
+        t = StaffTable.gather(staff_objs)
+    for name, c, total, quota, weight in zip(t.names, t.counts, t.total, t.quota, t.weight):
+        yield (day, period, name, c[0], c[1], c[2], c[3], total, quota, weight)
+
+def plan_rows(plan, day):
+    """planner.plan_day 결과 → 교시 순 출력 행"""
+    for p, staff_objs in plan["periods"].items():
+        yield from staff_rows(staff_objs, p, day)
+
+def month_range(month):
+    """"YYYY-MM" → (첫날, 마지막 날) ISO 문자열"""
+    y, m = (int(x) for x in month.split("-"))
+    return date(y, m, 1).isoformat(), date(y, m, calendar.monthrange(y, m)[1]).isoformat()
+
+def ledger_rows(store, day=None, month=None, since=None, until=None):
+    """원장에서 하루 / 한 달 / 기간 행을 흘려 읽기 (순서: 날짜·교시·이름)"""
+    if day:
+        since = until = day
+    elif month:
+        since, until = month_range(month)
+    return store.ledger_iter(since, until)
+
+##############################################################
+# 메시지
+##############################################################
+def _detail(row):
+    parts = [f"{t}:{v}" for t, v in zip(TYPE_ORDER, row[3:7]) if v > 0]
+    return ", ".join(parts) if parts else "-"
+
+def render_message(staff_objs, period, day=None, pairing=None, center=None,
+                   template=MESSAGE_TEMPLATE, row_template=ROW_TEMPLATE, pair_template=PAIR_TEMPLATE):
+    """
+    한 교시 결과 → 메신저에 붙일 글.
+    pairing: pair_staff 결과 (없으면 짝 기록 없이 새로 짝짓기). center: 표시할 센터 이름.
+    템플릿에 모르는 필드가 있으면 ValueError.
+    """
+    from .pairing import pair_staff, pairing_lines
+    day = day or date.today().isoformat()
+    if pairing is None:
+        pairing = pair_staff(staff_objs)
+    try:
+        rows = [
+            row_template.format(
+                name=r[2], total=r[7], quota=r[8], detail=_detail(r), note=" (가중치)" if r[9] else "",
+                **dict(zip(TYPE_ORDER, r[3:7])),
+            )
+            for r in staff_rows(staff_objs, period, day)
+        ]
+        pairs = [pair_template.format(line=line) for line in pairing_lines(pairing)]
+        return template.format(
+            date=day, period=period, center=f" · {center}" if center else "",
+            count=len(rows), rows="\n".join(rows), pairs="\n".join(pairs) or "-",
+        )
+    except (KeyError, IndexError) as e:
+        raise ValueError(f"메시지 템플릿에 모르는 필드: {e}") from None
+
+def render_day_message(plan, pairings, day=None, center=None, **templates):
+    """하루 계획 → 교시별 메시지를 빈 줄로 이어 붙인 글"""
+    return "\n\n".join(
+        render_message(staff_objs, p, day, pairings.get(p), center, **templates)
+        for p, staff_objs in plan["periods"].items()
+    )
+
+##############################################################
+# 파일 쓰기 (rows 는 한 번만 훑는다 — 제너레이터 그대로 넘겨도 됨)
+##############################################################
+def write_csv(rows, f):
+    """f: 바이너리 파일. 엑셀에서 한글이 깨지지 않게 UTF-8 BOM."""
+    w = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+    try:
+        out = csv.writer(w)
+        out.writerow(EXPORT_COLUMNS)
+        n = 0
+        for r in rows:
+            out.writerow(r)
+            n += 1
+    finally:
+        w.flush()
+        w.detach()
+    return n
+
+def write_xlsx(rows, f, sheet="배정"):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ImportError("XLSX 출력에는 openpyxl 이 필요합니다: pip install openpyxl")
+    wb = Workbook(write_only=True)      # 행을 바로 임시 파일로 흘려 쓴다 (셀 객체를 들고 있지 않음)
+    ws = wb.create_sheet(sheet)
+    ws.append(EXPORT_COLUMNS)
+    n = 0
+    for r in rows:
+        ws.append(r)
+        n += 1
+    wb.save(f)
+    return n
+
+class ParquetSink:
+    """
+    Parquet 스트리밍 쓰기 (pyarrow 필요). 행을 row_group 개씩 모아 row group 하나로 쓴다
+    (조금씩 write 해도 작은 그룹이 안 생김). columns 의 타입은 PARQUET_TYPES —
+    export 는 EXPORT_COLUMNS, batch 는 OUT_COLUMNS 로 같은 writer 를 쓴다.
+    """
+    def __init__(self, f, columns=EXPORT_COLUMNS, row_group=ROW_GROUP):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet 출력에는 pyarrow 가 필요합니다: pip install pyarrow")
+        self.pa = pa
+        self.schema = pa.schema([(c, getattr(pa, PARQUET_TYPES[c])()) for c in columns])
+        self.w = pq.ParquetWriter(f, self.schema)
+        self.row_group = row_group
+        self.buf = []
+        self.n = 0
+
+    def add(self, row):
+        self.buf.append(row)
+        if len(self.buf) >= self.row_group:
+            self.flush()
+
+    def write(self, rows):
+        """행 리스트 (batch 의 하루치처럼 이미 만든 묶음)"""
+        self.buf.extend(rows)
+        if len(self.buf) >= self.row_group:
+            self.flush()
+
+    def flush(self):
+        if not self.buf:
+            return
+        cols = list(zip(*self.buf))
+        self.n += len(self.buf)
+        self.buf = []
+        self.w.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(c, type=fld.type) for c, fld in zip(cols, self.schema)], schema=self.schema,
+        ))
+
+    def close(self):
+        try:
+            self.flush()
+            if not self.n:
+                self.w.write_table(self.schema.empty_table())
+        finally:
+            self.w.close()
+
+def write_parquet(rows, f, row_group=ROW_GROUP):
+    sink = ParquetSink(f, EXPORT_COLUMNS, row_group)
+    try:
+        for r in rows:
+            sink.add(r)
+    finally:
+        sink.close()
+    return sink.n
+
+# 형식 → (쓰기 함수, 확장자, MIME, 필요한 패키지)
+FORMATS = {
+    "csv": (write_csv, "csv", "text/csv", None),
+    "xlsx": (write_xlsx, "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "openpyxl"),
+    "parquet": (write_parquet, "parquet", "application/vnd.apache.parquet", "pyarrow"),
+}
+
+def available_formats():
+    """지금 쓸 수 있는 형식 (선택 의존성이 설치된 것만)"""
+    return [k for k, v in FORMATS.items() if v[3] is None or importlib.util.find_spec(v[3])]
+
+def export_rows(rows, fmt, f):
+    """rows 를 fmt 형식으로 바이너리 파일 f 에 쓴다. 반환: 행 수"""
+    if fmt not in FORMATS:
+        raise ValueError(f"모르는 형식: {fmt!r} ({', '.join(FORMATS)})")
+    with metrics.stage(f"export_{fmt}"):
+        n = FORMATS[fmt][0](rows, f)
+    metrics.count("export_rows", n)
+    return n
+
+def to_bytes(rows, fmt):
+    """한 교시 / 하루처럼 작은 결과용 (다운로드 버튼에 바로 넘길 bytes)"""
+    buf = io.BytesIO()
+    export_rows(rows, fmt, buf)
+    return buf.getvalue()
+
+def file_name(stem, fmt):
+    return f"{stem}.{FORMATS[fmt][1]}"
+
+def mime(fmt):
+    return FORMATS[fmt][2]
+
+##############################################################
+# main
+##############################################################
+def main(argv=None):
+    from .centers import get_center
+    from .history import HistoryStore
+
+    ap = argparse.ArgumentParser(description="확정 배정 원장 내보내기 (CSV / XLSX / Parquet)")
+    span = ap.add_mutually_exclusive_group(required=True)
+    span.add_argument("--day", help="YYYY-MM-DD 하루")
+    span.add_argument("--month", help="YYYY-MM 한 달")
+    span.add_argument("--since", help="YYYY-MM-DD 부터 (--until 까지)")
+    ap.add_argument("--until", default=None)
+    ap.add_argument("--out", required=True, help="결과 파일 (확장자로 형식 추정)")
+    ap.add_argument("--format", choices=list(FORMATS), default=None)
+    ap.add_argument("--center", default=None, help="센터 키 (그 센터의 히스토리 DB)")
+    ap.add_argument("--db", default=None, help="히스토리 DB 직접 지정")
+    args = ap.parse_args(argv)
+
+    fmt = args.format or os.path.splitext(args.out)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        ap.error(f"형식을 알 수 없습니다: {args.out} (--format {'/'.join(FORMATS)})")
+    try:
+        if args.month:
+            month_range(args.month)
+        for d in (args.day, args.since, args.until):
+            if d:
+                date.fromisoformat(d)
+    except ValueError as e:
+        ap.error(f"날짜 형식: {e}")
+
+    store = HistoryStore(args.db, None) if args.db else get_center(args.center).store()
+    rows = ledger_rows(store, args.day, args.month, args.since, args.until)
+    try:
+        with open(args.out, "wb") as f:
+            n = export_rows(rows, fmt, f)
+    except ImportError as e:
+        os.remove(args.out)
+        raise SystemExit(str(e))
+    print(f"[export] {n}행 → {args.out}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,521 @@
+##############################################################
+# history.py — 랜덤 히스토리 저장소 (SQLite, data/history.sqlite3)
+#
+# - (name, date) / (date) 인덱스 → "최근 행운?" 조회가 전체 스캔 없이 끝남
+# - 3일 창 밖의 기록은 DB 안에서 DELETE 로 정리
+# - 기록 추가는 INSERT 만 (파일 전체 재작성 없음)
+# - 예전 random_history.json 이 있으면 처음 열 때 자동으로 옮겨온다
+#
+# 동시성 (여러 세션 / 여러 프로세스)
+# - WAL 저널 + BEGIN IMMEDIATE: 쓰기 트랜잭션은 DB 파일 락으로 직렬화된다.
+#   assign_logic 의 "읽기 → quota → 기록 추가" 전체를 transaction() 으로
+#   묶어서 lost update 가 나지 않는다.
+# - 커밋은 원자적이라 중간에 죽어도 반쯤 쓴 기록이 남지 않는다.
+#   (다음 open 때 SQLite 가 WAL 을 보고 자동 복구)
+# - 파일 자체가 깨진 경우 → .corrupt-<시각> 으로 옮겨 두고 새 DB 로 시작
+#   (잠김 / 권한 같은 OperationalError 는 깨진 게 아니므로 치우지 않고 그대로 오류)
+#
+# runs 테이블: assign_logic 실행 기록 (재현/검증용, runlog.py / replay.py)
+# ledger 테이블: 확정된 배정 결과 (날짜, 교시, 사람마다 한 줄, 타입별 열)
+#   ledger_agg 에 사람별 누적을 같은 트랜잭션에서 증분으로 더해 둔다
+#   → 장기 공평성 동점 처리가 사람마다 O(1) (전체 집계 쿼리 없음)
+# pairs 테이블: 확정된 페어링 (최근 PAIR_DAYS 일만 남김, 반복 짝 피하기용 — pairing.py)
+##############################################################
+
+import os, json, sqlite3, threading, time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from .engine import DATA_DIR, HISTORY_FILE, HISTORY_DAYS
+from .pairing import PAIR_DAYS
+from . import metrics
+
+HISTORY_DB = os.path.join(DATA_DIR, "history.sqlite3")
+
+LEDGER_TYPES = ["1M", "1A", "2A", "2M"]
+LEDGER_PERIODS = [1, 2, 3, 4, 5]
+# ledger_agg 한 행 = 사람 한 명의 누적 (이 순서로 읽고 쓴다)
+LEDGER_AGG_COLS = (
+    ["periods", "total"] + [f"n{t}" for t in LEDGER_TYPES] + ["weighted"]
+    + [f"p{p}" for p in LEDGER_PERIODS]
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id   INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL DEFAULT 'min_load'
+);
+CREATE INDEX IF NOT EXISTS idx_history_name_date ON history(name, date);
+CREATE INDEX IF NOT EXISTS idx_history_date ON history(date);
+
+-- 배정 실행 기록 (runlog.pack 한 blob). 히스토리 정리/초기화와 무관하게 남는다.
+CREATE TABLE IF NOT EXISTS runs (
+    id     INTEGER PRIMARY KEY AUTOINCREMENT,
+    day    TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    seed   INTEGER,
+    digest TEXT NOT NULL,
+    data   BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_day ON runs(day);
+
+-- 확정 배정 원장. 같은 (day, period) 를 다시 확정하면 통째로 바뀐다.
+CREATE TABLE IF NOT EXISTS ledger (
+    day    TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    name   TEXT NOT NULL,
+    n1M    INTEGER NOT NULL DEFAULT 0,
+    n1A    INTEGER NOT NULL DEFAULT 0,
+    n2A    INTEGER NOT NULL DEFAULT 0,
+    n2M    INTEGER NOT NULL DEFAULT 0,
+    total  INTEGER NOT NULL DEFAULT 0,
+    quota  INTEGER NOT NULL DEFAULT 0,
+    weight INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, period, name)
+);
+
+-- 사람별 누적 (ledger 를 쓸 때마다 같이 갱신)
+CREATE TABLE IF NOT EXISTS ledger_agg (
+    name     TEXT PRIMARY KEY,
+    periods  INTEGER NOT NULL DEFAULT 0,
+    total    INTEGER NOT NULL DEFAULT 0,
+    n1M      INTEGER NOT NULL DEFAULT 0,
+    n1A      INTEGER NOT NULL DEFAULT 0,
+    n2A      INTEGER NOT NULL DEFAULT 0,
+    n2M      INTEGER NOT NULL DEFAULT 0,
+    weighted INTEGER NOT NULL DEFAULT 0,
+    p1 INTEGER NOT NULL DEFAULT 0, p2 INTEGER NOT NULL DEFAULT 0, p3 INTEGER NOT NULL DEFAULT 0,
+    p4 INTEGER NOT NULL DEFAULT 0, p5 INTEGER NOT NULL DEFAULT 0,
+    last_day TEXT
+);
+
+-- 확정된 짝 (a <= b). 같은 (day, period) 를 다시 확정하면 바뀐다.
+CREATE TABLE IF NOT EXISTS pairs (
+    day    TEXT NOT NULL,
+    period INTEGER NOT NULL,
+    a      TEXT NOT NULL,
+    b      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pairs_day ON pairs(day, period);
+"""
+
+def window_start(today=None):
+    """3일 창의 시작일 (ISO 문자열). 이 날짜 이상이면 유효한 기록."""
+    today = today or date.today()
+    return (today - timedelta(days=HISTORY_DAYS)).isoformat()
+
+##############################################################
+# HistoryStore
+##############################################################
+class HistoryStore:
+    def __init__(self, path=HISTORY_DB, legacy_json=HISTORY_FILE, timeout=30.0):
+        self.path = path
+        self.legacy_json = legacy_json
+        self.timeout = timeout     # 다른 프로세스가 쓰는 중이면 최대 이만큼 기다림
+        self.recovered = None      # 깨진 DB 를 옮겨 둔 경로 (복구가 일어난 경우)
+        self._conn = None
+        self._lock = threading.RLock()
+        self._tx_depth = 0
+
+    # ---------------------------------------------------------
+    # 연결 / 복구 / 마이그레이션
+    # ---------------------------------------------------------
+    def conn(self):
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    d = os.path.dirname(self.path)
+                    if d:
+                        os.makedirs(d, exist_ok=True)
+                    try:
+                        c = self._open()
+                    except sqlite3.OperationalError:
+                        # 잠김(다른 프로세스가 쓰는 중) / 권한 / 열 수 없음 → 파일은 멀쩡할 수 있다.
+                        # 치우면 멀쩡한 기록을 잃으므로 그대로 올려 보낸다.
+                        raise
+                    except sqlite3.DatabaseError:
+                        # 파일이 DB 가 아님 / quick_check 실패 → 깨진 파일만 치운다
+                        self._quarantine()
+                        c = self._open()
+                    self._conn = c
+                    with self.transaction():
+                        self._migrate_json()
+        return self._conn
+
+    def _open(self):
+        # isolation_level=None → 트랜잭션은 transaction() 에서 직접 연다
+        c = sqlite3.connect(
+            self.path, timeout=self.timeout,
+            isolation_level=None, check_same_thread=False
+        )
+        try:
+            c.execute("PRAGMA journal_mode=WAL")
+            c.execute("PRAGMA synchronous=FULL")
+            if c.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                raise sqlite3.DatabaseError("quick_check failed")
+            c.executescript(SCHEMA)
+        except:
+            c.close()
+            raise
+        return c
+
+    def _quarantine(self):
+        """깨진 DB 파일(및 -wal/-shm)을 옆으로 치우고 새로 시작"""
+        stamp = time.strftime("%Y%m%d%H%M%S")
+        self.recovered = f"{self.path}.corrupt-{stamp}"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.replace(self.path + suffix, self.recovered + suffix)
+
+    def _migrate_json(self):
+        """
+        random_history.json → history 테이블 (한 번만, 원본은 .migrated 로 보관)
+        트랜잭션 안에서 돌아서 여러 프로세스가 동시에 열어도 한 번만 옮긴다.
+        JSON 이 잘려 있으면 비었다고 치지 않고 .corrupt 로 남겨 둔다.
+        """
+        src = self.legacy_json
+        if not src or not os.path.exists(src):
+            return
+        try:
+            with open(src, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except ValueError:
+            os.replace(src, src + ".corrupt")
+            return
+        rows = []
+        for h in raw if isinstance(raw, list) else []:
+            try:
+                date.fromisoformat(h["date"])
+                rows.append((h["date"], h["name"], h.get("type", "min_load")))
+            except:
+                pass
+        self._conn.executemany(
+            "INSERT INTO history(date, name, type) VALUES (?, ?, ?)", rows
+        )
+        os.replace(src, src + ".migrated")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------------------------------------------------------
+    # 트랜잭션
+    # ---------------------------------------------------------
+    @contextmanager
+    def transaction(self):
+        """
+        쓰기 트랜잭션 (중첩 가능). 바깥 트랜잭션이 끝날 때 한 번에 커밋한다.
+        같은 프로세스의 다른 스레드는 RLock 으로, 다른 프로세스는
+        BEGIN IMMEDIATE 의 DB 락으로 기다린다.
+        """
+        with self._lock:
+            c = self._conn if self._conn is not None else self.conn()
+            if self._tx_depth == 0:
+                c.execute("BEGIN IMMEDIATE")
+            self._tx_depth += 1
+            try:
+                yield c
+            except:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    c.execute("ROLLBACK")
+                raise
+            else:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    c.execute("COMMIT")
+
+    def compact(self):
+        """WAL 내용을 본 파일에 합치고 WAL 을 비운다 (관리용)"""
+        with self._lock:
+            self.conn().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def integrity_ok(self):
+        with self._lock:
+            return self.conn().execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+
+    # ---------------------------------------------------------
+    # 조회
+    # ---------------------------------------------------------
+    def recent(self, today=None):
+        """최근 3일 기록 (load_history 와 같은 dict 리스트)"""
+        with self._lock:
+            cur = self.conn().execute(
+                "SELECT date, name, type FROM history WHERE date >= ? ORDER BY id",
+                (window_start(today),)
+            )
+            rows = [{"date": d, "name": n, "type": t} for d, n, t in cur]
+        metrics.count("history_rows", len(rows))
+        return rows
+
+    def lucky_names(self, today=None):
+        """최근 3일 안에 '행운' 기록이 있는 이름 집합 → 후보마다 O(1) 확인"""
+        with self._lock:
+            cur = self.conn().execute(
+                "SELECT DISTINCT name FROM history WHERE date >= ?",
+                (window_start(today),)
+            )
+            names = {n for (n,) in cur}
+        metrics.count("history_lucky_names", len(names))
+        return names
+
+    def is_lucky(self, name, today=None):
+        with self._lock:
+            cur = self.conn().execute(
+                "SELECT 1 FROM history WHERE name = ? AND date >= ? LIMIT 1",
+                (name, window_start(today))
+            )
+            return cur.fetchone() is not None
+
+    def count(self):
+        with self._lock:
+            return self.conn().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    # ---------------------------------------------------------
+    # 쓰기 (모두 transaction 안에서)
+    # ---------------------------------------------------------
+    def append(self, entries):
+        """entries: [{"date", "name", "type"}] — INSERT 만 한다."""
+        rows = [(h["date"], h["name"], h.get("type", "min_load")) for h in entries]
+        if not rows:
+            return
+        with self.transaction() as c:
+            c.executemany(
+                "INSERT INTO history(date, name, type) VALUES (?, ?, ?)", rows
+            )
+
+    def prune(self, today=None):
+        """3일 창 밖의 기록 삭제. 삭제한 행 수를 돌려준다."""
+        with self.transaction() as c:
+            cur = c.execute("DELETE FROM history WHERE date < ?", (window_start(today),))
+            return cur.rowcount
+
+    def clear(self):
+        with self.transaction() as c:
+            c.execute("DELETE FROM history")
+
+    def replace(self, hist):
+        """save_history(hist) 호환: 전체를 hist 로 교체"""
+        with self.transaction() as c:
+            c.execute("DELETE FROM history")
+            c.executemany(
+                "INSERT INTO history(date, name, type) VALUES (?, ?, ?)",
+                [(h["date"], h["name"], h.get("type", "min_load")) for h in hist]
+            )
+
+    # ---------------------------------------------------------
+    # 실행 기록 (runs)
+    # ---------------------------------------------------------
+    def log_run(self, record):
+        """runlog.make_record 결과를 한 줄로 저장. 새 id 를 돌려준다."""
+        from .runlog import pack
+        with self.transaction() as c:
+            cur = c.execute(
+                "INSERT INTO runs(day, period, seed, digest, data) VALUES (?, ?, ?, ?, ?)",
+                (record["day"], record["period"], record["seed"], record["digest"], pack(record))
+            )
+            return cur.lastrowid
+
+    def runs(self, day=None, since=None, ids=None):
+        """
+        실행 기록 레코드 리스트 (id 순). 각 레코드에 "id" 키가 붙는다.
+        day: 그날만 / since: 그날 이후 / ids: 특정 id 들
+        """
+        from .runlog import unpack
+        sql, args = "SELECT id, data FROM runs WHERE 1=1", []
+        if day:
+            sql += " AND day = ?"
+            args.append(day)
+        if since:
+            sql += " AND day >= ?"
+            args.append(since)
+        if ids:
+            sql += f" AND id IN ({','.join('?' * len(ids))})"
+            args.extend(ids)
+        with self._lock:
+            cur = self.conn().execute(sql + " ORDER BY id", args)
+            out = []
+            for run_id, blob in cur:
+                rec = unpack(blob)
+                rec["id"] = run_id
+                out.append(rec)
+            return out
+
+    def run_days(self, limit=60):
+        """기록이 있는 날짜와 건수 (최근 순)"""
+        with self._lock:
+            cur = self.conn().execute(
+                "SELECT day, COUNT(*) FROM runs GROUP BY day ORDER BY day DESC LIMIT ?", (limit,)
+            )
+            return cur.fetchall()
+
+    # ---------------------------------------------------------
+    # 장기 원장 (ledger / ledger_agg)
+    # ---------------------------------------------------------
+    def _agg_add(self, c, rows, sign, day):
+        """ledger 행들을 ledger_agg 에 sign(+1/-1) 으로 반영 (UPSERT)"""
+        cols = ", ".join(LEDGER_AGG_COLS)
+        marks = ", ".join("?" * len(LEDGER_AGG_COLS))
+        sets = ", ".join(f"{k} = {k} + excluded.{k}" for k in LEDGER_AGG_COLS)
+        args = []
+        for period, name, n1m, n1a, n2a, n2m, total, weight in rows:
+            per_p = [total if p == period else 0 for p in LEDGER_PERIODS]
+            vals = [1, total, n1m, n1a, n2a, n2m, 1 if weight else 0] + per_p
+            args.append((name, *(sign * v for v in vals), day))
+        c.executemany(
+            f"INSERT INTO ledger_agg(name, {cols}, last_day) VALUES (?, {marks}, ?) "
+            f"ON CONFLICT(name) DO UPDATE SET {sets}, "
+            "last_day = MAX(COALESCE(last_day, ''), excluded.last_day)",
+            args
+        )
+
+    def ledger_put(self, day, period, rows):
+        """
+        한 교시 확정 결과를 원장에 기록.
+        rows: [{"name", "1M", "1A", "2A", "2M", "quota", "weight"}]
+        같은 (day, period) 가 이미 있으면 그 기록을 누적에서 빼고 새 결과로 바꾼다.
+        """
+        new = [
+            (period, r["name"], *(r.get(t, 0) for t in LEDGER_TYPES),
+             sum(r.get(t, 0) for t in LEDGER_TYPES), r.get("quota", 0), r.get("weight", 0))
+            for r in rows
+        ]
+        with self.transaction() as c:
+            old = c.execute(
+                "SELECT period, name, n1M, n1A, n2A, n2M, total, weight "
+                "FROM ledger WHERE day = ? AND period = ?", (day, period)
+            ).fetchall()
+            if old:
+                self._agg_add(c, old, -1, day)
+                c.execute("DELETE FROM ledger WHERE day = ? AND period = ?", (day, period))
+            c.executemany(
+                "INSERT INTO ledger(day, period, name, n1M, n1A, n2A, n2M, total, quota, weight) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(day, *r) for r in new]
+            )
+            self._agg_add(c, [r[:7] + r[8:] for r in new], +1, day)
+        metrics.count("ledger_rows", len(new))
+
+    def ledger_totals(self, names=None):
+        """
+        사람별 누적 {이름: {"periods", "total", "1M", "1A", "2A", "2M", "weighted", 1..5, "last_day"}}
+        (교시 키는 int). names 를 주면 그 사람들만 (기록 없는 사람은 빠진다).
+        """
+        sql = f"SELECT name, {', '.join(LEDGER_AGG_COLS)}, last_day FROM ledger_agg"
+        args = []
+        if names is not None:
+            names = list(names)
+            if not names:
+                return {}
+            sql += f" WHERE name IN ({','.join('?' * len(names))})"
+            args = names
+        keys = ["periods", "total"] + LEDGER_TYPES + ["weighted"] + LEDGER_PERIODS + ["last_day"]
+        with self._lock:
+            cur = self.conn().execute(sql, args)
+            out = {row[0]: dict(zip(keys, row[1:])) for row in cur}
+        metrics.count("ledger_agg_rows", len(out))
+        return out
+
+    def ledger_rows(self, day=None, since=None):
+        """원장 행 (dict 리스트, 날짜·교시·이름 순)"""
+        sql = "SELECT day, period, name, n1M, n1A, n2A, n2M, total, quota, weight FROM ledger WHERE 1=1"
+        args = []
+        if day:
+            sql += " AND day = ?"
+            args.append(day)
+        if since:
+            sql += " AND day >= ?"
+            args.append(since)
+        keys = ["day", "period", "name"] + LEDGER_TYPES + ["total", "quota", "weight"]
+        with self._lock:
+            cur = self.conn().execute(sql + " ORDER BY day, period, name", args)
+            return [dict(zip(keys, row)) for row in cur]
+
+    def ledger_iter(self, since=None, until=None, chunk=2000):
+        """
+        원장 행을 튜플로 하나씩 (날짜·교시·이름 순, since <= day <= until).
+        (day, period, name) 기본키로 chunk 행씩 끊어 읽는다 → 한 달치도 메모리에 다 올리지 않고,
+        읽는 사이에 락을 잡고 있지 않는다.
+        행: (day, period, name, 1M, 1A, 2A, 2M, total, quota, weight)
+        """
+        sql = "SELECT day, period, name, n1M, n1A, n2A, n2M, total, quota, weight FROM ledger WHERE 1=1"
+        args = []
+        if since:
+            sql += " AND day >= ?"
+            args.append(since)
+        if until:
+            sql += " AND day <= ?"
+            args.append(until)
+        last = None
+        while True:
+            q, a = sql, list(args)
+            if last:
+                q += " AND (day, period, name) > (?, ?, ?)"
+                a += last
+            with self._lock:
+                rows = self.conn().execute(q + " ORDER BY day, period, name LIMIT ?", a + [chunk]).fetchall()
+            yield from rows
+            if len(rows) < chunk:
+                return
+            last = list(rows[-1][:3])
+
+    def ledger_rebuild(self):
+        """ledger_agg 를 ledger 전체에서 다시 계산 (관리용 — 평소엔 증분으로 충분)"""
+        with self.transaction() as c:
+            c.execute("DELETE FROM ledger_agg")
+            days = c.execute("SELECT DISTINCT day FROM ledger ORDER BY day").fetchall()
+            for (day,) in days:
+                rows = c.execute(
+                    "SELECT period, name, n1M, n1A, n2A, n2M, total, weight FROM ledger WHERE day = ?",
+                    (day,)
+                ).fetchall()
+                self._agg_add(c, rows, +1, day)
+
+    # ---------------------------------------------------------
+    # 짝 기록 (pairs)
+    # ---------------------------------------------------------
+    def pair_put(self, day, period, pairs):
+        """한 교시 확정 짝 [(a, b)] 기록 (같은 교시 기존 기록은 교체, PAIR_DAYS 밖은 정리)"""
+        cutoff = (date.fromisoformat(day) - timedelta(days=PAIR_DAYS)).isoformat()
+        with self.transaction() as c:
+            c.execute("DELETE FROM pairs WHERE day = ? AND period = ?", (day, period))
+            c.executemany(
+                "INSERT INTO pairs(day, period, a, b) VALUES (?, ?, ?, ?)",
+                [(day, period, min(a, b), max(a, b)) for a, b in pairs]
+            )
+            c.execute("DELETE FROM pairs WHERE day < ?", (cutoff,))
+
+    def pair_counts(self, today=None, period=None):
+        """
+        최근 PAIR_DAYS 일 {(a, b): 같이 짝 횟수} (a <= b).
+        period 를 주면 오늘 그 교시 기록은 뺀다 (다시 확정해도 같은 짝이 나오게).
+        """
+        today = today or date.today()
+        sql = "SELECT a, b, COUNT(*) FROM pairs WHERE day >= ? AND day <= ?"
+        args = [(today - timedelta(days=PAIR_DAYS)).isoformat(), today.isoformat()]
+        if period is not None:
+            sql += " AND NOT (day = ? AND period = ?)"
+            args += [today.isoformat(), period]
+        with self._lock:
+            cur = self.conn().execute(sql + " GROUP BY a, b", args)
+            out = {(a, b): n for a, b, n in cur}
+        metrics.count("pair_history_rows", len(out))
+        return out
+
+##############################################################
+# 기본 저장소 (경로별 1개, 처음 쓸 때 연다)
+##############################################################
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_history_store(path=HISTORY_DB, legacy_json=HISTORY_FILE):
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = HistoryStore(path, legacy_json)
+            _stores[path] = store
+        return store
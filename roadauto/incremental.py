@@ -0,0 +1,219 @@
+##############################################################
+# incremental.py — 수요가 조금 바뀌었을 때 증분 재배정 (what-if)
+#
+# 직전 결과(Staff 의 assigned_counts / quota)를 출발점으로
+# 1) 줄어든 타입은 가진 사람에게서 1대씩 뺀다
+# 2) quota 는 재추첨 없이 최소로 조정 (가장 큰 quota -1 / 가장 작은 quota +1
+#    → 차이 ≤ 1, cap 유지). +1 은 compute_quota 와 같은 우선순위
+#    (최근 '행운' 없음 → 장기 평균 적음) 로 → 새로 돌린 것과 같은 사람들이 받는다
+# 3) quota 를 넘긴 사람은 1대씩 내려놓고, 남은 수요는 quota 여유가 있는
+#    사람에게 섞임이 적은 쪽으로 얹는다
+# 이동은 최소로, 히스토리 기록은 하지 않는다 (확정은 commit_assignment).
+# 증분으로 못 채운 수요를 전체 재계산이 채울 수 있으면 그쪽을 쓴다
+# (diags 에 "incremental_fallback").
+##############################################################
+
+import copy
+
+from .engine import (
+    CAP_MAP, TYPE_ORDER, eligible, assign_types_within_quota, add_diag,
+    lucky_name_set, ledger_rates,
+)
+from .solver import mix_penalty
+
+##############################################################
+# 1대 넣기 / 빼기
+##############################################################
+def _put(s, t, k=1):
+    s.assigned_counts[t] += k
+    s.total_assigned += k
+
+def _mix_after(s, t, k):
+    c = dict(s.assigned_counts)
+    c[t] += k
+    return mix_penalty(c)
+
+def _pick_remove(staff_objs, t):
+    """t 를 가진 사람 중: quota 초과분 큰 사람 → 빼면 섞임이 줄어드는 사람 → 가중치 있는 사람"""
+    best, best_key = None, None
+    for s in staff_objs:
+        if s.assigned_counts[t] <= 0:
+            continue
+        key = (
+            s.quota - s.total_assigned,
+            _mix_after(s, t, -1) - mix_penalty(s.assigned_counts),
+            -s.weight_val,
+        )
+        if best_key is None or key < best_key:
+            best, best_key = s, key
+    return best
+
+def _pick_add(staff_objs, t):
+    """quota 여유가 있고 t 자격이 있는 사람 중: 섞임 적은 → 가중치 없는"""
+    best, best_key = None, None
+    for s in staff_objs:
+        if s.total_assigned >= s.quota or not eligible(s, t):
+            continue
+        key = (_mix_after(s, t, 1), s.weight_val)
+        if best_key is None or key < best_key:
+            best, best_key = s, key
+    return best
+
+def _shed_type(s):
+    """quota 를 넘긴 사람이 내려놓을 타입: 빼면 섞임이 가장 줄어드는 것"""
+    held = [t for t in TYPE_ORDER if s.assigned_counts[t] > 0]
+    return min(held, key=lambda t: _mix_after(s, t, -1))
+
+def _chain_add(staff_objs, t):
+    """
+    여유 있는 사람 z 는 t 자격이 없고, 자격자 e 는 꽉 찬 경우:
+    e 의 다른 1대(y)를 z 에게 넘기고 e 가 t 를 받는다. 성공하면 True.
+    """
+    slack = [z for z in staff_objs if z.total_assigned < z.quota]
+    for e in staff_objs:
+        if not eligible(e, t) or e.total_assigned < e.quota:
+            continue
+        for y in TYPE_ORDER:
+            if y == t or e.assigned_counts[y] <= 0:
+                continue
+            for z in slack:
+                if z is not e and eligible(z, y):
+                    _put(e, y, -1)
+                    _put(z, y, 1)
+                    _put(e, t, 1)
+                    return True
+    return False
+
+##############################################################
+# quota 최소 조정 (재추첨 없음)
+##############################################################
+def _adjust_quotas(staff_objs, target_total, cap, unmet, lucky=(), ledger=None):
+    """
+    sum(quota) 를 target_total 에 맞춘다.
+    줄일 때는 quota 가 가장 큰 사람 중 여유(quota-배정)가 큰 사람 → 내려놓은 1대를
+    다른 사람이 받아 줄 수 있는 사람부터 → 이동 최소,
+    늘릴 때는 quota 가 가장 작은 사람 중 compute_quota 의 묶음 순서
+    (최근 '행운' 없음 → 장기 평균 적음) → 남은 수요(unmet) 타입 자격자 → 가중치 없는 사람부터.
+    """
+    rate = dict(zip((s.name for s in staff_objs), ledger_rates(ledger, [s.name for s in staff_objs])))
+
+    def passable(x):
+        # x 가 1대 내려놓아도 여유 있는 다른 사람이 받을 수 있는지
+        return any(
+            x.assigned_counts[t] > 0 and any(
+                z is not x and z.total_assigned < z.quota and eligible(z, t)
+                for z in staff_objs
+            ) for t in TYPE_ORDER
+        )
+
+    total_q = sum(s.quota for s in staff_objs)
+    while total_q > target_total:
+        s = max(staff_objs, key=lambda x: (
+            x.quota, x.quota - x.total_assigned, passable(x), x.weight_val
+        ))
+        s.quota -= 1
+        total_q -= 1
+    while total_q < target_total:
+        s = min(
+            (x for x in staff_objs if x.quota < cap),
+            key=lambda x: (
+                x.quota,
+                x.name in lucky,
+                rate[x.name],
+                not any(unmet[t] > 0 and eligible(x, t) for t in TYPE_ORDER),
+                x.weight_val,
+                x.total_assigned - x.quota,
+            ),
+        )
+        s.quota += 1
+        total_q += 1
+
+##############################################################
+# 진입점
+##############################################################
+def reassign(staff_objs, period, demand, diags=None, solver="flow", cap_map=None, hist=(), ledger=None):
+    """
+    staff_objs : 직전 assign_logic / reassign 결과 (제자리에서 고친다)
+    demand     : 새 수요 {"1M": n, ...}
+    cap_map    : 교시별 cap (기본 CAP_MAP — 센터 설정이 있으면 그 값)
+    hist       : quota 를 정할 때 본 히스토리 / '행운' 이름 (reset 이었으면 빈 것)
+    ledger     : 장기 원장 (HistoryStore.ledger_totals) — 둘 다 +1 받을 사람 순서에만 쓴다
+    반환: 바뀐 배정 수 (1대 추가/삭제/이동 = 1)
+    """
+    m = len(staff_objs)
+    if m == 0:
+        return 0
+    cap = (cap_map or CAP_MAP).get(period, 3)
+    demand = {t: demand.get(t, 0) for t in TYPE_ORDER}
+    total_demand = sum(demand.values())
+    target_total = min(total_demand, m * cap)
+    for s in staff_objs:
+        s.quota = max(s.quota, s.total_assigned)
+    have = {t: sum(s.assigned_counts[t] for s in staff_objs) for t in TYPE_ORDER}
+    changes = 0
+
+    # 1) 줄어든 타입 빼기
+    for t in TYPE_ORDER:
+        while have[t] > demand[t]:
+            _put(_pick_remove(staff_objs, t), t, -1)
+            have[t] -= 1
+            changes += 1
+
+    # 2) quota 최소 조정
+    _adjust_quotas(
+        staff_objs, target_total, cap, {t: demand[t] - have[t] for t in TYPE_ORDER},
+        lucky_name_set(hist), ledger or None,
+    )
+
+    # 3) quota 를 넘긴 사람은 내려놓기
+    for s in staff_objs:
+        while s.total_assigned > s.quota:
+            t = _shed_type(s)
+            _put(s, t, -1)
+            have[t] -= 1
+            changes += 1
+
+    # 4) 남은 수요 채우기 (수동 타입 먼저 — 받을 수 있는 사람이 적다)
+    for t in ("1M", "2M", "2A", "1A"):
+        while have[t] < demand[t]:
+            s = _pick_add(staff_objs, t)
+            if s is not None:
+                _put(s, t, 1)
+                changes += 1
+            elif _chain_add(staff_objs, t):
+                changes += 2
+            else:
+                break
+            have[t] += 1
+
+    # 5) 증분으로 못 채운 게 있으면, 같은 quota 로 다시 풀었을 때 더 채워지는지 확인
+    assigned = sum(have.values())
+    if assigned < target_total:
+        quotas = [s.quota for s in staff_objs]
+        trial = [copy.copy(s) for s in staff_objs]
+        for s in trial:
+            s.assigned_counts = {t: 0 for t in TYPE_ORDER}
+            s.total_assigned = 0
+        assign_types_within_quota(trial, period, quotas, dict(demand), None, solver)
+        if sum(s.total_assigned for s in trial) > assigned:
+            add_diag(diags, "info", "incremental_fallback", "증분 조정으로 다 못 채워서 타입 배정을 다시 계산했습니다.")
+            changes = 0
+            for s, x in zip(staff_objs, trial):
+                changes += sum(max(0, x.assigned_counts[t] - s.assigned_counts[t]) for t in TYPE_ORDER)
+                s.assigned_counts = x.assigned_counts
+                s.total_assigned = x.total_assigned
+            assigned = sum(s.total_assigned for s in staff_objs)
+
+    if target_total < total_demand:
+        add_diag(
+            diags, "error", "over_capacity",
+            f"🚨 이 교시 최대 처리 가능 인원({target_total}명)을 초과하는 수요({total_demand}명)가 있습니다. "
+            "근무자 수 또는 교시별 최대 배정 인원을 확인하세요."
+        )
+    if assigned < total_demand:
+        add_diag(
+            diags, "warning", "partial_fill",
+            f"⚠️ 전체 수요 {total_demand}명 중 {assigned}명만 배정되었습니다. "
+            "수동/자동 자격 및 종별 조합 제한으로 모든 수요를 채우지 못했습니다."
+        )
+    return changes
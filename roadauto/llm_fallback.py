@@ -0,0 +1,298 @@
+##############################################################
+# llm_fallback.py — 정규식이 못 읽은 줄만 LLM 으로 다시 읽기 (선택 기능)
+#
+# 기본 경로는 parser.parse_roster (정규식, 빠르고 결정적). 이 모듈은 그 결과의
+# unparsed 줄만 모아서 백엔드에 보내 근무자/교양/코스 담당을 뽑는다.
+# - 줄 내용 해시로 디스크 캐시 (data/llm_cache/) → 같은 글을 다시 붙여 넣으면 호출 0번
+# - 캐시에 없는 줄만 batch_size 줄씩 묶어 한 번에 요청
+# - 묶음들은 asyncio 로 동시에 (최대 concurrency 개), 묶음마다 timeout
+# - 백엔드: "openai" (openai 패키지 + API 키 있을 때만)
+#           "stub" (오프라인 규칙 기반) 은 테스트 / CLI 전용 — 한글 단어를 다 이름으로 보므로
+#           available_backends() (= 화면 선택지) 에는 넣지 않는다
+# - 뽑은 이름은 그 줄에 글자 그대로 있어야 받아들인다 (지어낸 이름 방지)
+# 실패(시간 초과, 응답 형식 오류)한 묶음은 캐시하지 않고 줄을 unparsed 로 남긴다.
+# 응답이 잘려서 빠진 줄도 마찬가지 — 캐시는 백엔드가 실제로 답한 줄만.
+##############################################################
+
+import os, re, sys, json, asyncio, hashlib, argparse, importlib.util
+
+from .engine import DATA_DIR, add_diag, load_json, save_json
+from .parser import ParseResult
+from . import metrics
+
+CACHE_DIR = os.path.join(DATA_DIR, "llm_cache")
+PROMPT_VERSION = 1          # 프롬프트/응답 형식을 바꾸면 올린다 (캐시 무효화)
+BATCH_SIZE = 20
+CONCURRENCY = 4
+TIMEOUT = 20.0              # 묶음 하나 (초)
+
+NAME_RE = re.compile(r"^[가-힣]{2,5}$")
+HANGUL_RE = re.compile(r"[가-힣]{2,}")
+KINDS = ("staff", "edu", "course", "none")
+
+SYSTEM_PROMPT = """너는 운전면허시험장 근무표 메시지에서 사람 이름을 뽑는 도구다.
+입력은 번호가 붙은 줄 목록이다. 줄마다 하나를 골라 JSON 으로만 답한다.
+- staff  : 도로주행 근무자 (예: "3호 홍길동", "수동 홍길동"). name 에 이름.
+- edu    : N교시 교양 담당 (예: "2교시 홍길동"). period 에 교시 숫자, name 에 이름.
+- course : 코스 점검 담당. name 에 이름 (여러 명이면 names 배열).
+- none   : 사람이 아니거나 알 수 없음.
+형식: {"items": [{"i": 줄번호, "kind": "...", "name": "...", "names": [...], "period": N}]}
+이름은 줄에 쓰인 글자 그대로 (한글 2~5자). 모르면 none."""
+
+##############################################################
+# 백엔드
+##############################################################
+class StubBackend:
+    """
+    오프라인 규칙 기반 백엔드 (테스트 / CLI 전용).
+    "안녕하세요" 같은 말도 이름으로 보므로 실제 배정 화면에서는 쓰지 않는다.
+    delay 초만큼 기다려서 동시 호출 / 시간 초과도 흉내 낸다.
+    """
+    cache_id = "stub"
+    STOP = {"수동", "자동", "교시", "코스", "점검", "근무", "오전", "오후", "교양", "휴무", "출장", "연가"}
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def extract(self, lines):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        items = []
+        for i, line in enumerate(lines):
+            words = [w for w in HANGUL_RE.findall(line) if w not in self.STOP and NAME_RE.match(w)]
+            m = re.search(r"(\d)\s*교시", line)
+            if not words:
+                items.append({"i": i, "kind": "none"})
+            elif m:
+                items.append({"i": i, "kind": "edu", "period": int(m.group(1)), "name": words[-1]})
+            elif "코스" in line:
+                items.append({"i": i, "kind": "course", "names": words})
+            else:
+                items.append({"i": i, "kind": "staff", "name": words[-1]})
+        return items
+
+class OpenAIBackend:
+    """openai>=1.6 의 AsyncOpenAI (OPENAI_API_KEY 필요). 패키지가 없으면 만들 때 ImportError."""
+    def __init__(self, model="gpt-4o-mini", api_key=None):
+        from openai import AsyncOpenAI
+        self.model = model
+        self.cache_id = f"openai:{model}"
+        self.client = AsyncOpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        self.calls = 0
+
+    async def extract(self, lines):
+        self.calls += 1
+        body = "\n".join(f"{i}: {line}" for i, line in enumerate(lines))
+        resp = await self.client.chat.completions.create(
+            model=self.model,
+            temperature=0,
+            response_format={"type": "json_object"},
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": body},
+            ],
+        )
+        return json.loads(resp.choices[0].message.content or "{}").get("items", [])
+
+BACKENDS = {"stub": StubBackend, "openai": OpenAIBackend}
+
+def available_backends():
+    """화면에서 고를 수 있는 백엔드 이름 (openai 는 패키지와 API 키가 있을 때만, stub 은 넣지 않음)"""
+    out = []
+    if importlib.util.find_spec("openai") and os.environ.get("OPENAI_API_KEY"):
+        out.append("openai")
+    return out
+
+def get_backend(name="stub", **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"unknown backend: {name!r}")
+    return BACKENDS[name](**kwargs)
+
+##############################################################
+# 디스크 캐시 (줄 하나 = 파일 하나)
+##############################################################
+def cache_key(backend, line):
+    raw = f"{PROMPT_VERSION}\0{backend.cache_id}\0{line}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], key + ".json")
+
+def cache_get(cache_dir, key):
+    return load_json(_cache_path(cache_dir, key), None)
+
+def cache_put(cache_dir, key, item):
+    save_json(_cache_path(cache_dir, key), item)
+
+##############################################################
+# 응답 검사
+##############################################################
+def _clean(item, line):
+    """백엔드 응답 한 줄 → {"kind", "names", "period"} (줄에 없는 이름은 버림)"""
+    kind = item.get("kind") if isinstance(item, dict) else None
+    if kind not in KINDS:
+        kind = "none"
+    names = (item.get("names") or ([item["name"]] if item.get("name") else [])) if kind != "none" else []
+    names = [n for n in names if isinstance(n, str) and NAME_RE.match(n) and n in line]
+    period = item.get("period") if kind == "edu" else None
+    if kind == "edu" and not (isinstance(period, int) and 1 <= period <= 9):
+        kind = "none"
+    if not names:
+        kind = "none"
+    return {"kind": kind, "names": names if kind != "none" else [], "period": period}
+
+async def _run_batches(backend, batches, concurrency, timeout):
+    """[[줄, ...], ...] → 묶음마다 (items 또는 None, 오류 메시지)"""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(lines):
+        async with sem:
+            try:
+                items = await asyncio.wait_for(backend.extract(lines), timeout)
+                return items, None
+            except asyncio.TimeoutError:
+                return None, f"시간 초과 ({timeout:.0f}초)"
+            except Exception as e:
+                return None, f"{type(e).__name__}: {e}"
+
+    return await asyncio.gather(*(one(b) for b in batches))
+
+##############################################################
+# 진입점
+##############################################################
+def extract_lines(lines, backend, cache_dir=CACHE_DIR, batch_size=BATCH_SIZE,
+                  concurrency=CONCURRENCY, timeout=TIMEOUT):
+    """
+    줄 목록 → ([{"kind", "names", "period"} 또는 None(실패), ...], 통계 dict)
+    캐시에 있는 줄은 호출하지 않는다. 같은 줄이 여러 번 있어도 한 번만 보낸다.
+    """
+    out = [None] * len(lines)
+    stats = {"lines": len(lines), "cache_hits": 0, "calls": 0, "errors": [], "missing": 0}
+    todo = {}
+    for k, line in enumerate(lines):
+        key = cache_key(backend, line)
+        hit = cache_get(cache_dir, key)
+        if hit is not None:
+            out[k] = hit
+            stats["cache_hits"] += 1
+        else:
+            todo.setdefault(line, (key, []))[1].append(k)
+
+    pending = list(todo.items())
+    batches = [pending[b:b + batch_size] for b in range(0, len(pending), batch_size)]
+    if batches:
+        with metrics.stage("llm_calls"):
+            results = asyncio.run(_run_batches(
+                backend, [[line for line, _ in b] for b in batches], concurrency, timeout
+            ))
+        stats["calls"] = len(batches)
+        for batch, (items, err) in zip(batches, results):
+            if items is None:
+                stats["errors"].append(err)
+                continue
+            by_i = {}
+            for it in items:
+                if isinstance(it, dict):
+                    i = it.get("i")
+                    by_i[int(i) if isinstance(i, str) and i.isdigit() else i] = it
+            for i, (line, (key, idxs)) in enumerate(batch):
+                if i not in by_i:
+                    # 응답이 잘렸거나 줄을 빠뜨림 → 캐시하지 않고 다음에 다시 묻는다
+                    stats["missing"] += 1
+                    continue
+                got = _clean(by_i[i], line)
+                cache_put(cache_dir, key, got)
+                for k in idxs:
+                    out[k] = got
+    metrics.count("llm_lines", len(lines))
+    metrics.count("llm_cache_hits", stats["cache_hits"])
+    metrics.count("llm_batches", stats["calls"])
+    return out, stats
+
+def fallback_parse(result, backend, **kwargs):
+    """
+    ParseResult → unparsed 줄을 LLM 으로 읽어 합친 새 ParseResult (원본은 그대로).
+    한글이 없는 줄은 보내지 않는다. 뽑은 근무자는 정규식 결과 뒤에 붙는다.
+    kwargs 는 extract_lines 로 (cache_dir, batch_size, concurrency, timeout).
+    """
+    cand = [(no, line) for no, line in result.unparsed if HANGUL_RE.search(line)]
+    if not cand:
+        return result
+    with metrics.stage("llm_fallback"):
+        got, stats = extract_lines([line for _, line in cand], backend, **kwargs)
+
+    staff = list(result.staff)
+    edu = dict(result.edu)
+    course = list(result.course)
+    still, diags = [], list(result.diags)
+    read_nos = set()
+    for (no, line), g in zip(cand, got):
+        if not g or g["kind"] == "none":
+            continue
+        read_nos.add(no)
+        if g["kind"] == "staff":
+            staff.extend(n for n in g["names"] if n not in staff)
+        elif g["kind"] == "edu":
+            edu.setdefault(g["period"], g["names"][0])
+        elif g["kind"] == "course":
+            course.extend(n for n in g["names"] if n not in course)
+        add_diag(diags, "info", "llm_line", f"{no}번째 줄을 보조 인식했습니다 ({g['kind']}: {', '.join(g['names'])}): {line}")
+    for no, line in result.unparsed:
+        if no not in read_nos:
+            still.append((no, line))
+    # 보조 인식으로 읽은 줄의 "근무자로 인식하지 못했습니다" 경고는 뺀다
+    diags = [
+        d for d in diags
+        if not (d["code"] == "unparsed_staff_line" and any(d["msg"].startswith(f"{no}번째 줄") for no in read_nos))
+    ]
+    if stats["errors"]:
+        errs = sorted(set(stats["errors"]))
+        add_diag(diags, "warning", "llm_error",
+                 f"보조 인식 묶음 {len(stats['errors'])}개 실패 (해당 줄은 그대로 남김): {'; '.join(errs)}")
+    if stats["missing"]:
+        add_diag(diags, "warning", "llm_partial",
+                 f"보조 인식 응답에 빠진 줄 {stats['missing']}개 (그대로 남기고 다음에 다시 묻습니다)")
+    return ParseResult(tuple(staff), edu, tuple(course), tuple(still), tuple(diags))
+
+##############################################################
+# main — 근무 텍스트 파일 하나를 정규식 + 보조 인식으로 읽어 보기
+#
+#   python -m roadauto.llm_fallback 근무.txt [--backend stub|openai] [--model ...]
+##############################################################
+def main(argv=None):
+    from .parser import parse_roster
+    ap = argparse.ArgumentParser(description="인식 못 한 줄 보조 인식 (LLM)")
+    ap.add_argument("roster", help="근무 텍스트 파일")
+    ap.add_argument("--backend", choices=sorted(BACKENDS), default="stub")
+    ap.add_argument("--model", default=None, help="openai 모델 이름")
+    ap.add_argument("--cache-dir", default=CACHE_DIR)
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    ap.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    ap.add_argument("--timeout", type=float, default=TIMEOUT)
+    args = ap.parse_args(argv)
+
+    with open(args.roster, "r", encoding="utf-8") as f:
+        text = f.read()
+    kw = {"model": args.model} if args.model and args.backend == "openai" else {}
+    try:
+        backend = get_backend(args.backend, **kw)
+    except ImportError:
+        raise SystemExit("openai 패키지가 없습니다: pip install openai")
+    base = parse_roster(text)
+    res = fallback_parse(
+        base, backend, cache_dir=args.cache_dir, batch_size=args.batch_size,
+        concurrency=args.concurrency, timeout=args.timeout,
+    )
+    print(f"[llm] 인식 못 한 줄 {len(base.unparsed)} → {len(res.unparsed)}, "
+          f"백엔드 호출 {backend.calls}번", file=sys.stderr)
+    print("근무자: " + ", ".join(res.staff))
+    print("교양: " + ", ".join(f"{p}교시 {nm}" for p, nm in sorted(res.edu.items())))
+    print("코스: " + ", ".join(res.course))
+    for d in res.diags:
+        print(f"[{d['level']}] {d['msg']}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
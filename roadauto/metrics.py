@@ -0,0 +1,155 @@
+##############################################################
+# metrics.py — 단계별 시간 / 카운터 계측 (가벼운 훅)
+#
+#   with stage("quota"):  ...        # 걸린 시간(ms) 기록
+#   count("types_loop", n)           # 카운터 (반복 횟수, 읽은 행 수 등)
+#   with run("assign"):  ...         # 이 안의 stage/count 를 실행 기록 하나로 묶음
+#
+# 단계마다 최근 WINDOW 개 값만 들고 있다가 summary() 에서 백분위로 보여 준다.
+# 실행 기록(run)도 최근 WINDOW 개만. export() 는 JSON 으로 내보낼 dict.
+# 프로세스 하나에 METRICS 하나 (Streamlit 세션들이 같이 쓴다 → 락).
+# 현재 run 은 스레드별로 따로 (세션마다 스크립트 스레드가 다름).
+# 꺼 두려면 METRICS.enabled = False.
+##############################################################
+
+import math, time, threading
+from collections import deque
+from contextlib import contextmanager
+
+WINDOW = 500
+
+def percentile(sorted_vals, p):
+    """nearest-rank 백분위 (정렬된 리스트)"""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, math.ceil(p / 100 * len(sorted_vals)) - 1))
+    return sorted_vals[k]
+
+class Metrics:
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.timings = {}      # 단계 → deque[ms]
+            self.counters = {}     # 카운터 → deque[실행당 값]
+            self.totals = {}       # 카운터 → 누적 합
+            self.runs = deque(maxlen=self.window)
+            self.started = time.time()
+
+    def _current(self):
+        return getattr(self._local, "run", None)
+
+    # ---------------------------------------------------------
+    # 기록
+    # ---------------------------------------------------------
+    def add_time(self, name, ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            q = self.timings.get(name)
+            if q is None:
+                q = self.timings[name] = deque(maxlen=self.window)
+            q.append(ms)
+        cur = self._current()
+        if cur is not None:
+            cur["stages"][name] = round(cur["stages"].get(name, 0.0) + ms, 4)
+
+    def count(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0) + n
+        cur = self._current()
+        if cur is not None:
+            cur["counters"][name] = cur["counters"].get(name, 0) + n
+        else:
+            self._push_counter(name, n)
+
+    def _push_counter(self, name, n):
+        with self._lock:
+            q = self.counters.get(name)
+            if q is None:
+                q = self.counters[name] = deque(maxlen=self.window)
+            q.append(n)
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, (time.perf_counter() - t0) * 1000)
+
+    @contextmanager
+    def run(self, kind):
+        """
+        실행 하나 (assign_logic 한 번, 화면 rerun 한 번 등).
+        중첩되면 바깥 run 에 합쳐진다.
+        """
+        if not self.enabled or self._current() is not None:
+            yield
+            return
+        rec = {"kind": kind, "ts": time.time(), "stages": {}, "counters": {}}
+        self._local.run = rec
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.run = None
+            rec["ms"] = round((time.perf_counter() - t0) * 1000, 4)
+            self.add_time(f"{kind}_total", rec["ms"])
+            for name, n in rec["counters"].items():
+                self._push_counter(name, n)
+            with self._lock:
+                self.runs.append(rec)
+
+    # ---------------------------------------------------------
+    # 조회 / 내보내기
+    # ---------------------------------------------------------
+    def summary(self):
+        """[{"이름", "종류", "n", "p50", "p90", "p99", "max", "mean"}] — 시간은 ms, 카운터는 실행당 값"""
+        with self._lock:
+            items = [("time", k, list(v)) for k, v in self.timings.items()]
+            items += [("count", k, list(v)) for k, v in self.counters.items()]
+        out = []
+        for kind, name, vals in sorted(items, key=lambda x: (x[0] != "time", x[1])):
+            s = sorted(vals)
+            out.append({
+                "이름": name, "종류": kind, "n": len(s),
+                "p50": round(percentile(s, 50), 3),
+                "p90": round(percentile(s, 90), 3),
+                "p99": round(percentile(s, 99), 3),
+                "max": round(s[-1], 3) if s else 0,
+                "mean": round(sum(s) / len(s), 3) if s else 0,
+            })
+        return out
+
+    def export(self):
+        with self._lock:
+            runs = list(self.runs)
+            totals = dict(self.totals)
+        return {
+            "started": self.started,
+            "exported": time.time(),
+            "window": self.window,
+            "summary": self.summary(),
+            "totals": totals,
+            "runs": runs,
+        }
+
+##############################################################
+# 프로세스 전역 인스턴스 + 짧은 이름
+##############################################################
+METRICS = Metrics()
+
+stage = METRICS.stage
+count = METRICS.count
+run = METRICS.run
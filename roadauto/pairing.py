@@ -0,0 +1,223 @@
+##############################################################
+# pairing.py — 페어링 (1대 배정자끼리 짝, 남으면 참관자와)
+#
+# 예전 make_pairing_text 는 명단 순서대로 pop(0) 해서 짝을 지었다.
+# 여기서는 짝 비용의 합이 최소가 되게 짝을 고른다.
+#   - 최근 PAIR_DAYS 일 안에 같이 짝이었던 횟수 × REPEAT_COST
+#   - 수동/자동이 섞인 짝 MIX_COST
+#   - 짝이 홀수라 한 명 남으면: 참관자(0대)와 짝 (그 참관자와의 반복 비용),
+#     참관자도 없으면 단독 SOLO_COST
+# 인원이 EXACT_MAX 이하면 비트마스크 DP 로 정확히 (상태 수가 피보나치 수만큼이라 가볍다),
+# 넘으면 그리디 + 2-opt (비용 있는 짝만 다른 짝과 맞바꿔 본다).
+# 비용이 모두 같으면 명단 순서대로 (예전과 같은 결과).
+##############################################################
+
+from functools import lru_cache
+
+from .engine import get_transmission_type
+
+PAIR_DAYS = 14
+REPEAT_COST = 10     # 최근 같이 짝 한 번마다
+MIX_COST = 3         # 수동/자동 섞인 짝
+SOLO_COST = 50       # 짝 없이 단독
+EXACT_MAX = 18       # 이 인원 이하면 정확히 (DP), 넘으면 그리디 + 2-opt
+MAX_PASSES = 5       # 2-opt 반복 한도
+
+def pair_key(a, b):
+    """짝 기록 키 (이름 순서 무관)"""
+    return (a, b) if a <= b else (b, a)
+
+def _single_type(s):
+    for t, v in s.assigned_counts.items():
+        if v > 0:
+            return t
+    return None
+
+##############################################################
+# 비용
+##############################################################
+class _Costs:
+    def __init__(self, names, trs, observers, counts):
+        self.names = names
+        self.trs = trs
+        self.observers = observers
+        self.counts = counts or {}
+        self._single = {}
+
+    def repeat(self, a, b):
+        return self.counts.get(pair_key(a, b), 0)
+
+    def pair(self, i, j):
+        """i, j: 1대 배정자 인덱스 (j 가 None 이면 남는 한 명)"""
+        if i is None:
+            i, j = j, i
+        if i is None:
+            return 0
+        if j is None:
+            return self.single(i)[0]
+        c = REPEAT_COST * self.repeat(self.names[i], self.names[j])
+        if self.trs[i] != self.trs[j]:
+            c += MIX_COST
+        return c
+
+    def single(self, i):
+        """남는 한 명의 (비용, 같이 갈 참관자 이름 또는 None)"""
+        got = self._single.get(i)
+        if got is None:
+            got = (SOLO_COST, None)
+            for z in self.observers:
+                c = REPEAT_COST * self.repeat(self.names[i], z)
+                if got[1] is None or c < got[0]:
+                    got = (c, z)
+                    if c == 0:
+                        break
+            self._single[i] = got
+        return got
+
+##############################################################
+# 매칭
+##############################################################
+def _match_exact(n, cost):
+    """0..n-1 (+ 홀수면 None) 완전 매칭, 비용 합 최소. 동점이면 앞사람끼리."""
+    nodes = list(range(n)) + ([None] if n % 2 else [])
+    full = (1 << len(nodes)) - 1
+
+    @lru_cache(maxsize=None)
+    def best(mask):
+        if not mask:
+            return 0, 0
+        i = (mask & -mask).bit_length() - 1
+        rest = mask & ~(1 << i)
+        out = None
+        m = rest
+        while m:
+            low = m & -m
+            m ^= low
+            c = best(rest ^ low)[0] + cost(nodes[i], nodes[low.bit_length() - 1])
+            if out is None or c < out[0]:
+                out = (c, low)
+        return out
+
+    pairs = []
+    mask = full
+    while mask:
+        i = (mask & -mask).bit_length() - 1
+        low = best(mask)[1]
+        pairs.append((nodes[i], nodes[low.bit_length() - 1]))
+        mask &= ~(1 << i) & ~low
+    return pairs
+
+def _match_greedy(n, trs, cost):
+    """명단 순서대로 가장 싼 상대 (같은 변속기 먼저) → 비용 있는 짝만 2-opt"""
+    free = {}
+    for i in range(n):
+        free.setdefault(trs[i], {})[i] = None
+    pairs = []
+    for i in range(n):
+        if i not in free[trs[i]]:
+            continue
+        del free[trs[i]][i]
+        best, best_c = None, None
+        for tr in [trs[i]] + [t for t in free if t != trs[i]]:
+            floor = 0 if tr == trs[i] else MIX_COST
+            if best_c is not None and best_c <= floor:
+                break
+            for j in free[tr]:
+                c = cost(i, j)
+                if best_c is None or c < best_c:
+                    best, best_c = j, c
+                if c == floor:
+                    break
+        if best is None:
+            pairs.append((i, None))
+        else:
+            del free[trs[best]][best]
+            pairs.append((i, best))
+
+    for _ in range(MAX_PASSES):
+        improved = False
+        for k in range(len(pairs)):
+            a, b = pairs[k]
+            ck = cost(a, b)
+            if ck == 0:
+                continue
+            for l in range(len(pairs)):
+                if l == k:
+                    continue
+                c, d = pairs[l]
+                cur = ck + cost(c, d)
+                for x, y, u, v in ((a, c, b, d), (a, d, b, c)):
+                    if cost(x, y) + cost(u, v) < cur:
+                        pairs[k], pairs[l] = (x, y), (u, v)
+                        improved = True
+                        break
+                else:
+                    continue
+                break
+        if not improved:
+            break
+    return pairs
+
+##############################################################
+# 진입점
+##############################################################
+def pair_staff(staff_objs, counts=None):
+    """
+    counts: {pair_key(a, b): 최근 같이 짝 횟수} (HistoryStore.pair_counts)
+    반환: {
+        "pairs":     [{"a", "b", "kind": "pair"|"observer"|"solo", "cost"}]  (명단 순서),
+        "multi":     [(이름, 대수)]  (2대 이상 — 짝 없음),
+        "observers": [이름, ...]     (짝 없는 참관자),
+        "cost":      비용 합,
+    }
+    """
+    ones = [s for s in staff_objs if s.total_assigned == 1]
+    zeros = [s.name for s in staff_objs if s.total_assigned == 0]
+    multi = [(s.name, s.total_assigned) for s in staff_objs if s.total_assigned > 1]
+
+    names = [s.name for s in ones]
+    trs = [get_transmission_type(_single_type(s)) for s in ones]
+    costs = _Costs(names, trs, zeros, counts)
+    n = len(ones)
+    if n <= EXACT_MAX:
+        matched = _match_exact(n, costs.pair)
+    else:
+        matched = _match_greedy(n, trs, costs.pair)
+
+    pairs, tail = [], []
+    used_obs = None
+    for i, j in matched:
+        if i is None:
+            i, j = j, i
+        if j is None:
+            c, z = costs.single(i)
+            used_obs = z
+            tail.append({"a": names[i], "b": z, "kind": "observer" if z else "solo", "cost": c})
+        else:
+            i, j = min(i, j), max(i, j)
+            pairs.append((i, {"a": names[i], "b": names[j], "kind": "pair", "cost": costs.pair(i, j)}))
+    pairs = [p for _, p in sorted(pairs, key=lambda x: x[0])] + tail
+
+    return {
+        "pairs": pairs,
+        "multi": multi,
+        "observers": [z for z in zeros if z != used_obs],
+        "cost": sum(p["cost"] for p in pairs),
+    }
+
+def pairing_lines(result):
+    """pair_staff 결과 → 예전 make_pairing_text 와 같은 문자열 리스트"""
+    lines = [f"{nm}({k}명)" for nm, k in result["multi"]]
+    for p in result["pairs"]:
+        if p["kind"] == "pair":
+            lines.append(f"{p['a']} - {p['b']}")
+        elif p["kind"] == "observer":
+            lines.append(f"{p['a']} - {p['b']}(참관)")
+        else:
+            lines.append(f"{p['a']} - (단독)")
+    lines.extend(f"{z}(참관)" for z in result["observers"])
+    return lines
+
+def pair_list(result):
+    """짝 기록에 남길 [(a, b)] (단독 제외, 참관 짝 포함)"""
+    return [pair_key(p["a"], p["b"]) for p in result["pairs"] if p["b"]]
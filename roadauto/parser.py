@@ -0,0 +1,185 @@
+##############################################################
+# parser.py — 근무자/교양/코스점검 텍스트 한 번에 파싱
+#
+# 컴파일해 둔 정규식 하나로 본문을 한 번만 훑는다 (finditer, 선형 시간).
+# 구분자는 [^\S\n]* (줄바꿈을 뺀 공백) — 줄을 넘지 않는다. (\s* 면 "3교시 :" 나 "• 07호" 처럼 이름이
+# 빈 줄이 다음 줄 첫 단어를 이름으로 먹고, 그 줄의 코스점검 같은 항목이 통째로 사라진다)
+# - 1종수동 : 00호 홍길동     → 근무자 (수동 줄 먼저)
+# - • 00호 홍길동            → 근무자
+# - 1교시 : 홍길동           → 교시별 교양 담당
+# - 코스점검 : A코스 : 홍길동 → 코스 담당 (첫 코스점검만). 바로 아래 "B코스 : 이름" 줄들도 이어서 읽고,
+#   같은 줄의 "N교시 : 이름" 앞에서 멈춘다 (교양 항목은 교양으로 따로 걸린다)
+# 어느 패턴에도 안 걸린 줄은 줄 번호와 함께 unparsed 로 돌려준다.
+# 줄바꿈은 \r\n / \r 을 \n 으로 맞춘 뒤 \n 하나로만 센다 (매치 위치와 unparsed 줄 번호가 같은 기준).
+# 같은 텍스트(+ 형식)는 lru_cache 로 다시 파싱하지 않는다.
+#
+# 센터마다 근무표 모양이 다르면 RosterFormat 으로 종류별 정규식만 바꾼다
+# (centers.json 의 "format"). 종류마다 정해진 이름 그룹이 있어야 한다.
+##############################################################
+
+import re
+from functools import lru_cache
+
+from . import metrics
+
+##############################################################
+# 근무표 형식
+##############################################################
+FORMAT_GROUPS = {
+    "manual": ("manual",),        # 수동 가능 근무자 줄
+    "bullet": ("bullet",),        # 일반 근무자 줄
+    "edu": ("gyo", "edu"),        # N교시 교양 담당
+    "course": ("course",),        # 코스 점검 (course 그룹 = 줄 나머지 + 이어지는 코스 줄)
+}
+_COURSE_REST = r"(?:(?!\d교시[^\S\n]*:)[^\n])*"      # 줄 끝이나 "N교시 :" 앞까지
+DEFAULT_PATTERNS = {
+    "manual": r"1종수동[^\S\n]*:[^\S\n]*\d+호[^\S\n]*(?P<manual>[가-힣]+)",
+    "bullet": r"•[^\S\n]*\d+호[^\S\n]*(?P<bullet>[가-힣]+)",
+    "edu": r"(?P<gyo>\d)교시[^\S\n]*:[^\S\n]*(?P<edu>[가-힣]+)",
+    # 줄 나머지 (교시 항목 앞까지) + 바로 이어지는 "X코스 :" 줄들
+    "course": (r"코스점검[^\S\n]*:[^\S\n]*(?P<course>" + _COURSE_REST
+               + r"(?:\n[^\S\n]*[A-Z]코스[^:\n]*:" + _COURSE_REST + r")*)"),
+    "course_item": r"[A-Z]코스.*?:[^\S\n]*([가-힣]+)",   # course 그룹 안에서 담당자 (findall)
+    "hint": r"\d+\s*호",                             # 안 걸렸는데 이게 있으면 사람을 놓쳤을 가능성이 큼
+}
+
+class RosterFormat:
+    """
+    종류별 정규식 묶음 (DEFAULT_PATTERNS 에서 바꿀 것만 patterns 로).
+    종류별 패턴을 | 로 합치고, 그룹 번호 → 종류 표(kinds)를 만들어 둔다
+    (m.lastindex 는 매치된 종류 안의 그룹이므로 표 한 번 보면 종류가 나온다).
+    패턴이 틀리거나 그룹이 없으면 ValueError.
+    """
+    __slots__ = ("name", "patterns", "token_re", "kinds", "course_re", "hint_re", "_key")
+
+    def __init__(self, name="default", patterns=None):
+        pats = dict(DEFAULT_PATTERNS)
+        extra = set(patterns or {}) - set(DEFAULT_PATTERNS)
+        if extra:
+            raise ValueError(f"모르는 형식 키: {sorted(extra)}")
+        pats.update(patterns or {})
+        kinds = [None]
+        for kind, groups in FORMAT_GROUPS.items():
+            try:
+                rx = re.compile(pats[kind])
+            except re.error as e:
+                raise ValueError(f"{kind} 정규식 오류: {e}")
+            missing = [g for g in groups if g not in rx.groupindex]
+            if missing:
+                raise ValueError(f"{kind} 정규식에 그룹 {missing} 이 없습니다")
+            kinds.extend([kind] * rx.groups)
+        try:
+            self.token_re = re.compile("|".join(pats[k] for k in FORMAT_GROUPS))
+        except re.error as e:
+            raise ValueError(f"형식 정규식을 합칠 수 없습니다 (그룹 이름 중복?): {e}")
+        self.name = name
+        self.patterns = pats
+        self.kinds = tuple(kinds)
+        self.course_re = re.compile(pats["course_item"])
+        self.hint_re = re.compile(pats["hint"])
+        self._key = tuple(sorted(pats.items()))
+
+    def __eq__(self, other):
+        return isinstance(other, RosterFormat) and self._key == other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return f"RosterFormat({self.name!r})"
+
+DEFAULT_FORMAT = RosterFormat()
+TOKEN_RE = DEFAULT_FORMAT.token_re
+COURSE_RE = DEFAULT_FORMAT.course_re
+ROOM_RE = DEFAULT_FORMAT.hint_re
+
+##############################################################
+# ParseResult
+##############################################################
+class ParseResult:
+    """
+    staff    : 근무자 이름 튜플 (중복 제거, 수동 줄 → • 줄 순)
+    edu      : {교시: 이름}
+    course   : 코스 담당자 튜플
+    unparsed : ((줄 번호, 줄 내용), ...)  — 1부터 시작
+    diags    : 진단 dict 튜플 (engine.add_diag 형식)
+    """
+    __slots__ = ("staff", "edu", "course", "unparsed", "diags")
+
+    def __init__(self, staff, edu, course, unparsed, diags):
+        self.staff = staff
+        self.edu = edu
+        self.course = course
+        self.unparsed = unparsed
+        self.diags = diags
+
+    def __getstate__(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
+##############################################################
+# 파싱
+##############################################################
+def _scan(text, fmt=DEFAULT_FORMAT):
+    manual, bullet, course = [], [], None
+    edu = {}
+    matched_lines = set()
+
+    line_no = 1
+    pos = 0
+    kinds = fmt.kinds
+    for m in fmt.token_re.finditer(text):
+        line_no += text.count("\n", pos, m.start())
+        pos = m.start()
+        # 코스점검은 이어지는 코스 줄까지, 센터별 패턴도 여러 줄에 걸칠 수 있다
+        span_lines = text.count("\n", m.start(), m.end())
+        if span_lines:
+            matched_lines.update(range(line_no, line_no + span_lines + 1))
+        else:
+            matched_lines.add(line_no)
+
+        kind = kinds[m.lastindex or 0]
+        if kind == "manual":
+            manual.append(m.group("manual"))
+        elif kind == "bullet":
+            bullet.append(m.group("bullet"))
+        elif kind == "edu":
+            edu[int(m.group("gyo"))] = m.group("edu")
+        elif kind == "course" and course is None:
+            course = fmt.course_re.findall(m.group("course"))
+
+    staff = tuple(dict.fromkeys(manual + bullet))
+    return staff, edu, tuple(course or ()), matched_lines
+
+@lru_cache(maxsize=64)
+def parse_roster(text, fmt=None):
+    """
+    텍스트 → ParseResult. 같은 텍스트(+ 형식)는 캐시에서 바로 돌려준다.
+    fmt: RosterFormat (센터별 형식, 없으면 기본 형식)
+    (반환 객체는 공유되므로 고치지 말 것 — parse_staff/parse_extra 는 복사본을 준다)
+    """
+    with metrics.stage("parse"):
+        return _parse(text, fmt or DEFAULT_FORMAT)
+
+def _parse(text, fmt=DEFAULT_FORMAT):
+    # 줄 번호는 \n 으로만 센다 (_scan 의 count("\n") 와 같은 기준)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    staff, edu, course, matched_lines = _scan(text, fmt)
+
+    unparsed, diags = [], []
+    for no, line in enumerate(text.split("\n"), 1):
+        stripped = line.strip()
+        if not stripped or no in matched_lines:
+            continue
+        unparsed.append((no, stripped))
+        if fmt.hint_re.search(stripped):
+            diags.append({
+                "level": "warning", "code": "unparsed_staff_line",
+                "msg": f"{no}번째 줄을 근무자로 인식하지 못했습니다: {stripped}",
+            })
+
+    metrics.count("parse_lines", text.count("\n") + 1)
+    return ParseResult(staff, edu, course, tuple(unparsed), tuple(diags))
@@ -0,0 +1,178 @@
+##############################################################
+# planner.py — 하루 전체(1~5교시) 한 번에 배정
+#
+# 교시별 배정을 따로 돌리면 하루 누적 부담은 min_load 히스토리와
+# CAP_MAP 에만 기대게 된다. 여기서는 1~5교시를 순서대로 한 번에 풀면서
+# "지금까지의 누적 배정 + 가중치(코스/다음 교시 교양)"가 적은 사람에게
+# 나머지(+1)를 준다. 각 교시 안에서는 기존 규칙(차이 ≤ 1, cap)을 그대로 지킨다.
+#
+# 히스토리는 읽기만 한다. 기록은 commit_day() 를 부를 때만 남긴다.
+##############################################################
+
+import random
+from datetime import date
+
+from .engine import (
+    CAP_MAP, TYPE_ORDER, StaffTable, apply_weights, assign_types_within_quota,
+    lucky_name_set, lucky_entries, ledger_entries, ledger_rates, add_diag, StaleHistoryError,
+)
+from .pairing import pair_staff, pair_list
+from .quals import load_quals
+
+PERIODS = [1, 2, 3, 4, 5]
+
+def _per_period(value, period, default):
+    """list 이면 모든 교시 공통, dict 이면 교시별 값"""
+    if isinstance(value, dict):
+        return value.get(period, default)
+    return value if value is not None else default
+
+##############################################################
+# 하루 quota (누적 부담 기준)
+##############################################################
+def day_quota(staff_objs, period, total_demand, cum_load, cum_weight, lucky, rng, ledger=None, cap_map=None):
+    """
+    compute_quota 와 같은 규칙 + 누적 부담 균형.
+    +1 을 받을 순서: (누적 배정 + 누적 가중치 + 이번 교시 가중치) 작은 사람
+                    → 최근 행운 기록 없는 사람 → 장기 교시당 평균 적은 사람 → 랜덤
+    """
+    m = len(staff_objs)
+    if m == 0 or total_demand == 0:
+        return [0] * m, 0
+
+    cap = (cap_map or CAP_MAP).get(period, 3)
+    assignable = min(total_demand, m * cap)
+    base = assignable // m
+    rem = assignable % m
+
+    quotas = [base] * m
+    if rem:
+        rates = ledger_rates(ledger, [s.name for s in staff_objs])
+
+        def burden(i):
+            s = staff_objs[i]
+            return (
+                cum_load.get(s.name, 0) + cum_weight.get(s.name, 0) + s.weight_val,
+                s.name in lucky,
+                rates[i],
+                rng.random(),
+            )
+        # base < cap 이면 모두 +1 가능 → 부담 작은 순서로 rem 명
+        for i in sorted(range(m), key=burden)[:rem]:
+            quotas[i] += 1
+
+    return quotas, assignable
+
+##############################################################
+# plan_day
+##############################################################
+def plan_day(staff_names, demands, edu_map, course_list, hist=(), solver="flow", rng=None,
+             ledger=None, quals=None, cap_map=None):
+    """
+    staff_names : 이름 리스트 (하루 공통) 또는 {교시: 이름 리스트}
+    demands     : {교시: {"1M": n, "1A": n, "2A": n, "2M": n}}
+    edu_map     : {교시: 교양 담당자}  (parse_extra 결과 그대로)
+    course_list : 코스 담당자 리스트 또는 {교시: 리스트}
+    hist        : 히스토리 dict 리스트 또는 '행운' 이름 집합 (동점 처리용)
+    ledger      : HistoryStore.ledger_totals() 결과 (장기 동점 처리, 없으면 안 씀)
+    quals       : 자격 설정 (roadauto.quals.Quals, 없으면 설정 파일) — 하루 동안 한 번만 읽는다
+    cap_map     : 교시별 cap (없으면 CAP_MAP, 센터별 설정은 Center.cap_map)
+
+    반환: {
+        "periods": {교시: [Staff, ...]},
+        "quotas":  {교시: [int, ...]},
+        "load":    {이름: 하루 누적 배정},
+        "weight":  {이름: 하루 누적 가중치},
+        "diags":   [진단 dict, ...],
+    }
+    """
+    rng = rng or random
+    quals = quals or load_quals()
+    lucky = lucky_name_set(hist)
+    diags = []
+    cum_load, cum_weight = {}, {}
+    out_periods, out_quotas = {}, {}
+
+    for p in PERIODS:
+        demand = demands.get(p)
+        names = _per_period(staff_names, p, [])
+        if not demand or not names:
+            continue
+
+        staff_objs = StaffTable(names, quals.masks(names)).staff
+        apply_weights(staff_objs, p, edu_map, _per_period(course_list, p, []))
+
+        total = sum(demand.get(t, 0) for t in TYPE_ORDER)
+        quotas, assignable = day_quota(staff_objs, p, total, cum_load, cum_weight, lucky, rng, ledger, cap_map)
+        for s, q in zip(staff_objs, quotas):
+            s.quota = q
+        if assignable < total:
+            add_diag(
+                diags, "error", "over_capacity",
+                f"🚨 {p}교시: 최대 처리 가능 인원({assignable}명)을 초과하는 수요({total}명)가 있습니다."
+            )
+
+        period_diags = []
+        d = {t: demand.get(t, 0) for t in TYPE_ORDER}
+        assign_types_within_quota(staff_objs, p, quotas, d, period_diags, solver, ledger)
+        for x in period_diags:
+            add_diag(diags, x["level"], x["code"], f"{p}교시: {x['msg']}")
+
+        for s in staff_objs:
+            cum_load[s.name] = cum_load.get(s.name, 0) + s.total_assigned
+            cum_weight[s.name] = cum_weight.get(s.name, 0) + s.weight_val
+
+        out_periods[p] = staff_objs
+        out_quotas[p] = quotas
+
+    return {
+        "periods": out_periods,
+        "quotas": out_quotas,
+        "load": cum_load,
+        "weight": cum_weight,
+        "diags": diags,
+    }
+
+def load_spread(plan):
+    """하루 누적 배정의 (최소, 최대) — 균형 확인용"""
+    loads = list(plan["load"].values())
+    if not loads:
+        return 0, 0
+    return min(loads), max(loads)
+
+##############################################################
+# 확정 → 히스토리 기록 (assign_logic 과 같은 min_load 규칙)
+##############################################################
+def day_pairings(plan, store, today=None):
+    """
+    교시별 pair_staff 결과. 같은 날 앞 교시의 짝도 반복으로 친다.
+    commit_day 는 이 결과를 그대로 기록한다 (화면에 보인 짝 = 기록되는 짝).
+    """
+    out, extra = {}, {}
+    for p, staff_objs in plan["periods"].items():
+        counts = store.pair_counts(today, p)
+        for k, v in extra.items():
+            counts[k] = counts.get(k, 0) + v
+        out[p] = pair_staff(staff_objs, counts)
+        for k in pair_list(out[p]):
+            extra[k] = extra.get(k, 0) + 1
+    return out
+
+def commit_day(plan, store, today=None, lucky=None):
+    """
+    min_load 기록 + 교시별 장기 원장 + 짝 기록을 한 트랜잭션으로.
+    lucky: 계획을 세울 때 본 '행운' 이름 (plan_day 의 hist). 주면 트랜잭션 안에서 다시 읽어
+           그사이 다른 곳에서 바뀌었으면 아무것도 쓰지 않고 StaleHistoryError.
+    """
+    day = (today or date.today()).isoformat()
+    entries = []
+    with store.transaction():
+        if lucky is not None and store.lucky_names(today) != lucky_name_set(lucky):
+            raise StaleHistoryError("계획을 세운 뒤 다른 곳에서 히스토리가 바뀌었습니다. 계획을 다시 확인하고 확정하세요.")
+        pairings = day_pairings(plan, store, today)
+        for p, staff_objs in plan["periods"].items():
+            entries.extend(lucky_entries(staff_objs, today))
+            store.ledger_put(day, p, ledger_entries(staff_objs))
+            store.pair_put(day, p, pair_list(pairings[p]))
+        store.append(entries)
+    return entries
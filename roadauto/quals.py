@@ -0,0 +1,134 @@
+##############################################################
+# quals.py — 감독관 자격 (종별) 설정: data/qualifications.json
+#
+#   {
+#     "default": ["1A", "2A"],                     # 목록에 없는 사람
+#     "manual":  ["권한솔", "김남균"],               # 모든 종 가능 (예전 MANUAL_SET 방식)
+#     "people":  {"홍길동": ["2A"], "이몽룡": ["1A", "2A", "2M"]}
+#   }
+#
+# 사람마다 TYPE_BIT 비트마스크 하나로 바꿔 둔다 → eligible() 은 비트 AND 한 번.
+# 파일은 mtime/크기가 바뀔 때만 다시 읽는다 (load_quals 는 stat 한 번).
+# 파일이 없으면 engine.MANUAL_SET (센터마다는 centers.json 의 manual) 으로 예전과 같은 자격.
+# 파일이 깨졌으면 예전 자격으로 돌리고 errors 에 이유를 남긴다 (UI 가 보여 줌).
+# StaffTable / Staff 는 이 파일을 읽지 않는다 — 배정하는 쪽(assign_logic, plan_day, 서버 등)이
+# quals.masks(names) 를 넘긴다. masks 없이 만든 표는 모두 ALL_MASK.
+##############################################################
+
+import os, json, threading
+
+from .engine import (
+    DATA_DIR, TYPE_ORDER, TYPE_BIT, ALL_MASK, AUTO_MASK, MANUAL_SET, save_json,
+)
+from . import metrics
+
+QUALS_FILE = os.path.join(DATA_DIR, "qualifications.json")
+
+def types_mask(types):
+    """["1M", "2A"] → 비트마스크 (모르는 종은 무시)"""
+    m = 0
+    for t in types:
+        m |= TYPE_BIT.get(t, 0)
+    return m
+
+def mask_types(mask):
+    return [t for t in TYPE_ORDER if mask & TYPE_BIT[t]]
+
+##############################################################
+# Quals
+##############################################################
+class Quals:
+    def __init__(self, people=None, default=AUTO_MASK, source=None, errors=None):
+        self.people = dict(people or {})   # 이름 → 비트마스크
+        self.default = default
+        self.source = source
+        self.errors = list(errors or [])
+
+    def mask(self, name):
+        return self.people.get(name, self.default)
+
+    def masks(self, names):
+        """명단 순서대로 비트마스크 리스트 (실행 시작 때 한 번)"""
+        get, d = self.people.get, self.default
+        return [get(nm, d) for nm in names]
+
+    def to_json(self):
+        return {
+            "default": mask_types(self.default),
+            "people": {nm: mask_types(m) for nm, m in sorted(self.people.items())},
+        }
+
+def legacy_quals(manual=None):
+    """설정 파일이 없을 때: manual (기본 MANUAL_SET) 은 모든 종, 나머지는 1A/2A"""
+    return Quals({nm: ALL_MASK for nm in (MANUAL_SET if manual is None else manual)}, AUTO_MASK)
+
+def parse_quals(raw, source=None, manual=None):
+    """JSON dict → Quals. 형식이 틀리면 예전 자격 (manual 기준) + errors."""
+    errors = []
+    if not isinstance(raw, dict):
+        q = legacy_quals(manual)
+        q.source, q.errors = source, ["최상위가 객체가 아닙니다"]
+        return q
+
+    default = raw.get("default", ["1A", "2A"])
+    if not isinstance(default, list):
+        errors.append("default 는 종 목록이어야 합니다")
+        default = ["1A", "2A"]
+    people = {}
+    for nm in raw.get("manual", []) or []:
+        people[str(nm)] = ALL_MASK
+    entries = raw.get("people", {}) or {}
+    if not isinstance(entries, dict):
+        errors.append("people 는 {이름: [종, ...]} 이어야 합니다")
+        entries = {}
+    for nm, types in entries.items():
+        if not isinstance(types, list):
+            errors.append(f"{nm}: 종 목록이 아닙니다")
+            continue
+        bad = [t for t in types if t not in TYPE_BIT]
+        if bad:
+            errors.append(f"{nm}: 모르는 종 {bad}")
+        people[str(nm)] = types_mask(types)
+    return Quals(people, types_mask(default), source, errors)
+
+##############################################################
+# 파일 캐시 (경로 + 기본 수동 명단별, mtime/크기 기준)
+##############################################################
+_cache = {}
+_cache_lock = threading.Lock()
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def load_quals(path=QUALS_FILE, manual=None):
+    """manual: 파일이 없거나 깨졌을 때 모든 종 가능으로 볼 이름들 (기본 MANUAL_SET)"""
+    key = (path, None if manual is None else frozenset(manual))
+    stamp = _stamp(path)
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit and hit[0] == stamp:
+            return hit[1]
+    if stamp is None:
+        q = legacy_quals(manual)
+    else:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                q = parse_quals(json.load(f), path, manual)
+        except (OSError, ValueError) as e:
+            q = legacy_quals(manual)
+            q.source, q.errors = path, [f"읽기 실패: {e}"]
+    metrics.count("quals_load")
+    with _cache_lock:
+        _cache[key] = (stamp, q)
+    return q
+
+def save_quals(raw, path=QUALS_FILE, manual=None):
+    """dict 를 검사한 뒤 저장. 반환: 저장된 Quals (errors 가 있으면 저장하지 않음)"""
+    q = parse_quals(raw, path, manual)
+    if not q.errors:
+        save_json(path, raw)
+    return q
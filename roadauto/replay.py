@@ -0,0 +1,125 @@
+##############################################################
+# replay.py — 실행 기록 재현 / 검증 (헤드리스 CLI)
+#
+#   python -m roadauto.replay --day 2024-05-02          # 그날 기록 전부
+#   python -m roadauto.replay --since 2024-05-01 --jobs 4
+#   python -m roadauto.replay --id 17 --id 18 --show
+#   python -m roadauto.replay --center busan --day 2024-05-02   # 센터별 DB (data/busan/)
+#
+# 기록마다 메모리 SQLite 에 '행운' 스냅샷만 넣고, 같은 날짜/시드/solver/원장 값/자격으로
+# assign_logic 을 다시 돌려 결과 digest 가 기록과 똑같은지 본다.
+# 실시간 수정을 거쳐 확정된 기록("edits")은 그 수정들을 reassign 으로 차례대로 다시 적용한다.
+# 실제 data/ 의 히스토리는 건드리지 않는다 (읽기만).
+# 엔진을 고친 뒤 예전 기록 전체를 돌려 보면 그대로 회귀 테스트가 된다.
+##############################################################
+
+import sys, argparse
+from datetime import date
+from concurrent.futures import ProcessPoolExecutor
+
+from .engine import assign_logic
+from .incremental import reassign
+from .history import HistoryStore
+from .runlog import result_summary, result_digest, record_ledger, record_quals, record_cap_map
+
+##############################################################
+# 재현
+##############################################################
+def replay(record):
+    """기록 하나를 다시 실행 → (staff_objs, diags). 히스토리는 메모리에만."""
+    today = date.fromisoformat(record["day"])
+    store = HistoryStore(":memory:", legacy_json=None)
+    store.append([{"date": record["day"], "name": n} for n in record["lucky"]])
+    ledger, cap_map = record_ledger(record), record_cap_map(record)
+    staff_objs, _, diags = assign_logic(
+        record["staff"], record["period"], record["demand"], record["edu"], record["course"],
+        today=today, solver=record["solver"], store=store, commit=False,
+        seed=record["seed"], log=False, ledger=ledger, quals=record_quals(record),
+        cap_map=cap_map,
+    )
+    store.close()
+    kept = [d for d in diags if d["code"] == "history_reset"]
+    lucky = () if kept else record["lucky"]
+    for e in record.get("edits", ()):
+        diags = []
+        reassign(staff_objs, record["period"], e["demand"], diags, solver=e["solver"],
+                 cap_map=cap_map, hist=lucky, ledger=ledger)
+        diags = kept + diags
+    return staff_objs, diags
+
+def verify(record):
+    """
+    반환: {"id", "ok", "expected", "got", "diff"}
+    diff: 결과가 다른 사람 [(이름, 기록, 재현), ...] (진단 코드가 다르면 ("<diags>", ...))
+    """
+    out = {"id": record.get("id"), "ok": False, "expected": record["digest"], "got": None, "diff": []}
+    if record["seed"] is None:
+        out["diff"].append(("<seed>", "rng 직접 지정 — 재현 불가", None))
+        return out
+    staff_objs, diags = replay(record)
+    rows, codes = result_summary(staff_objs, diags)
+    out["got"] = result_digest(rows, codes)
+    out["ok"] = out["got"] == out["expected"]
+    if not out["ok"]:
+        for a, b in zip(record["result"], rows):
+            if a != b:
+                out["diff"].append((a[0], a[1:], b[1:]))
+        if len(record["result"]) != len(rows):
+            out["diff"].append(("<rows>", len(record["result"]), len(rows)))
+        if record["codes"] != codes:
+            out["diff"].append(("<diags>", record["codes"], codes))
+    return out
+
+def _verify_many(records):
+    return [verify(r) for r in records]
+
+def verify_runs(records, jobs=1, chunk=64):
+    """여러 기록을 한 번에 검증. jobs > 1 이면 프로세스 풀 (결과는 입력 순서대로)."""
+    if jobs <= 1 or len(records) <= chunk:
+        return _verify_many(records)
+    parts = [records[k:k + chunk] for k in range(0, len(records), chunk)]
+    out = []
+    with ProcessPoolExecutor(max_workers=jobs) as ex:
+        for res in ex.map(_verify_many, parts):
+            out.extend(res)
+    return out
+
+##############################################################
+# main
+##############################################################
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="배정 실행 기록 재현 / 검증")
+    ap.add_argument("--center", default=None, help="센터 키 (기본: 기본 센터) — 그 센터의 history DB")
+    ap.add_argument("--db", default=None, help="history DB 경로를 직접 (runs 테이블)")
+    ap.add_argument("--day", help="이 날짜 기록만 (YYYY-MM-DD)")
+    ap.add_argument("--since", help="이 날짜 이후 기록")
+    ap.add_argument("--id", type=int, action="append", help="특정 기록 id (여러 번 가능)")
+    ap.add_argument("--jobs", type=int, default=1, help="프로세스 수")
+    ap.add_argument("--show", action="store_true", help="기록 입력/결과도 출력")
+    args = ap.parse_args(argv)
+
+    if args.db is None:
+        from .centers import get_center
+        args.db = get_center(args.center).history_db
+    store = HistoryStore(args.db, legacy_json=None)
+    records = store.runs(day=args.day, since=args.since, ids=args.id)
+    store.close()
+    if not records:
+        print("[replay] 해당 기록 없음", file=sys.stderr)
+        return 0
+
+    results = verify_runs(records, jobs=args.jobs)
+    bad = 0
+    for rec, res in zip(records, results):
+        mark = "OK " if res["ok"] else "DIFF"
+        print(f"{mark} #{rec['id']} {rec['day']} {rec['period']}교시 seed={rec['seed']} {res['expected']} → {res['got']}")
+        if args.show:
+            print(f"     근무자 {rec['staff']}  수요 {rec['demand']}  행운 {rec['lucky']}")
+        for name, want, got in res["diff"]:
+            print(f"     {name}: 기록 {want} / 재현 {got}")
+        bad += not res["ok"]
+    print(f"[replay] {len(results)}건 중 불일치 {bad}건", file=sys.stderr)
+    return 1 if bad else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
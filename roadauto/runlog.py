@@ -0,0 +1,105 @@
+##############################################################
+# runlog.py — 배정 실행 기록 (재현용)
+#
+# assign_logic 한 번 = 레코드 하나.
+#   입력: 근무자, 교시, 수요, edu_map, 코스, 날짜, solver, 시드,
+#         그때 읽은 '행운' 이름 (히스토리 스냅샷 — quota 추첨이 보는 건 이것뿐)
+#         장기 원장을 썼으면 그 누적 중 동점 처리에 쓰는 값 (교시 수, 총 배정, 1M)
+#         근무자별 자격 비트마스크 (설정 파일이 바뀌어도 같은 자격으로 재현)
+#         교시별 cap (센터마다 다를 수 있음)
+#   결과: 사람별 (quota, 가중치, 타입별 대수) + 진단 코드, 그리고 그 digest
+# 화면에서 '실시간 수정'(incremental.reassign)을 거친 결과를 확정하면 edited_record 로
+# 레코드를 하나 더 남긴다: 원래 입력 + "edits" (수정한 수요 순서대로) + 최종 결과, "base" = 원래 id.
+# JSON 을 zlib 로 눌러서 history DB 의 runs 테이블에 넣는다 (한 건 수백 바이트).
+# 재실행 / 검증은 replay.py.
+##############################################################
+
+import json, random, zlib, hashlib
+
+RUN_FORMAT = 1
+
+def new_seed():
+    """기록에 남길 새 시드 (63비트 정수 — SQLite INTEGER 에 그대로 들어감)"""
+    return random.SystemRandom().getrandbits(63)
+
+def result_summary(staff_objs, diags):
+    """결과를 비교 가능한 형태로: ([[이름, quota, 가중치, 1M, 1A, 2A, 2M], ...], [진단 코드, ...])"""
+    from .engine import TYPE_ORDER
+    rows = [
+        [s.name, s.quota, s.weight_val, *(s.assigned_counts[t] for t in TYPE_ORDER)]
+        for s in staff_objs
+    ]
+    return rows, [d["code"] for d in diags]
+
+def result_digest(rows, codes):
+    raw = json.dumps([rows, codes], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+def make_record(staff_names, period, demand, edu_map, course_list, today, solver, seed,
+                lucky, staff_objs, diags, ledger=None, elig=None, cap_map=None):
+    rows, codes = result_summary(staff_objs, diags)
+    rec = {
+        "v": RUN_FORMAT,
+        "day": today.isoformat(),
+        "period": period,
+        "seed": seed,
+        "solver": solver,
+        "staff": list(staff_names),
+        "demand": dict(demand),
+        "edu": {str(k): v for k, v in edu_map.items()},
+        "course": list(course_list),
+        "lucky": sorted(lucky),
+        "result": rows,
+        "codes": codes,
+        "digest": result_digest(rows, codes),
+    }
+    if elig is not None:
+        rec["elig"] = list(elig)
+    if cap_map is not None:
+        rec["cap"] = {str(p): c for p, c in cap_map.items()}
+    if ledger:
+        rec["ledger"] = {nm: [a["periods"], a["total"], a["1M"]] for nm, a in ledger.items()}
+    return rec
+
+def edited_record(base, edits, staff_objs, diags):
+    """
+    base 실행 기록 + 실시간 수정 [{"demand", "solver"}, ...] → 최종 결과로 새 레코드.
+    diags: 마지막 reassign 뒤의 진단 (화면과 같게 history_reset + 그 reassign 진단).
+    """
+    rec = {k: v for k, v in base.items() if k != "id"}
+    rec["base"] = base.get("id")
+    rec["edits"] = [{"demand": dict(e["demand"]), "solver": e["solver"]} for e in edits]
+    rows, codes = result_summary(staff_objs, [d for d in diags if d["code"] != "run_logged"])
+    rec["result"], rec["codes"], rec["digest"] = rows, codes, result_digest(rows, codes)
+    return rec
+
+def record_quals(record):
+    """기록의 자격 → Quals (자격 기록이 없는 예전 기록은 MANUAL_SET 기준)"""
+    from .quals import Quals, legacy_quals
+    if "elig" not in record:
+        return legacy_quals()
+    return Quals(dict(zip(record["staff"], record["elig"])))
+
+def record_cap_map(record):
+    """기록의 교시별 cap → dict (cap 기록이 없는 예전 기록은 None = CAP_MAP)"""
+    saved = record.get("cap")
+    return {int(p): c for p, c in saved.items()} if saved else None
+
+def record_ledger(record):
+    """기록에 남은 원장 값 → assign_logic(ledger=...) 에 넘길 dict (없으면 False = 쓰지 않음)"""
+    saved = record.get("ledger")
+    if not saved:
+        return False
+    return {nm: {"periods": p, "total": t, "1M": m} for nm, (p, t, m) in saved.items()}
+
+##############################################################
+# 직렬화
+##############################################################
+def pack(record):
+    raw = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    return zlib.compress(raw.encode("utf-8"), 9)
+
+def unpack(blob):
+    rec = json.loads(zlib.decompress(blob).decode("utf-8"))
+    rec["edu"] = {int(k): v for k, v in rec["edu"].items()}
+    return rec
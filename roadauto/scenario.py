@@ -0,0 +1,263 @@
+##############################################################
+# scenario.py — 수요 시나리오 일괄 비교 (하루 시작 전 인원 점검용)
+#
+#   python -m roadauto.scenario --roster 근무.txt --period 3 \
+#       --demand 1M=0-3 --demand 1A=2-8:2 --demand 2A=~5 --demand 2M=1,2 \
+#       [--samples 2000] [--jobs 4] [--solver flow] [--center busan]
+#
+# 수요 지정 (타입마다):
+#   "3"      고정          "0-4"   범위 (0,1,2,3,4)      "2-8:2"  범위 + 간격
+#   "1,3,5"  목록          "~5"    포아송(평균 5) 분포
+# 모두 고정/범위/목록이면 전체 조합(격자)을, 분포가 하나라도 있으면
+# samples 개를 뽑는다 (격자 타입은 그 값 중 균등).
+#
+# 시나리오마다 quota → 타입 배정만 돌린다 (히스토리 읽기/쓰기 없음, '행운' 스냅샷은
+# 호출하는 쪽이 넘겨 줄 수 있음). 프로세스 풀에서 묶음 단위로 돌리고
+# 시나리오마다 시드가 정해져 있어서 jobs 수와 관계없이 결과가 같다.
+##############################################################
+
+import sys, math, time, random, argparse, itertools
+from concurrent.futures import ProcessPoolExecutor
+
+from .engine import (
+    TYPE_ORDER, CAP_MAP, SOLVERS, StaffTable, apply_weights, compute_quota,
+    assign_types_within_quota, check_history_full,
+)
+from .quals import load_quals
+from .centers import get_center
+
+CHUNK = 256          # 프로세스 하나에 한 번에 넘기는 시나리오 수
+
+##############################################################
+# 수요 지정 → 시나리오 목록
+##############################################################
+def parse_spec(text):
+    """
+    '3' | '0-4' | '2-8:2' | '1,3,5' | '~5' → ("values", [...]) 또는 ("poisson", 평균)
+    거꾸로 된 범위 ('4-0'), 0 이하 간격, 빈 목록은 ValueError (빈 격자를 조용히 돌려주지 않는다).
+    """
+    s = str(text).strip().replace(" ", "")
+    if s.startswith("~"):
+        return ("poisson", float(s[1:]))
+    if "," in s:
+        values = sorted({int(x) for x in s.split(",") if x})
+        if not values:
+            raise ValueError(f"'{text}': 목록이 비어 있습니다")
+        return ("values", values)
+    if "-" in s[1:]:
+        body, _, step = s.partition(":")
+        lo, hi = body.split("-", 1)
+        lo, hi, step = int(lo), int(hi), int(step or 1)
+        if lo > hi:
+            raise ValueError(f"'{text}': 범위가 거꾸로입니다 ({lo} > {hi}) — {hi}-{lo} 로 쓰세요")
+        if step < 1:
+            raise ValueError(f"'{text}': 간격은 1 이상이어야 합니다")
+        return ("values", list(range(lo, hi + 1, step)))
+    return ("values", [int(s)])
+
+def _poisson(rng, mean):
+    # Knuth (평균이 작을 때 충분), 큰 평균은 정규 근사
+    if mean > 30:
+        return max(0, int(round(rng.gauss(mean, math.sqrt(mean)))))
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+def make_scenarios(specs, samples=1000, seed=0):
+    """
+    specs: {타입: 지정 문자열 또는 parse_spec 결과}
+    지정이 틀리면 ValueError (메시지 앞에 타입)
+    반환: [{"1M": n, "1A": n, "2A": n, "2M": n}, ...]
+    """
+    parsed = {}
+    for t in TYPE_ORDER:
+        sp = specs.get(t, 0)
+        try:
+            parsed[t] = sp if isinstance(sp, tuple) else parse_spec(sp)
+        except ValueError as e:
+            raise ValueError(f"{t}: {e}") from None
+    if all(kind == "values" for kind, _ in parsed.values()):
+        grids = [parsed[t][1] for t in TYPE_ORDER]
+        return [dict(zip(TYPE_ORDER, combo)) for combo in itertools.product(*grids)]
+    rng = random.Random(seed)
+    out = []
+    for _ in range(samples):
+        d = {}
+        for t in TYPE_ORDER:
+            kind, v = parsed[t]
+            d[t] = _poisson(rng, v) if kind == "poisson" else rng.choice(v)
+        out.append(d)
+    return out
+
+##############################################################
+# 풀기 (워커)
+##############################################################
+def _solve_chunk(job):
+    """묶음 하나 → [(사람별 배정 튜플, assignable, partial_fill 여부), ...]"""
+    names, masks, weights, period, lucky, solver, seed, start, demands, cap_map = job
+    table = StaffTable(names, masks)
+    table.weight[:] = weights
+    staff = table.staff
+    if check_history_full(lucky, names):
+        lucky = set()
+    out = []
+    for k, demand in enumerate(demands):
+        table.reset_counts()
+        rng = random.Random((seed << 32) ^ (start + k))
+        total = sum(demand.values())
+        quotas, assignable = compute_quota(staff, period, total, lucky, rng, cap_map=cap_map)
+        table.quota[:] = quotas
+        diags = []
+        assign_types_within_quota(staff, period, quotas, dict(demand), diags, solver)
+        out.append((tuple(table.total), assignable, bool(diags)))
+    return out
+
+##############################################################
+# 진입점
+##############################################################
+def run_scenarios(staff_names, period, scenarios, edu_map=None, course_list=(),
+                  solver="flow", lucky=(), seed=0, jobs=1, quals=None, cap_map=None):
+    """
+    scenarios: make_scenarios 결과 (수요 dict 리스트)
+    lucky    : '행운' 이름 스냅샷 (기본 없음 — 히스토리는 읽지 않는다)
+    cap_map  : 교시별 cap (기본 CAP_MAP, 센터별 설정은 Center.cap_map)
+    반환: {
+        "names", "period", "cap", "capacity", "ms",
+        "scenarios": [{"수요": {...}, "총 수요", "배정 가능", "미배정", "cap 초과", "필요 인원",
+                       "최대-최소", "부분 배정"}],
+        "loads":     [사람별 배정 튜플, ...]   (scenarios 와 같은 순서),
+        "people":    [{"이름", "평균", "최대", "cap 도달"}],
+        "summary":   {...},
+    }
+    """
+    t0 = time.perf_counter()
+    names = list(staff_names)
+    quals = quals or load_quals()
+    masks = quals.masks(names)
+    probe = StaffTable(names, masks)
+    apply_weights(probe.staff, period, edu_map or {}, list(course_list))
+    lucky = set(lucky)
+    cap_map = cap_map or CAP_MAP
+
+    jobs_list = [
+        (names, masks, list(probe.weight), period, lucky, solver, seed, k, scenarios[k:k + CHUNK], cap_map)
+        for k in range(0, len(scenarios), CHUNK)
+    ]
+    results = []
+    if jobs <= 1 or len(jobs_list) <= 1:
+        for job in jobs_list:
+            results.extend(_solve_chunk(job))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as ex:
+            for part in ex.map(_solve_chunk, jobs_list):
+                results.extend(part)
+
+    n = len(names)
+    cap = cap_map.get(period, 3)
+    capacity = n * cap
+    rows, loads = [], []
+    for demand, (load, assignable, partial) in zip(scenarios, results):
+        total = sum(demand.values())
+        assigned = sum(load)
+        rows.append({
+            "수요": dict(demand),
+            "총 수요": total,
+            "배정 가능": assignable,
+            "미배정": total - assigned,
+            "cap 초과": max(0, total - capacity),
+            "필요 인원": math.ceil(total / cap) if cap else 0,
+            "최대-최소": (max(load) - min(load)) if load else 0,
+            "부분 배정": partial,
+        })
+        loads.append(load)
+
+    m = len(loads)
+    people = []
+    for i, nm in enumerate(names):
+        col = [ld[i] for ld in loads]
+        people.append({
+            "이름": nm,
+            "평균": round(sum(col) / m, 2) if m else 0,
+            "최대": max(col) if col else 0,
+            "cap 도달": round(sum(1 for x in col if x >= cap) / m, 3) if m else 0,
+        })
+
+    summary = {
+        "시나리오": m,
+        "미배정 발생": sum(1 for r in rows if r["미배정"] > 0),
+        "cap 초과 발생": sum(1 for r in rows if r["cap 초과"] > 0),
+        "최대 필요 인원": max((r["필요 인원"] for r in rows), default=0),
+        "최대 미배정": max((r["미배정"] for r in rows), default=0),
+        "평균 최대-최소": round(sum(r["최대-최소"] for r in rows) / m, 2) if m else 0,
+    }
+    return {
+        "names": names, "period": period, "cap": cap, "capacity": capacity,
+        "scenarios": rows, "loads": loads, "people": people, "summary": summary,
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+
+def worst(result, top=20):
+    """미배정 → cap 초과 → 최대-최소 큰 순서로 시나리오 top 개"""
+    return sorted(
+        result["scenarios"],
+        key=lambda r: (-r["미배정"], -r["cap 초과"], -r["최대-최소"]),
+    )[:top]
+
+##############################################################
+# main
+##############################################################
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="수요 시나리오 일괄 비교")
+    ap.add_argument("--roster", required=True, help="근무 텍스트 파일")
+    ap.add_argument("--center", default=None, help="센터 키 (cap / 자격 / 근무표 형식)")
+    ap.add_argument("--period", type=int, required=True)
+    ap.add_argument("--demand", action="append", default=[],
+                    help="타입=지정 (예: 1M=0-3, 1A=2-8:2, 2A=~5, 2M=1,2)")
+    ap.add_argument("--samples", type=int, default=1000, help="분포가 있을 때 뽑을 시나리오 수")
+    ap.add_argument("--jobs", type=int, default=1)
+    ap.add_argument("--solver", choices=SOLVERS, default="flow")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--top", type=int, default=15, help="나쁜 시나리오 몇 개 보여 줄지")
+    args = ap.parse_args(argv)
+
+    specs = {}
+    for item in args.demand:
+        t, _, sp = item.partition("=")
+        if t not in TYPE_ORDER or not sp:
+            ap.error(f"--demand 형식: 타입=지정 ({item})")
+        specs[t] = sp
+    with open(args.roster, "r", encoding="utf-8") as f:
+        text = f.read()
+    center = get_center(args.center)
+    r = center.parse(text)
+    names, edu, course = list(r.staff), dict(r.edu), list(r.course)
+
+    try:
+        scenarios = make_scenarios(specs, args.samples, args.seed)
+    except ValueError as e:
+        ap.error(f"--demand 지정 오류: {e}")
+    res = run_scenarios(
+        names, args.period, scenarios, edu, course,
+        solver=args.solver, seed=args.seed, jobs=args.jobs,
+        quals=center.quals(), cap_map=center.cap_map,
+    )
+    s = res["summary"]
+    print(f"[scenario] {s['시나리오']}개, {res['ms']} ms — 근무자 {len(names)}명, "
+          f"{args.period}교시 cap {res['cap']} (최대 {res['capacity']}명)", file=sys.stderr)
+    print("요약: " + ", ".join(f"{k} {v}" for k, v in s.items()))
+    print("\n이름\t평균\t최대\tcap 도달")
+    for p in res["people"]:
+        print(f"{p['이름']}\t{p['평균']}\t{p['최대']}\t{p['cap 도달'] * 100:.0f}%")
+    print("\n" + "\t".join(TYPE_ORDER + ["총", "미배정", "cap 초과", "필요 인원", "최대-최소"]))
+    for r in worst(res, args.top):
+        print("\t".join(str(x) for x in [
+            *(r["수요"][t] for t in TYPE_ORDER),
+            r["총 수요"], r["미배정"], r["cap 초과"], r["필요 인원"], r["최대-최소"],
+        ]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
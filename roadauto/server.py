@@ -0,0 +1,420 @@
+##############################################################
+# server.py — 가벼운 HTTP/JSON 배정 서비스 (Streamlit 없이, 표준 라이브러리만)
+#
+#   python -m roadauto.server [--host 127.0.0.1] [--port 8765] [--db data/history.sqlite3]
+#
+# 엔드포인트 (요청/응답 모두 JSON, UTF-8)
+#   POST /parse    {"text"}                      → 근무자/교양/코스/인식 못 한 줄/진단
+#   POST /assign   {"text" 또는 "staff", "period", "demand", "edu", "course",
+#                   "solver", "commit", "seed", "date"}
+#                                                → 사람별 배정 + 페어링 + 진단 (+ seed)
+#   POST /pair     {"staff": [{"name", "counts"}], "period", "date", "history"}
+#                                                → 페어링 (history 면 최근 짝 기록 반영)
+#   GET  /history  ?names=a,b&date=YYYY-MM-DD   → 행운 이름 / 최근 기록 / 장기 원장
+#   GET  /health, GET /metrics
+# 모든 요청에 "center" (GET 은 ?center=) 를 주면 그 센터의 설정/저장소 (centers.py),
+# 없으면 기본 센터. 모르는 센터는 404.
+#
+# 히스토리 저장소는 센터마다 처음 쓸 때 열어 두고 (연결/페이지 캐시 유지) 계속 쓴다.
+# 기본 센터 것은 서버가 뜰 때 연다.
+# /assign 은 저장소(= 센터)마다 스레드 하나(Batcher)가 줄에서 꺼내 처리한다.
+#   - 그때 줄에 쌓여 있는 요청을 최대 BATCH_MAX 개까지 한 트랜잭션으로 묶어서
+#     차례대로 돌린다 → 히스토리 쓰기는 항상 직렬, 커밋(fsync)은 묶음당 한 번.
+#   - 묶음 안의 요청은 앞 요청이 쓴 기록을 본다 (하나씩 보낸 것과 같은 결과).
+#   - 묶음 중 하나가 실패하면 묶음 전체가 롤백되므로 하나씩 다시 돌린다.
+#   - WAIT 초 안에 차례가 안 오면 그 요청은 취소한다 (줄에서 꺼낼 때 건너뜀 → 기록 안 됨)
+#     → 503. 이미 돌기 시작한 뒤라면 끝날 때까지 기다려 결과를 그대로 돌려준다.
+#     그래서 503 을 받은 클라이언트가 다시 보내도 두 번 기록되지 않는다.
+# /parse, /pair(history 없이) 는 저장소를 건드리지 않고 요청 스레드에서 바로.
+##############################################################
+
+import sys, json, queue, argparse, threading
+from datetime import date
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from .engine import TYPE_ORDER, SOLVERS, StaffTable, assign_logic
+from .centers import CENTERS_FILE, get_center, load_centers
+from .pairing import pair_staff, pairing_lines
+from .runlog import new_seed
+from .metrics import METRICS, stage
+
+BATCH_MAX = 64         # 한 트랜잭션에 묶을 /assign 최대 수
+MAX_BODY = 1 << 20     # 요청 본문 최대 (바이트)
+WAIT = 60.0            # /assign 이 줄에서 기다리는 최대 시간 (초)
+
+class ApiError(Exception):
+    """요청이 잘못됨 → 400 (status 를 바꿔 쓸 수 있음)"""
+    def __init__(self, msg, status=400):
+        super().__init__(msg)
+        self.status = status
+
+##############################################################
+# 입력 검사
+##############################################################
+def _period(v, center):
+    try:
+        p = int(v)
+    except (TypeError, ValueError):
+        raise ApiError(f"period 가 숫자가 아닙니다: {v!r}")
+    if p not in center.periods:
+        raise ApiError(f"{center.key} 센터에 없는 교시: {p}")
+    return p
+
+def _demand(v, field="demand"):
+    """{타입: 0 이상 정수} 검사 (/assign 의 demand, /pair 의 사람별 counts — 오류에는 field 이름)"""
+    if not isinstance(v, dict):
+        raise ApiError(f"{field} 는 {{타입: 수}} 이어야 합니다")
+    bad = [t for t in v if t not in TYPE_ORDER]
+    if bad:
+        raise ApiError(f"{field} 에 모르는 타입: {bad}")
+    out = {}
+    for t in TYPE_ORDER:
+        n = v.get(t, 0)
+        if not isinstance(n, int) or isinstance(n, bool) or n < 0:
+            raise ApiError(f"{field}[{t}] 는 0 이상 정수여야 합니다")
+        out[t] = n
+    return out
+
+def _names(v, field="staff"):
+    if not isinstance(v, list) or not all(isinstance(x, str) and x.strip() for x in v):
+        raise ApiError(f"{field} 는 이름 문자열 목록이어야 합니다")
+    names = [x.strip() for x in v]
+    if len(set(names)) != len(names):
+        raise ApiError(f"{field} 에 같은 이름이 두 번 있습니다")
+    return names
+
+def _day(v):
+    if v is None:
+        return date.today()
+    try:
+        return date.fromisoformat(str(v))
+    except ValueError:
+        raise ApiError(f"date 형식은 YYYY-MM-DD: {v!r}")
+
+def _edu(v):
+    if not isinstance(v, dict):
+        raise ApiError("edu 는 {교시: 이름} 이어야 합니다")
+    try:
+        return {int(k): str(nm) for k, nm in v.items()}
+    except ValueError:
+        raise ApiError("edu 의 키는 교시 숫자여야 합니다")
+
+def staff_json(staff_objs):
+    return [
+        {
+            "name": s.name, "counts": dict(s.assigned_counts), "total": s.total_assigned,
+            "quota": s.quota, "weight": s.weight_val,
+        }
+        for s in staff_objs
+    ]
+
+def pairing_json(result):
+    return {"lines": pairing_lines(result), "pairs": result["pairs"], "cost": result["cost"]}
+
+##############################################################
+# Batcher — 저장소 하나의 /assign 줄
+##############################################################
+class Batcher:
+    def __init__(self, store, max_batch=BATCH_MAX):
+        self.store = store
+        self.max_batch = max_batch
+        self.batches = 0
+        self.jobs = 0
+        self.largest = 0
+        self.cancelled = 0
+        self._q = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="roadauto-batcher", daemon=True)
+        self._thread.start()
+
+    def pending(self):
+        return self._q.qsize()
+
+    def submit(self, fn, timeout=WAIT):
+        """
+        fn() 을 다음 묶음에서 (저장소 트랜잭션 안에서) 돌리고 결과를 돌려준다.
+        timeout 안에 시작하지 못하면 취소하고 ApiError(503) — fn 은 돌지 않는다.
+        """
+        fut = Future()
+        self._q.put((fn, fut))
+        try:
+            return fut.result(timeout)
+        except FutureTimeout:
+            if fut.cancel():
+                self.cancelled += 1
+                raise ApiError(f"{timeout:g}초 안에 처리하지 못해 취소했습니다 (기록 안 됨, 다시 보내도 됨)", 503)
+        # 이미 돌기 시작함 → 취소할 수 없으니 끝날 때까지 기다린다
+        return fut.result()
+
+    def _loop(self):
+        while True:
+            batch = [self._q.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            # 기다리다 취소된 요청은 버린다. 나머지는 RUNNING 이 되어 더는 취소되지 않는다.
+            batch = [(fn, fut) for fn, fut in batch if fut.set_running_or_notify_cancel()]
+            if batch:
+                self._run(batch)
+
+    def _run(self, batch):
+        try:
+            with stage("api_batch"), self.store.transaction():
+                out = [fn() for fn, _ in batch]
+        except Exception as e:
+            if len(batch) > 1:
+                # 묶음 전체가 롤백됨 → 하나씩 다시 (실패한 요청만 오류로)
+                for one in batch:
+                    self._run([one])
+                return
+            batch[0][1].set_exception(e)
+            return
+        self.batches += 1
+        self.jobs += len(batch)
+        self.largest = max(self.largest, len(batch))
+        for (_, fut), r in zip(batch, out):
+            fut.set_result(r)
+
+##############################################################
+# Service — HTTP 와 상관없는 dict → dict
+##############################################################
+class Service:
+    def __init__(self, store=None, max_batch=BATCH_MAX, centers_file=CENTERS_FILE):
+        """store: 기본 센터 저장소를 바꿔 끼울 때 (벤치/시험용)"""
+        self.centers_file = centers_file
+        self.max_batch = max_batch
+        self.default = load_centers(centers_file).default
+        self._override = store
+        self._batchers = {}    # 저장소 경로 → (센터 키, Batcher)
+        self._lock = threading.Lock()
+        self.store(self.center(None)).conn()    # 기본 센터는 뜰 때 열어 둔다
+
+    def center(self, key):
+        try:
+            return get_center(key, self.centers_file)
+        except KeyError as e:
+            raise ApiError(e.args[0], 404)
+
+    def store(self, center):
+        if self._override is not None and center.key == self.default:
+            return self._override
+        return center.store()
+
+    def batcher(self, center):
+        store = self.store(center)
+        with self._lock:
+            hit = self._batchers.get(store.path)
+            if hit is None:
+                hit = self._batchers[store.path] = (center.key, Batcher(store, self.max_batch))
+        return hit[1]
+
+    def parse(self, body):
+        text = body.get("text")
+        if not isinstance(text, str):
+            raise ApiError("text 가 필요합니다")
+        r = self.center(body.get("center")).parse(text)
+        return {
+            "staff": list(r.staff), "edu": r.edu, "course": list(r.course),
+            "unparsed": [list(u) for u in r.unparsed], "diags": list(r.diags),
+        }
+
+    def assign(self, body):
+        center = self.center(body.get("center"))
+        if "text" in body:
+            r = center.parse(str(body["text"]))
+            names, edu, course = list(r.staff), dict(r.edu), list(r.course)
+        else:
+            names, edu, course = [], {}, []
+        if "staff" in body:
+            names = _names(body["staff"])
+        if "edu" in body:
+            edu = _edu(body["edu"])
+        if "course" in body:
+            course = _names(body["course"], "course")
+        if not names:
+            raise ApiError("근무자가 없습니다 (text 또는 staff)")
+        period = _period(body.get("period"), center)
+        demand = _demand(body.get("demand", {}))
+        solver = body.get("solver", "greedy")
+        if solver not in SOLVERS:
+            raise ApiError(f"solver 는 {list(SOLVERS)} 중 하나")
+        seed = body.get("seed")
+        if seed is not None and not isinstance(seed, int):
+            raise ApiError("seed 는 정수여야 합니다")
+        seed = new_seed() if seed is None else seed
+        commit = bool(body.get("commit", False))
+        today = _day(body.get("date"))
+        store = self.store(center)
+
+        def job():
+            staff_objs, _, diags = assign_logic(
+                names, period, demand, edu, course, today=today, solver=solver,
+                store=store, commit=commit, seed=seed, center=center,
+            )
+            counts = store.pair_counts(today, period)
+            return {
+                "center": center.key, "period": period, "seed": seed, "committed": commit,
+                "staff": staff_json(staff_objs),
+                "pairing": pairing_json(pair_staff(staff_objs, counts)),
+                "diags": diags,
+            }
+
+        with stage("api_assign_wait"):
+            return self.batcher(center).submit(job)
+
+    def pair(self, body):
+        center = self.center(body.get("center"))
+        rows = body.get("staff")
+        if not isinstance(rows, list) or not all(isinstance(x, dict) for x in rows):
+            raise ApiError('staff 는 [{"name", "counts"}] 목록이어야 합니다')
+        names = _names([x.get("name") for x in rows])
+        table = StaffTable(names, center.quals().masks(names))
+        for i, x in enumerate(rows):
+            for t, v in _demand(x.get("counts", {}), f"staff[{i}].counts ({names[i]})").items():
+                table.staff[i].assigned_counts[t] = v
+            table.total[i] = sum(table.counts[i])
+        counts = None
+        if body.get("history", True) and "period" in body:
+            counts = self.store(center).pair_counts(_day(body.get("date")), _period(body["period"], center))
+        return pairing_json(pair_staff(table.staff, counts))
+
+    def history(self, query):
+        center = self.center(query.get("center"))
+        store = self.store(center)
+        today = _day(query.get("date"))
+        names = [x for x in query.get("names", "").split(",") if x] or None
+        return {
+            "center": center.key,
+            "date": today.isoformat(),
+            "lucky": sorted(store.lucky_names(today)),
+            "recent": store.recent(today),
+            "ledger": store.ledger_totals(names),
+        }
+
+    def health(self, query):
+        with self._lock:
+            open_ = list(self._batchers.items())
+        return {
+            "ok": True, "default": self.default,
+            "centers": load_centers(self.centers_file).keys(),
+            "open": {
+                key: {
+                    "db": path, "pending": b.pending(),
+                    "batches": b.batches, "jobs": b.jobs, "largest_batch": b.largest,
+                    "cancelled": b.cancelled,
+                }
+                for path, (key, b) in open_
+            },
+        }
+
+    def metrics(self, query):
+        out = METRICS.export()
+        out.pop("runs", None)      # 실행별 기록은 빼고 요약만
+        return out
+
+ROUTES = {
+    ("POST", "/parse"): "parse",
+    ("POST", "/assign"): "assign",
+    ("POST", "/pair"): "pair",
+    ("GET", "/history"): "history",
+    ("GET", "/health"): "health",
+    ("GET", "/metrics"): "metrics",
+}
+
+##############################################################
+# HTTP
+##############################################################
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive (Content-Length 는 항상 보냄)
+    server_version = "roadauto/1"
+    service = None                    # make_server 가 채운다
+    quiet = True
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        name = ROUTES.get((method, url.path))
+        try:
+            if name is None:
+                raise ApiError(f"없는 경로: {method} {url.path}", 404)
+            if method == "POST":
+                arg = self._body()
+            else:
+                arg = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            with stage(f"api_{name}"):
+                out = getattr(self.service, name)(arg)
+            self._send(200, out)
+        except ApiError as e:
+            self._send(e.status, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        if n > MAX_BODY:
+            raise ApiError("요청이 너무 큽니다", 413)
+        raw = self.rfile.read(n) if n else b"{}"
+        try:
+            body = json.loads(raw.decode("utf-8"))
+        except ValueError:
+            raise ApiError("JSON 이 아닙니다")
+        if not isinstance(body, dict):
+            raise ApiError("본문은 JSON 객체여야 합니다")
+        return body
+
+    def _send(self, status, obj):
+        data = json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+def make_server(host="127.0.0.1", port=8765, service=None, quiet=True):
+    """ThreadingHTTPServer (serve_forever 는 호출하는 쪽이). port=0 이면 빈 포트."""
+    handler = type("BoundHandler", (Handler,), {"service": service or Service(), "quiet": quiet})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    return httpd
+
+##############################################################
+# main
+##############################################################
+def main(argv=None):
+    from .history import HistoryStore
+    ap = argparse.ArgumentParser(description="도로주행 배정 HTTP/JSON 서비스")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--centers", default=CENTERS_FILE, help="센터 설정 파일")
+    ap.add_argument("--db", default=None, help="기본 센터 히스토리 DB 를 바꿀 때")
+    ap.add_argument("--batch-max", type=int, default=BATCH_MAX)
+    ap.add_argument("--verbose", action="store_true", help="요청마다 접근 로그")
+    args = ap.parse_args(argv)
+
+    store = HistoryStore(args.db, None) if args.db else None
+    service = Service(store, args.batch_max, args.centers)
+    httpd = make_server(args.host, args.port, service, quiet=not args.verbose)
+    print(f"[server] http://{args.host}:{httpd.server_address[1]} "
+          f"(센터 {', '.join(load_centers(args.centers).keys())}, 기본 {service.default})", file=sys.stderr)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
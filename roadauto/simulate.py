@@ -0,0 +1,169 @@
+##############################################################
+# simulate.py — 공평성 몬테카를로 시뮬레이터 (NumPy 벡터화)
+#
+# quota 추첨(compute_quota), 3일 '행운' 창, 히스토리 한 바퀴 초기화
+# (check_history_full) 가 몇 주 ~ 몇 달 동안 어떤 부담 분포를 만드는지 본다.
+#
+# 배열 모양: (sims, staff). 날짜 × 교시는 히스토리가 이어지므로 순서대로 돌고,
+# sims 개의 평행 세계는 한 번의 배열 연산으로 같이 계산한다.
+# - quota 단계: compute_quota 와 같은 규칙 (base + 나머지는 '행운' 없는 사람 우선 랜덤)
+#   → 배열 연산 (세계 전체를 한 번에)
+# - 타입 단계: 엔진의 assign_types_within_quota 를 세계마다 그대로 부른다
+#   (같은 solver, 같은 자격 비트마스크, 명단 순서 그대로). 타입 배정은 사람 순서에
+#   따라 결과가 갈리는 순차 규칙이라 배열로 흉내 내면 엔진과 어긋난다
+#   (미배정 / 수동 가능자 부담이 달라짐) → 숫자는 근사가 아니라 엔진과 같은 규칙의 결과.
+#   세계마다 StaffTable 을 하나 두고 교시마다 재사용한다 (15명 × 20세계 × 1년: greedy ≈ 1초, flow ≈ 3초).
+# - 장기 원장(ledger): assign_logic 기본처럼 교시마다 쌓이는 누적으로 동점 처리
+#   (quota +1 은 '행운' 다음 교시당 평균 적은 사람, 1M 은 1M 비율 낮은 사람).
+#   ledger=False 면 쓰지 않는다 (batch 기본과 같음).
+# numpy 는 이 모듈에서만 쓴다 (엔진 본체는 numpy 없이 돈다).
+##############################################################
+
+import numpy as np
+
+from .engine import (
+    CAP_MAP, TYPE_ORDER, HISTORY_DAYS, ALL_MASK, AUTO_MASK, MANUAL_MASK,
+    StaffTable, assign_types_within_quota,
+)
+from .quals import load_quals
+
+PERIODS = [1, 2, 3, 4, 5]
+# 교시별 가중치 인원 (코스 1명 + 다음 교시 교양 1명)
+DEFAULT_WEIGHTED = {1: 2, 2: 1, 3: 2, 4: 2, 5: 1}
+NEVER = -10 ** 6
+CHUNK = 64           # 난수를 미리 뽑는 교시 단위 (메모리 ~ CHUNK × sims × staff)
+
+def _random_pick(u, k):
+    """u (..., N) 균등 난수로 행마다 랜덤 k 명을 True 로 (k 는 앞쪽 축마다 다를 수 있음)"""
+    return np.argsort(np.argsort(u, axis=-1), axis=-1) < k
+
+##############################################################
+# 진입점
+##############################################################
+def simulate_fairness(staff_names, demand, days=365, sims=20, seed=None,
+                      manual=None, weighted=None, jitter=True, quals=None, cap_map=None, solver="greedy",
+                      ledger=True):
+    """
+    staff_names : 근무자 이름 리스트 (매일 같은 인원이라고 가정)
+    demand      : {교시: {"1M": 평균, "1A": ..., "2A": ..., "2M": ...}}
+    days, sims  : 시뮬레이션 일수 / 평행 세계 수
+    manual      : 수동 가능자 집합 (주면 이 사람들은 모든 종, 나머지는 1A/2A — 예전 MANUAL_SET 방식.
+                  없으면 quals 의 사람별 자격 그대로)
+    weighted    : {교시: 가중치 인원 수} (매일 랜덤으로 뽑음, 기본 DEFAULT_WEIGHTED)
+    jitter      : True 면 수요를 평균 기준 포아송으로 매일 흔든다
+    quals       : manual 이 없을 때 쓸 자격 설정 (기본: 설정 파일)
+    cap_map     : 교시별 cap (기본 CAP_MAP, 센터별 설정은 Center.cap_map)
+    solver      : 타입 배정 방식 (assign_logic 과 같음, 기본 "greedy")
+    ledger      : 장기 원장 동점 처리 (assign_logic 기본 ledger=True 와 같음)
+
+    반환: dict (요약 숫자 + 사람별 배열)
+    """
+    rng = np.random.default_rng(seed)
+    if manual is None:
+        masks = (quals or load_quals()).masks(staff_names)
+    else:
+        masks = [ALL_MASK if nm in manual else AUTO_MASK for nm in staff_names]
+    weighted = DEFAULT_WEIGHTED if weighted is None else weighted
+    N, S = len(staff_names), sims
+    steps = [(d, p) for d in range(days) for p in PERIODS if demand.get(p)]
+    T = len(steps)
+
+    is_manual = np.array([bool(m & MANUAL_MASK) for m in masks], dtype=bool)   # 수동 종 자격 있음
+    counts = np.zeros((4, S, N), dtype=np.int64)              # TYPE_ORDER 순
+    mixed = np.zeros(S, dtype=np.int64)                       # 수동+자동 섞인 (사람, 교시) 수
+    busy = np.zeros(S, dtype=np.int64)                        # 1대 이상 맡은 (사람, 교시) 수
+    top_1m = np.zeros((T, S), dtype=np.int64)                 # 교시별 1M 최다 보유자 몫
+    sum_1m = np.zeros((T, S), dtype=np.int64)
+    unfilled = np.zeros(S, dtype=np.int64)
+    resets = np.zeros(S, dtype=np.int64)
+
+    if N and T:
+        mu = np.array([[demand[p].get(t, 0) for t in TYPE_ORDER] for _, p in steps], dtype=float)
+        if jitter:
+            dem = rng.poisson(mu[:, None, :], size=(T, S, 4)).astype(np.int32)
+        else:
+            dem = np.broadcast_to(mu.astype(np.int32)[:, None, :], (T, S, 4))
+        n_weighted = np.array([min(weighted.get(p, 0), N) for _, p in steps])
+        caps = {p: N * (cap_map or CAP_MAP).get(p, 3) for p in PERIODS}
+
+        last_lucky = np.full((S, N), NEVER, dtype=np.int32)    # 마지막 '행운' 기록 날짜
+        row0 = np.arange(S) * N                               # (행, 열) → 평탄화 인덱스
+        tables = [StaffTable(staff_names, masks) for _ in range(S)]   # 세계마다 하나, 재사용
+
+        for i, (day, p) in enumerate(steps):
+            # 상태와 무관한 난수·가중치 인원은 CHUNK 교시씩 한 번에 뽑는다
+            c = i % CHUNK
+            if c == 0:
+                kw = n_weighted[i:i + CHUNK, None, None]
+                u_all = rng.random((len(kw), S, N))
+                w_all = _random_pick(rng.random((len(kw), S, N)), kw)
+            u, wmask = u_all[c], w_all[c]
+            d1m, d1a, d2a, d2m = dem[i].T
+
+            # --- 히스토리 (3일 창) + 한 바퀴 돌면 초기화 ---
+            lucky = (day - last_lucky) <= HISTORY_DAYS
+            full = lucky.all(axis=1)
+            if full.any():
+                last_lucky[full] = NEVER
+                lucky[full] = False
+                resets += full
+
+            # --- 1단계: quota (나머지 +1 은 '행운' 없는 사람 먼저, 그 안에서 랜덤) ---
+            total = d1m + d1a + d2a + d2m
+            assignable = np.minimum(total, caps[p])
+            base, rem = assignable // N, assignable % N
+            if ledger and i:
+                # ledger_rates 와 같은 교시당 평균 (소수 넷째 자리) — 명단이 매 교시 같으므로 교시 수 = i
+                rate = np.round(counts.sum(axis=0) / i, 4)
+                rate_1m = np.round(counts[0] / i, 4).tolist()
+            else:
+                rate, rate_1m = 0.0, [[0.0] * N] * S
+            # (행운, 장기 평균) 묶음 순, 묶음 안에서 랜덤 — 평균은 1e-4 단위라 u * 1e-5 가 순서를 못 바꾼다
+            key = lucky * 10.0 + rate + u * 1e-5
+            kth = np.sort(key, axis=1).ravel()[row0 + rem]         # rem 번째로 작은 키 (rem < N)
+            quota = base[:, None] + (key < kth[:, None])
+
+            # --- 2단계: 타입 — 세계마다 엔진 그대로 ---
+            q_rows, w_rows, d_rows = quota.tolist(), wmask.astype(int).tolist(), dem[i].tolist()
+            for k, t in enumerate(tables):
+                t.reset_counts()
+                t.weight[:] = w_rows[k]
+                assign_types_within_quota(
+                    t.staff, p, q_rows[k], dict(zip(TYPE_ORDER, d_rows[k])), None, solver, rate_1m=rate_1m[k],
+                )
+            g = np.array([t.counts for t in tables], dtype=np.int64)   # (S, N, 4) TYPE_ORDER 순
+            g1m, g2m = g[:, :, 0], g[:, :, 3]
+
+            # --- 집계 ---
+            counts += g.transpose(2, 0, 1)
+            m_cnt = g1m + g2m
+            a_cnt = g[:, :, 1] + g[:, :, 2]
+            tot = m_cnt + a_cnt
+            unfilled += total - tot.sum(axis=1)
+            mixed += ((m_cnt > 0) & (a_cnt > 0)).sum(axis=1)
+            busy += (tot > 0).sum(axis=1)
+            top_1m[i] = g1m.max(axis=1)
+            sum_1m[i] = g1m.sum(axis=1)
+
+            # --- 히스토리 기록: 최소 배정 & 가중치 없는 사람 ---
+            last_lucky[(tot == tot.min(axis=1, keepdims=True)) & ~wmask] = day
+
+    load = counts.sum(axis=0)                                  # (S, N) 기간 누적
+    spread = load.max(axis=1) - load.min(axis=1) if N else np.zeros(S, dtype=np.int64)
+    man = load[:, is_manual]
+    has_1m = sum_1m > 0
+    return {
+        "names": list(staff_names),
+        "days": days,
+        "sims": sims,
+        "mean_load": load.mean(axis=0),                        # 사람별 평균 누적 배정
+        "mean_by_type": counts.mean(axis=1).T,                 # (N, 4) TYPE_ORDER 순
+        "load_var": float(load.var(axis=1).mean()) if N else 0.0,   # 사람 간 분산 (세계 평균)
+        "spread_mean": float(spread.mean()),
+        "spread_max": int(spread.max()) if S else 0,
+        "manual_spread_mean": float((man.max(axis=1) - man.min(axis=1)).mean()) if man.shape[1] else 0.0,
+        "mix_rate": float(mixed.sum() / max(busy.sum(), 1)),   # 섞인 (사람,교시) / 배정 있는 (사람,교시)
+        "concentration_1m": float((top_1m[has_1m] / sum_1m[has_1m]).mean()) if has_1m.any() else 0.0,
+        "unfilled_per_day": float(unfilled.mean() / max(days, 1)),
+        "resets_per_week": float(resets.mean() / max(days, 1) * 7),
+    }
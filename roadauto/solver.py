@@ -0,0 +1,344 @@
+##############################################################
+# solver.py — 2단계 타입 배정의 min-cost flow 버전
+#
+# 그래프:  S ─(수요)→ 타입 ─(자격, 비용)→ 자격그룹 ─(quota 합)→ T
+# - 자격이 같은 감독관은 서로 바꿔도 되므로 그룹 하나로 묶는다
+#   (노드 수가 인원과 무관 → 수백~수천 명이어도 그래프는 수십 개 노드)
+# - 최대 유량 = 자격/quota 안에서 채울 수 있는 최대 배정 수 (정확)
+# - 비용     = 그리디와 같은 우선순위를 사전식으로 (큰 단위부터)
+#   1) 1M 을 먼저 채운다       : 1M 이 아닌 간선은 어떤 1M 단위보다 비싸다
+#   2) 1M 은 고르게, 가중치 없는 사람 먼저 : 1M 간선은 사람별 볼록 비용
+#      (j 번째 1M = j × (최대 가중치 + 1) + 가중치). 같은 그룹 사람의 단위를
+#      비용별로 묶어 평행 간선 몇 개로 넣는다 → 노드 수는 그대로
+#   3) 수동 가능 그룹의 자동 배정 억제 (Manual/Auto 혼합 방지)
+# - 그룹 안에서는 1M 을 위 비용 순서 그대로 사람에게 나누고, 나머지 타입을
+#   변속기 순서(2M→2A→1A)로 1M 받은 사람부터 이어 채운다. 한 그룹에서 두
+#   타입을 나눠 갖는 사람은 타입 경계마다 최대 1명 → 섞임 최소화.
+# - 마지막으로 경계에 걸린 사람만 "1대씩 교환" 로컬 탐색으로 다듬는다
+#   (1M 은 교환하지 않는다 — 고르게 나눈 1M 을 다시 몰지 않도록).
+##############################################################
+
+import heapq
+
+from .engine import (
+    TYPE_ORDER, TYPE_BIT, TYPE_INDEX, StaffTable, table_of, get_transmission_type, add_diag,
+)
+from . import metrics
+
+INF = float("inf")
+
+# 비용 상수 (작은 정수 → Dijkstra 가 빠르고 결과가 결정적)
+COST_MANUAL_ON_AUTO = 1 # 수동 가능자에게 자동 배정 → 수동 여력을 남기는 쪽으로
+MIX_SAME_TR = 1         # 같은 변속기 다른 종 (general_type_score 와 동일)
+MIX_CROSS_TR = 10       # Manual vs Auto 혼합
+
+# 그룹 안에서 채우는 순서: 변속기끼리 붙여서 경계(=섞이는 사람)를 줄인다
+# (1M 은 볼록 비용대로 먼저 나누고, 나머지를 이 순서로 — FILL_ORDER[0] 이 1M)
+FILL_ORDER = ["1M", "2M", "2A", "1A"]
+
+##############################################################
+# Min-cost flow (successive shortest path + potential)
+##############################################################
+class MinCostFlow:
+    def __init__(self, n):
+        self.n = n
+        self.graph = [[] for _ in range(n)]
+        # 간선은 평행 배열 + 역간선은 e ^ 1
+        self.to = []
+        self.cap = []
+        self.cost = []
+
+    def add_edge(self, u, v, cap, cost):
+        e = len(self.to)
+        self.to += [v, u]
+        self.cap += [cap, 0]
+        self.cost += [cost, -cost]
+        self.graph[u].append(e)
+        self.graph[v].append(e + 1)
+        return e
+
+    def flow(self, s, t):
+        """
+        s → t 최대 유량을 최소 비용으로 흘린다. 반환: (flow, cost)
+        모든 초기 비용이 0 이상이라 potential 0 에서 시작해도 된다.
+        """
+        n = self.n
+        to, cap, cost, graph = self.to, self.cap, self.cost, self.graph
+        h = [0] * n
+        total_flow = 0
+        total_cost = 0
+        paths = 0
+
+        while True:
+            dist = [INF] * n
+            prev_e = [-1] * n
+            dist[s] = 0
+            pq = [(0, s)]
+            while pq:
+                d, u = heapq.heappop(pq)
+                if d > dist[u]:
+                    continue
+                hu = h[u]
+                for e in graph[u]:
+                    if cap[e] <= 0:
+                        continue
+                    v = to[e]
+                    nd = d + cost[e] + hu - h[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev_e[v] = e
+                        heapq.heappush(pq, (nd, v))
+            if dist[t] == INF:
+                break
+
+            for v in range(n):
+                if dist[v] < INF:
+                    h[v] += dist[v]
+
+            # 경로 병목만큼 한 번에 흘린다
+            push = INF
+            v = t
+            while v != s:
+                e = prev_e[v]
+                if cap[e] < push:
+                    push = cap[e]
+                v = to[e ^ 1]
+            v = t
+            while v != s:
+                e = prev_e[v]
+                cap[e] -= push
+                cap[e ^ 1] += push
+                v = to[e ^ 1]
+
+            total_flow += push
+            total_cost += push * (h[t] - h[s])
+            paths += 1
+
+        metrics.count("flow_paths", paths)
+        return total_flow, total_cost
+
+##############################################################
+# 섞임 패널티 (general_type_score 와 같은 기준)
+##############################################################
+def mix_penalty(counts):
+    held = [t for t in TYPE_ORDER if counts[t] > 0]
+    if not held:
+        return 0
+    trs = {get_transmission_type(t) for t in held}
+    return MIX_CROSS_TR * (len(trs) - 1) + MIX_SAME_TR * (len(held) - len(trs))
+
+def _row_mix(row):
+    """mix_penalty 의 StaffTable 행 버전 (row = [1M, 1A, 2A, 2M])"""
+    n_m = (row[0] > 0) + (row[3] > 0)
+    n_a = (row[1] > 0) + (row[2] > 0)
+    if n_m and n_a:
+        return MIX_CROSS_TR + MIX_SAME_TR * (n_m + n_a - 2)
+    return MIX_SAME_TR * (n_m + n_a - 1) if n_m + n_a else 0
+
+def _improve_by_swaps(table, leftover, suspects):
+    """
+    suspects(여러 타입을 가진 사람)의 타입 x 1대 ↔ 다른 사람 b 의 타입 y 1대
+    교환으로 섞임을 줄인다. 교환은 quota / 타입별 합계를 바꾸지 않는다.
+    leftover(못 채운 수요)에 y 가 남아 있으면 b 없이 바로 바꿔 가진다.
+    타입은 TYPE_ORDER 인덱스로, 배정 수는 table.counts 행을 직접 고친다.
+    1M 은 건드리지 않는다 (흐름 비용으로 정한 1M 분배를 유지).
+    """
+    cnt, elig = table.counts, table.elig
+    bits = [TYPE_BIT[t] for t in TYPE_ORDER]
+    K = range(len(TYPE_ORDER))
+    K_swap = [k for k in K if k != TYPE_INDEX["1M"]]
+    holders = [set() for _ in K]
+    for i, row in enumerate(cnt):
+        for k in K:
+            if row[k] > 0:
+                holders[k].add(i)
+
+    def move(i, x, y):
+        c = cnt[i]
+        c[x] -= 1
+        c[y] += 1
+        if c[x] == 0:
+            holders[x].discard(i)
+        holders[y].add(i)
+
+    queue = list(suspects)
+    while queue:
+        a = queue.pop()
+        ca = cnt[a]
+        improved = True
+        while improved and _row_mix(ca) > 0:
+            improved = False
+            for x in K_swap:
+                for y in K_swap:
+                    if y == x or ca[x] == 0 or not elig[a] & bits[y]:
+                        continue
+                    before_a = _row_mix(ca)
+                    move(a, x, y)
+                    gain_a = before_a - _row_mix(ca)
+
+                    ty, tx = TYPE_ORDER[y], TYPE_ORDER[x]
+                    if leftover.get(ty, 0) > 0 and gain_a > 0:
+                        leftover[ty] -= 1
+                        leftover[tx] = leftover.get(tx, 0) + 1
+                        improved = True
+                        continue
+
+                    best_b, best_gain = -1, 0
+                    for b in holders[y]:
+                        if b == a or not elig[b] & bits[x]:
+                            continue
+                        cb = cnt[b]
+                        before_b = _row_mix(cb)
+                        cb[y] -= 1
+                        cb[x] += 1
+                        g = gain_a + before_b - _row_mix(cb)
+                        cb[x] -= 1
+                        cb[y] += 1
+                        if g > best_gain:
+                            best_b, best_gain = b, g
+                            if g >= before_a:
+                                break
+                    if best_b >= 0:
+                        move(best_b, y, x)
+                        if _row_mix(cnt[best_b]) > 0:
+                            queue.append(best_b)
+                        improved = True
+                    else:
+                        move(a, y, x)  # 되돌리기
+
+##############################################################
+# 진입점: assign_types_within_quota(solver="flow") 에서 호출
+##############################################################
+def assign_types_flow(staff_objs, period, quotas, demand, diags=None, rate_1m=None):
+    """
+    assign_types_within_quota 와 같은 입출력.
+    - 자격/quota 안에서 가능한 최대 배정을 항상 찾는다 (그리디의 조기 종료 없음)
+    - demand 는 남은 수요로 줄여서 돌려준다
+    - 1M 은 그리디처럼 먼저, 사람별로 고르게, 가중치 없는 사람 먼저 (간선 비용으로)
+    - rate_1m: 사람별 장기 1M 비율 (engine.ledger_rates) — 같은 비용의 1M 단위끼리 마지막 동점 처리
+    """
+    rate_1m = rate_1m or [0.0] * len(staff_objs)
+    table = table_of(staff_objs)
+    gathered = table is None
+    if gathered:
+        table = StaffTable.gather(staff_objs)
+    cnt, tot, w = table.counts, table.total, table.weight
+    total_before = sum(demand.values())
+
+    # 0) 자격이 같은 사람끼리 그룹 (자격 비트마스크 그대로 키로)
+    by_mask = {}
+    for i, mask in enumerate(table.elig):
+        if quotas[i] > 0 and mask:
+            by_mask.setdefault(mask, []).append(i)
+    groups = {
+        tuple(t for t in TYPE_ORDER if mask & TYPE_BIT[t]): members
+        for mask, members in by_mask.items()
+    }
+    sigs = list(groups)
+
+    # 1) 타입 × 그룹 수송 문제
+    S = 0
+    type_node = {t: 1 + k for k, t in enumerate(TYPE_ORDER)}
+    group0 = 1 + len(TYPE_ORDER)
+    T = group0 + len(sigs)
+    mcf = MinCostFlow(T + 1)
+
+    for t in TYPE_ORDER:
+        if demand.get(t, 0) > 0:
+            mcf.add_edge(S, type_node[t], demand[t], 0)
+
+    # 비용 단위: unit 은 수동 그룹 자동 배정 비용을 다 더해도 못 넘는 크기,
+    # stack 은 가중치 차이를 다 더해도 못 넘는 1M 한 단계 (→ 사전식 우선순위)
+    unit = total_before + 1
+    stack = max((w[i] for ms in groups.values() for i in ms), default=0) + 1
+
+    def unit_cost(i, j):
+        """사람 i 가 j 번째 (0부터) 1M 을 받을 때 비용"""
+        return (j * stack + w[i]) * unit
+
+    levels = {}    # 그룹 → {1M 단위 비용: 단위 수}
+    if demand.get("1M", 0) > 0:
+        for g, sig in enumerate(sigs):
+            if "1M" in sig:
+                lv = levels[g] = {}
+                for i in groups[sig]:
+                    for j in range(quotas[i]):
+                        c = unit_cost(i, j)
+                        lv[c] = lv.get(c, 0) + 1
+    not_1m = max((c for lv in levels.values() for c in lv), default=0) + unit
+
+    edge_of = {}
+    for g, sig in enumerate(sigs):
+        cap = sum(quotas[i] for i in groups[sig])
+        mcf.add_edge(group0 + g, T, cap, 0)
+        can_manual = any(get_transmission_type(t) == "Manual" for t in sig)
+        for t in sig:
+            if demand.get(t, 0) <= 0:
+                continue
+            if t == "1M":
+                edge_of[(t, g)] = [
+                    mcf.add_edge(type_node[t], group0 + g, n, c) for c, n in sorted(levels[g].items())
+                ]
+                continue
+            c = COST_MANUAL_ON_AUTO if can_manual and get_transmission_type(t) == "Auto" else 0
+            edge_of[(t, g)] = [mcf.add_edge(type_node[t], group0 + g, cap, not_1m + c)]
+
+    mcf.flow(S, T)
+
+    # 2) 그룹 안에서: 1M 은 비용 순서대로 나누고, 나머지는 변속기 순서대로 이어 채우기
+    suspects = []
+    k_1m = TYPE_INDEX["1M"]
+    for g, sig in enumerate(sigs):
+        stream = []
+        for t in FILL_ORDER:
+            # 역간선 용량 = 흐른 양
+            f = sum(mcf.cap[e ^ 1] for e in edge_of.get((t, g), ()))
+            if f:
+                stream.append([t, f])
+                demand[t] -= f
+
+        members = groups[sig]
+        if stream and stream[0][0] == "1M":
+            # 흐름이 고른 1M 단위 = 비용이 싼 단위부터 (같은 비용이면 장기 1M 비율 낮은 사람)
+            units = sorted(
+                (unit_cost(i, j), rate_1m[i], i) for i in members for j in range(quotas[i])
+            )
+            for _, _, i in units[:stream.pop(0)[1]]:
+                cnt[i][k_1m] += 1
+                tot[i] += 1
+
+        # 1M 받은 사람부터 (2M 이 이어 붙게) → 가중치 없는 사람 → quota 큰 사람 → 장기 1M 비율 낮은 사람
+        members = sorted(members, key=lambda i: (cnt[i][k_1m] == 0, w[i], -quotas[i], rate_1m[i]))
+        k = 0
+        for i in members:
+            row = cnt[i]
+            room = quotas[i] - tot[i]
+            n_types = 1 if row[k_1m] else 0
+            while room > 0 and k < len(stream):
+                t, left = stream[k]
+                take = min(room, left)
+                row[TYPE_INDEX[t]] += take
+                tot[i] += take
+                room -= take
+                n_types += 1
+                if take == left:
+                    k += 1
+                else:
+                    stream[k][1] = left - take
+            if n_types > 1:
+                suspects.append(i)
+
+    # 3) 타입 경계에 걸린 사람만 교환으로 다듬기
+    _improve_by_swaps(table, demand, suspects)
+    if gathered:
+        table.scatter(staff_objs)
+
+    total_assigned = sum(tot)
+    if total_assigned < total_before:
+        add_diag(
+            diags, "warning", "partial_fill",
+            f"⚠️ 전체 수요 {total_before}명 중 {total_assigned}명만 배정되었습니다. "
+            "수동/자동 자격 및 종별 조합 제한으로 모든 수요를 채우지 못했습니다."
+        )
+
+    return staff_objs
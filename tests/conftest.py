@@ -0,0 +1,4 @@
+import os, sys
+
+# 설치 없이 저장소 루트에서 `python -m pytest` 로 돌리도록 (bench/ 스크립트와 같은 방식)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
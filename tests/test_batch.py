@@ -0,0 +1,55 @@
+##############################################################
+# batch — 순차 실행은 하루씩 흘려 내보내고, 결과는 한 번에 돈 것과 같아야 한다
+##############################################################
+
+import csv
+from datetime import date, timedelta
+
+import pytest
+
+from roadauto.batch import OUT_COLUMNS, iter_chunk, make_jobs, read_demand, run_batch, run_chunk
+
+NAMES = ["가나", "다라", "마바", "사아", "자차", "카타", "파하", "거너"]
+DAYS = 5
+
+def write_inputs(tmp_path):
+    rosters = tmp_path / "rosters"
+    rosters.mkdir()
+    lines = ["도로주행 근무표", ""]
+    lines += [f"1종수동 : {i + 1}호 {nm}" if i < 2 else f"• {i + 1}호 {nm}" for i, nm in enumerate(NAMES)]
+    lines += [f"{p}교시 : {NAMES[p]}" for p in (1, 2, 3, 4, 5)]
+    demand = tmp_path / "demand.csv"
+    with open(demand, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["date", "period", "1M", "1A", "2A", "2M"])
+        for k in range(DAYS):
+            day = (date(2026, 4, 6) + timedelta(days=k)).isoformat()
+            (rosters / f"{day}.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+            for p in (1, 3, 5):
+                w.writerow([day, p, 1, 3 + k, 4, 1])
+    return str(rosters), str(demand)
+
+def test_iter_chunk_yields_one_list_per_day(tmp_path):
+    rosters, demand = write_inputs(tmp_path)
+    [job] = make_jobs(read_demand(demand), rosters, "greedy", 7, 1, 14)
+    per_day = list(iter_chunk(job))
+    assert len(per_day) == DAYS
+    assert all(len({r[0] for r in rows}) == 1 for rows in per_day)
+    assert [r for rows in per_day for r in rows] == run_chunk(job)
+
+def test_run_batch_sequential_writes_every_row(tmp_path):
+    rosters, demand = write_inputs(tmp_path)
+    out = tmp_path / "out.csv"
+    n = run_batch(rosters, demand, str(out), jobs=1, seed=7)
+    with open(out, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == OUT_COLUMNS
+    assert n == len(rows) - 1 == DAYS * 3 * len(NAMES)
+
+def test_run_batch_parquet_uses_export_writer(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    rosters, demand = write_inputs(tmp_path)
+    out = tmp_path / "out.parquet"
+    n = run_batch(rosters, demand, str(out), jobs=1, seed=7)
+    table = pq.read_table(out)
+    assert table.column_names == OUT_COLUMNS and table.num_rows == n
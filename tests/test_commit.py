@@ -0,0 +1,70 @@
+from datetime import date
+
+import pytest
+
+from roadauto.engine import assign_logic, commit_assignment, StaleHistoryError
+from roadauto.history import HistoryStore
+from roadauto.quals import legacy_quals
+
+TODAY = date(2026, 3, 2)
+NAMES = [f"감독{i:02d}" for i in range(8)]
+DEMAND = {"1M": 1, "1A": 4, "2A": 4, "2M": 1}
+
+def preview(store, names=NAMES):
+    return assign_logic(names, 3, DEMAND, {}, [], today=TODAY, store=store, commit=False,
+                        seed=1, log=False, quals=legacy_quals())
+
+def test_commit_with_unchanged_snapshot():
+    store = HistoryStore(":memory:", None)
+    staff, hist, _ = preview(store)
+    entries = commit_assignment(staff, store, TODAY, period=3, snapshot=hist)
+    assert entries and store.count() == len(entries)
+    assert [r["name"] for r in store.ledger_rows()] == sorted(NAMES)
+
+def test_commit_rejected_when_history_changed_after_preview():
+    store = HistoryStore(":memory:", None)
+    staff, hist, _ = preview(store)
+    # 다른 세션이 그사이 확정
+    other, other_hist, _ = preview(store, NAMES[:4])
+    commit_assignment(other, store, TODAY, snapshot=other_hist)
+    before = store.recent(TODAY)
+    with pytest.raises(StaleHistoryError):
+        commit_assignment(staff, store, TODAY, period=3, snapshot=hist)
+    assert store.recent(TODAY) == before
+    assert store.ledger_rows() == []
+
+def test_reset_decided_at_commit_does_not_wipe_other_commits():
+    store = HistoryStore(":memory:", None)
+    with store.transaction():
+        store.append([{"date": TODAY.isoformat(), "name": nm} for nm in NAMES])
+    staff, hist, diags = preview(store)
+    assert "history_reset" in [d["code"] for d in diags]
+    store.append([{"date": TODAY.isoformat(), "name": "다른이"}])
+    # 미리보기 때 reset 이었어도, 그사이 바뀌었으면 지우지 않고 거절
+    with pytest.raises(StaleHistoryError):
+        commit_assignment(staff, store, TODAY, reset=True, snapshot=hist)
+    assert "다른이" in store.lucky_names(TODAY)
+
+def test_commit_day_rejects_stale_plan():
+    from roadauto.planner import plan_day, commit_day
+    store = HistoryStore(":memory:", None)
+    lucky = store.lucky_names(TODAY)
+    plan = plan_day(NAMES, {1: DEMAND, 2: DEMAND}, {}, [], hist=lucky, quals=legacy_quals())
+    store.append([{"date": TODAY.isoformat(), "name": NAMES[0]}])
+    with pytest.raises(StaleHistoryError):
+        commit_day(plan, store, TODAY, lucky=lucky)
+    assert store.ledger_rows() == []
+    entries = commit_day(plan, store, TODAY, lucky=store.lucky_names(TODAY))
+    assert entries and len(store.ledger_rows()) == 2 * len(NAMES)
+
+def test_empty_roster_never_resets_or_commits():
+    store = HistoryStore(":memory:", None)
+    with store.transaction():
+        store.append([{"date": TODAY.isoformat(), "name": nm} for nm in NAMES[:2]])
+    staff, hist, diags = assign_logic([], 1, {"1A": 0}, {}, [], today=TODAY, store=store,
+                                      log=False, quals=legacy_quals())
+    assert staff == [] and "history_reset" not in [d["code"] for d in diags]
+    assert store.count() == 2
+    assert commit_assignment([], store, TODAY, reset=True, period=1) == []
+    assert commit_assignment([], store, TODAY, period=1, snapshot=hist) == []
+    assert store.count() == 2 and store.ledger_rows() == []
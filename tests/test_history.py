@@ -0,0 +1,33 @@
+##############################################################
+# HistoryStore 열기 — 깨진 파일만 치우고, 잠긴 파일은 건드리지 않는다
+##############################################################
+
+import os
+import sqlite3
+
+import pytest
+
+from roadauto.history import HistoryStore
+
+def test_locked_db_is_not_quarantined(tmp_path):
+    path = str(tmp_path / "history.sqlite3")
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("CREATE TABLE keep(x)")
+    other.execute("INSERT INTO keep VALUES (1)")
+    other.execute("BEGIN EXCLUSIVE")        # 다른 프로세스가 쓰기 락을 쥐고 있음
+    store = HistoryStore(path, None, timeout=0.1)
+    with pytest.raises(sqlite3.OperationalError):
+        store.conn()
+    assert store.recovered is None
+    assert not [f for f in os.listdir(tmp_path) if ".corrupt" in f]
+    other.execute("COMMIT")
+    other.close()
+    assert store.count() == 0                # 락이 풀리면 그대로 열린다
+    assert sqlite3.connect(path).execute("SELECT x FROM keep").fetchall() == [(1,)]
+
+def test_corrupt_db_is_quarantined(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    path.write_bytes(b"not a database" * 100)
+    store = HistoryStore(str(path), None)
+    assert store.count() == 0
+    assert store.recovered and os.path.exists(store.recovered)
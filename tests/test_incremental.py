@@ -0,0 +1,48 @@
+##############################################################
+# incremental.reassign — +1 받을 사람은 compute_quota 와 같은 우선순위,
+# 수정을 거쳐 확정한 결과도 실행 기록으로 재현된다
+##############################################################
+
+from datetime import date
+
+from roadauto.engine import TYPE_ORDER, assign_logic
+from roadauto.history import HistoryStore
+from roadauto.incremental import reassign
+from roadauto.quals import legacy_quals
+from roadauto.runlog import edited_record
+from roadauto.replay import verify
+
+TODAY = date(2026, 3, 2)
+NAMES = ["가나", "다라", "마바", "사아", "자차"]
+
+def demand(n):
+    return {"1M": 0, "1A": n, "2A": 0, "2M": 0}
+
+def test_extra_slot_follows_lucky_priority():
+    lucky = {"가나", "다라", "마바", "자차"}
+    store = HistoryStore(":memory:", None)
+    store.append([{"date": TODAY.isoformat(), "name": nm} for nm in lucky])
+    staff, hist, _ = assign_logic(NAMES, 3, demand(5), {}, [], today=TODAY, store=store,
+                                  commit=False, log=False, seed=3, quals=legacy_quals())
+    assert [s.quota for s in staff] == [1] * 5
+    reassign(staff, 3, demand(6), [], solver="greedy", hist=hist)
+    fresh, _, _ = assign_logic(NAMES, 3, demand(6), {}, [], today=TODAY, store=store,
+                               commit=False, log=False, seed=3, quals=legacy_quals())
+    assert [s.quota for s in staff] == [s.quota for s in fresh] == [1, 1, 1, 2, 1]
+
+def test_edited_run_replays():
+    store = HistoryStore(":memory:", None)
+    base = {"1M": 1, "1A": 3, "2A": 2, "2M": 1}
+    staff, hist, diags = assign_logic(NAMES, 2, base, {3: "가나"}, ["다라"], today=TODAY,
+                                      store=store, commit=False, seed=11, quals=legacy_quals())
+    run_id = next(d["run_id"] for d in diags if d["code"] == "run_logged")
+    edits = []
+    for new in ({**base, "1A": 5}, {**base, "2A": 0, "2M": 2}):
+        diags = []
+        reassign(staff, 2, new, diags, solver="greedy", hist=hist, ledger=None)
+        edits.append({"demand": new, "solver": "greedy"})
+    rec = edited_record(store.runs(ids=[run_id])[0], edits, staff, diags)
+    assert rec["base"] == run_id and rec["result"][0][3:] == [staff[0].assigned_counts[t] for t in TYPE_ORDER]
+    store.log_run(rec)
+    checked = [verify(r) for r in store.runs()]
+    assert [c["ok"] for c in checked] == [True, True]
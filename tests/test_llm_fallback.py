@@ -0,0 +1,47 @@
+import os
+
+from roadauto.llm_fallback import StubBackend, available_backends, extract_lines, fallback_parse, cache_key, _cache_path
+from roadauto.parser import parse_roster
+
+class DropBackend:
+    """응답이 잘린 것처럼 앞의 keep 줄만 답하는 백엔드"""
+    cache_id = "drop"
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.calls = 0
+
+    async def extract(self, lines):
+        self.calls += 1
+        return [{"i": i, "kind": "staff", "name": line.split()[-1]} for i, line in enumerate(lines[:self.keep])]
+
+def test_stub_is_not_offered_in_ui():
+    assert "stub" not in available_backends()
+
+def test_partial_response_caches_only_answered_lines(tmp_path):
+    lines = ["7호 홍길동", "8호 김철수", "9호 이영희"]
+    b = DropBackend(keep=1)
+    out, stats = extract_lines(lines, b, cache_dir=str(tmp_path))
+    assert out[0]["names"] == ["홍길동"] and out[1] is None and out[2] is None
+    assert stats["missing"] == 2
+    cached = [os.path.exists(_cache_path(str(tmp_path), cache_key(b, ln))) for ln in lines]
+    assert cached == [True, False, False]
+
+    # 빠진 줄은 다음에 다시 묻는다
+    b.keep = 10
+    out, stats = extract_lines(lines, b, cache_dir=str(tmp_path))
+    assert [o["names"] for o in out] == [["홍길동"], ["김철수"], ["이영희"]]
+    assert stats["cache_hits"] == 1 and b.calls == 2
+
+def test_fallback_parse_uses_cache_and_warns_on_partial(tmp_path):
+    base = parse_roster("• 01호 박민수\n7호 홍길동\n8호 김철수")
+    r = fallback_parse(base, DropBackend(keep=1), cache_dir=str(tmp_path))
+    assert r.staff == ("박민수", "홍길동")
+    assert [no for no, _ in r.unparsed] == [3]
+    assert "llm_partial" in [d["code"] for d in r.diags]
+
+    stub = StubBackend()
+    r1 = fallback_parse(base, stub, cache_dir=str(tmp_path))
+    r2 = fallback_parse(base, stub, cache_dir=str(tmp_path))
+    assert r1.staff == r2.staff == ("박민수", "홍길동", "김철수")
+    assert stub.calls == 1
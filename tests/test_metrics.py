@@ -0,0 +1,27 @@
+from roadauto.metrics import Metrics, percentile
+
+def test_percentile_nearest_rank():
+    vals = list(range(1, 101))
+    assert percentile(vals, 50) == 50
+    assert percentile(vals, 99) == 99
+    assert percentile([], 50) == 0.0
+
+def test_run_groups_stages_and_counters():
+    m = Metrics(window=10)
+    with m.run("assign"):
+        with m.stage("quota"):
+            m.count("types_loop", 3)
+        m.count("types_loop", 2)
+    m.count("parse_lines", 7)           # run 밖 → 바로 한 값
+    [rec] = m.export()["runs"]
+    assert rec["kind"] == "assign" and "quota" in rec["stages"]
+    assert rec["counters"] == {"types_loop": 5}
+    names = {r["이름"] for r in m.summary()}
+    assert {"quota", "assign_total", "types_loop", "parse_lines"} <= names
+
+def test_disabled_records_nothing():
+    m = Metrics()
+    m.enabled = False
+    with m.run("assign"), m.stage("quota"):
+        m.count("x")
+    assert m.summary() == [] and m.export()["runs"] == []
@@ -0,0 +1,123 @@
+##############################################################
+# 한 번에 훑는 parser 가 예전 정규식 여러 번 (auto.py 의 parse_staff / parse_extra) 과
+# 같은 결과를 내는지 무작위 근무표로 비교한다.
+##############################################################
+
+import re, random
+
+import pytest
+
+from roadauto.parser import parse_roster, RosterFormat
+
+##############################################################
+# 예전 방식 (기준)
+##############################################################
+def old_parse(text, sep=r"\s*"):
+    """예전 auto.py 그대로. sep 만 바꿀 수 있다 (줄을 넘지 않게 하려면 [^\\S\\n]*)."""
+    staff = []
+    staff += re.findall(rf"1종수동{sep}:{sep}[\d]+호{sep}([가-힣]+)", text)
+    staff += re.findall(rf"•{sep}[\d]+호{sep}([가-힣]+)", text)
+    edu = {int(g): nm for g, nm in re.findall(rf"(\d)교시{sep}:{sep}([가-힣]+)", text)}
+    course = []
+    m = re.findall(rf"코스점검{sep}:{sep}(.*)", text)
+    if m:
+        course = re.findall(r"[A-Z]코스.*?:\s*([가-힣]+)", m[0])
+    return tuple(dict.fromkeys(staff)), edu, tuple(course)
+
+LINE_SEP = r"[^\S\n]*"
+
+##############################################################
+# 무작위 근무표
+##############################################################
+NAMES = ["홍길동", "김철수", "이영희", "박민수", "최지우", "정하늘", "강바다", "윤서연", "임도윤", "한가람"]
+SPACES = ["", " ", "  ", "\t", " 　", "\xa0"]
+JUNK = ["", "   ", "오늘 근무표입니다", "안녕하세요", "※ 변경 있으면 연락", "감독관 명단", "------"]
+
+def _sp(rng):
+    return rng.choice(SPACES)
+
+def _line(rng, blanks):
+    """한 줄. blanks=True 면 이름이 빠진 줄도 섞는다."""
+    nm = "" if blanks and rng.random() < 0.25 else rng.choice(NAMES)
+    k = rng.random()
+    if k < 0.15:
+        return f"1종수동{_sp(rng)}:{_sp(rng)}{rng.randint(1, 30):02d}호{_sp(rng) or ' '}{nm}"
+    if k < 0.55:
+        return f"•{_sp(rng)}{rng.randint(1, 30):02d}호{_sp(rng) or ' '}{nm}"
+    if k < 0.75:
+        return f"{rng.randint(1, 5)}교시{_sp(rng)}:{_sp(rng) or ' '}{nm}"
+    if k < 0.85:
+        items = [f"{c}코스{_sp(rng)}:{_sp(rng)}{rng.choice(NAMES)}" for c in rng.sample("ABCD", rng.randint(1, 3))]
+        if blanks and rng.random() < 0.3:
+            items = []
+        return f"코스점검{_sp(rng)}:{_sp(rng) or ' '}{', '.join(items)}"
+    return rng.choice(JUNK)
+
+def roster(rng, blanks):
+    return "\n".join(_line(rng, blanks) for _ in range(rng.randint(1, 25)))
+
+def _new(text):
+    r = parse_roster(text)
+    return r.staff, r.edu, r.course
+
+##############################################################
+# 테스트
+##############################################################
+def test_matches_old_parser_on_wellformed_rosters():
+    """이름이 다 있는 근무표는 예전 정규식 (\\s*) 과 완전히 같다"""
+    rng = random.Random(7)
+    for _ in range(5000):
+        text = roster(rng, blanks=False)
+        assert _new(text) == old_parse(text), text
+
+def test_matches_line_bounded_old_parser_with_blank_items():
+    """이름 빠진 줄이 섞여도, 줄을 넘지 않는 예전 정규식과 같다"""
+    rng = random.Random(11)
+    for _ in range(20000):
+        text = roster(rng, blanks=True)
+        assert _new(text) == old_parse(text, LINE_SEP), text
+
+@pytest.mark.parametrize("blank", ["3교시 :", "• 07호", "1종수동 : 03호", "코스점검 :"])
+def test_blank_item_does_not_swallow_next_line(blank):
+    text = f"• 01호 홍길동\n{blank}\n코스점검 : A코스 : 김철수, B코스 : 이영희\n2교시 : 박민수"
+    r = parse_roster(text)
+    assert r.staff == ("홍길동",)
+    assert r.course == (("김철수", "이영희") if blank != "코스점검 :" else ())
+    assert r.edu == {2: "박민수"}
+    # 빈 코스점검 줄은 (예전처럼) 첫 코스점검 줄로 인식된다 → 뒤 줄은 무시
+    assert [no for no, _ in r.unparsed] == ([2] if blank != "코스점검 :" else [])
+
+def test_unparsed_lines_and_hint():
+    r = parse_roster("• 01호 홍길동\n07호 누구\n안녕하세요\n\n2교시 : 김철수")
+    assert r.unparsed == ((2, "07호 누구"), (3, "안녕하세요"))
+    assert [d["code"] for d in r.diags] == ["unparsed_staff_line"]
+
+def test_custom_format():
+    fmt = RosterFormat("dash", {"bullet": r"-[^\S\n]*(?P<bullet>[가-힣]+)"})
+    r = parse_roster("- 홍길동\n- 김철수\n1교시 : 이영희", fmt)
+    assert r.staff == ("홍길동", "김철수")
+    assert r.edu == {1: "이영희"}
+    with pytest.raises(ValueError):
+        RosterFormat("bad", {"bullet": r"-\s*([가-힣]+)"})
+
+def test_course_continues_over_following_course_lines():
+    text = "• 01호 홍길동\n코스점검 :\n A코스 : 김철수\n B코스 : 이영희\n3교시 : 박민수\nC코스 : 최지우"
+    r = parse_roster(text)
+    assert r.course == ("김철수", "이영희")
+    assert r.edu == {3: "박민수"}
+    # 교시 줄 뒤의 코스 줄은 이어지지 않는다
+    assert r.unparsed == ((6, "C코스 : 최지우"),)
+
+def test_course_stops_at_edu_items_on_same_line():
+    r = parse_roster("코스점검 : A코스 : 김철수, B코스 : 이영희 1교시 : 박민수 2교시 : 최지우\n• 01호 홍길동")
+    assert r.course == ("김철수", "이영희")
+    assert r.edu == {1: "박민수", 2: "최지우"}
+    assert r.staff == ("홍길동",) and r.unparsed == ()
+
+@pytest.mark.parametrize("nl", ["\r\n", "\r"])
+def test_line_numbers_agree_across_newline_styles(nl):
+    lines = ["• 01호 홍길동", "07호 누구", "코스점검 :", "A코스 : 김철수", "안녕하세요"]
+    r = parse_roster(nl.join(lines))
+    assert r.unparsed == parse_roster("\n".join(lines)).unparsed == ((2, "07호 누구"), (5, "안녕하세요"))
+    assert r.course == ("김철수",)
+    assert "2번째 줄" in r.diags[0]["msg"]
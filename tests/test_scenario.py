@@ -0,0 +1,21 @@
+##############################################################
+# scenario — 수요 지정: 거꾸로 된 범위 등은 빈 격자 대신 오류
+##############################################################
+
+import pytest
+
+from roadauto.scenario import make_scenarios, parse_spec
+
+def test_parse_spec_forms():
+    assert parse_spec("3") == ("values", [3])
+    assert parse_spec("0-4") == ("values", [0, 1, 2, 3, 4])
+    assert parse_spec("2-8:2") == ("values", [2, 4, 6, 8])
+    assert parse_spec("5, 1,3") == ("values", [1, 3, 5])
+    assert parse_spec("~5") == ("poisson", 5.0)
+
+@pytest.mark.parametrize("bad", ["4-0", "2-8:0", "2-8:-2", ","])
+def test_bad_spec_raises_instead_of_empty_grid(bad):
+    with pytest.raises(ValueError):
+        parse_spec(bad)
+    with pytest.raises(ValueError, match="^1A: "):
+        make_scenarios({"1M": "0-1", "1A": bad})
@@ -0,0 +1,55 @@
+##############################################################
+# server.Batcher — 줄에서 기다리다 시간이 지난 요청은 돌지 않아야 한다 (재시도해도 한 번만 기록)
+# server.Service — /pair 의 counts 검사 오류는 counts 필드 이름으로
+##############################################################
+
+import threading
+
+import pytest
+
+from roadauto.history import HistoryStore
+from roadauto.server import ApiError, Batcher, Service
+
+def test_timed_out_job_is_cancelled_and_never_runs():
+    b = Batcher(HistoryStore(":memory:", None))
+    gate, started, ran = threading.Event(), threading.Event(), []
+
+    def slow():
+        started.set()
+        gate.wait(5)
+        return "slow"
+
+    t = threading.Thread(target=b.submit, args=(slow,))
+    t.start()
+    assert started.wait(5)              # 저장소 스레드가 slow 에 묶여 있음
+    with pytest.raises(ApiError) as e:
+        b.submit(lambda: ran.append(1), timeout=0.05)
+    assert e.value.status == 503
+    gate.set()
+    t.join(5)
+    assert b.submit(lambda: "next") == "next"
+    assert ran == [] and b.cancelled == 1
+
+def test_job_already_running_at_timeout_returns_its_result():
+    b = Batcher(HistoryStore(":memory:", None))
+    gate = threading.Event()
+
+    def job():
+        gate.wait(5)
+        return 42
+
+    threading.Timer(0.2, gate.set).start()
+    assert b.submit(job, timeout=0.05) == 42
+    assert b.cancelled == 0
+
+@pytest.mark.parametrize("counts, where", [
+    ([1], "staff[1].counts (다라) 는"),
+    ({"1M": -1}, "staff[1].counts (다라)[1M]"),
+    ({"3M": 1}, "staff[1].counts (다라) 에 모르는 타입"),
+])
+def test_pair_counts_errors_name_the_counts_field(counts, where):
+    svc = Service(HistoryStore(":memory:", None))
+    body = {"staff": [{"name": "가나", "counts": {"1A": 1}}, {"name": "다라", "counts": counts}]}
+    with pytest.raises(ApiError) as e:
+        svc.pair(body)
+    assert str(e.value).startswith(where) and "demand" not in str(e.value)
@@ -0,0 +1,49 @@
+##############################################################
+# simulate_fairness — 나머지 추첨이 없는 경우 엔진(assign_logic)을 교시마다 돌린 것과 똑같아야 한다
+##############################################################
+
+from datetime import date, timedelta
+
+import pytest
+
+from roadauto.engine import ALL_MASK, AUTO_MASK, TYPE_ORDER, assign_logic
+from roadauto.history import HistoryStore
+from roadauto.quals import Quals
+from roadauto.simulate import simulate_fairness
+
+NAMES = [chr(0xAC00 + i * 300) for i in range(15)]
+MANUAL = set(NAMES[:5])
+# 합이 15 = 인원 → quota 는 모두 1 (랜덤 없음). 수동 5명에 1M 2 + 2M 3 이라 greedy 는 미배정이 남는다
+DEMAND = {"1M": 2, "1A": 5, "2A": 5, "2M": 3}
+DAYS = 10
+
+def engine_run(solver):
+    """같은 명단·수요로 DAYS 일 동안 교시마다 배정 + 확정 → (사람별 타입 누적, 미배정 합)"""
+    store = HistoryStore(":memory:", None)
+    quals = Quals({nm: ALL_MASK for nm in MANUAL}, AUTO_MASK)
+    counts = {nm: [0] * 4 for nm in NAMES}
+    unfilled = 0
+    for k in range(DAYS):
+        today = date(2026, 5, 4) + timedelta(days=k)
+        for period in (1, 2, 3, 4, 5):
+            staff, _, _ = assign_logic(NAMES, period, DEMAND, {}, [], today=today, solver=solver,
+                                       store=store, seed=1, log=False, quals=quals)
+            for s in staff:
+                counts[s.name] = [c + s.assigned_counts[t] for c, t in zip(counts[s.name], TYPE_ORDER)]
+            unfilled += sum(DEMAND.values()) - sum(s.total_assigned for s in staff)
+    return counts, unfilled
+
+@pytest.mark.parametrize("solver", ["greedy", "flow"])
+def test_matches_engine_without_random_remainder(solver):
+    counts, unfilled = engine_run(solver)
+    r = simulate_fairness(NAMES, {p: DEMAND for p in (1, 2, 3, 4, 5)}, days=DAYS, sims=1, seed=0,
+                          manual=MANUAL, weighted={}, jitter=False, solver=solver)
+    assert r["mean_by_type"].tolist() == [counts[nm] for nm in NAMES]
+    assert r["unfilled_per_day"] * DAYS == unfilled
+
+def test_greedy_leaves_unfilled_where_flow_does_not():
+    greedy = simulate_fairness(NAMES, {1: DEMAND}, days=DAYS, sims=1, manual=MANUAL,
+                               weighted={}, jitter=False)
+    flow = simulate_fairness(NAMES, {1: DEMAND}, days=DAYS, sims=1, manual=MANUAL,
+                             weighted={}, jitter=False, solver="flow")
+    assert greedy["unfilled_per_day"] > flow["unfilled_per_day"] == 0
@@ -0,0 +1,130 @@
+##############################################################
+# 타입 배정 불변식 (greedy / flow 둘 다) + flow 가 최대 배정인지
+# (bench/pipeline.py 의 check_invariants 와 같은 항목을 작은 무작위 케이스로)
+##############################################################
+
+import random
+
+import pytest
+
+from roadauto.engine import (
+    TYPE_ORDER, TYPE_BIT, CAP_MAP, ALL_MASK, AUTO_MASK, Staff, StaffTable,
+    compute_quota, assign_types_within_quota, eligible,
+)
+
+def max_fill(masks, quotas, demand):
+    """타입(수요) → 사람(quota) 이분 그래프 최대 유량 (작은 케이스용 Edmonds-Karp)"""
+    n = len(masks)
+    S, T = 0, 1 + len(TYPE_ORDER) + n
+    cap = [[0] * (T + 1) for _ in range(T + 1)]
+    for k, t in enumerate(TYPE_ORDER):
+        cap[S][1 + k] = demand.get(t, 0)
+        for i, m in enumerate(masks):
+            if m & TYPE_BIT[t]:
+                cap[1 + k][1 + len(TYPE_ORDER) + i] = 10 ** 6
+    for i, q in enumerate(quotas):
+        cap[1 + len(TYPE_ORDER) + i][T] = q
+    flow = 0
+    while True:
+        prev = [-1] * (T + 1)
+        prev[S] = S
+        queue = [S]
+        for u in queue:
+            for v in range(T + 1):
+                if prev[v] < 0 and cap[u][v] > 0:
+                    prev[v] = u
+                    queue.append(v)
+        if prev[T] < 0:
+            return flow
+        f, v = 10 ** 9, T
+        while v != S:
+            f = min(f, cap[prev[v]][v])
+            v = prev[v]
+        v = T
+        while v != S:
+            cap[prev[v]][v] -= f
+            cap[v][prev[v]] += f
+            v = prev[v]
+        flow += f
+
+def check_invariants(staff_objs, quotas, demand, period):
+    cap = CAP_MAP[period]
+    assert max(quotas) - min(quotas) <= 1
+    assert all(q <= cap for q in quotas)
+    for s, q in zip(staff_objs, quotas):
+        assert s.total_assigned <= q
+        assert s.total_assigned == sum(s.assigned_counts.values())
+        for t in TYPE_ORDER:
+            assert s.assigned_counts[t] >= 0
+            assert not s.assigned_counts[t] or eligible(s, t), (s.name, t)
+    for t in TYPE_ORDER:
+        assert sum(s.assigned_counts[t] for s in staff_objs) <= demand.get(t, 0)
+
+def make_case(rng):
+    n = rng.randint(1, 8)
+    names = [f"감독{chr(0xAC00 + k)}" for k in range(n)]
+    masks = [rng.choice([ALL_MASK, AUTO_MASK, AUTO_MASK, TYPE_BIT["1M"] | TYPE_BIT["1A"]]) for _ in names]
+    period = rng.choice(sorted(CAP_MAP))
+    demand = {t: rng.randint(0, 4) for t in TYPE_ORDER}
+    weighted = {nm for nm in names if rng.random() < 0.2}
+    lucky = {nm for nm in names if rng.random() < 0.3}
+    return names, masks, period, demand, weighted, lucky
+
+def run(names, masks, period, demand, weighted, lucky, solver, seed):
+    t = StaffTable(names, masks)
+    t.weight[:] = [1 if nm in weighted else 0 for nm in names]
+    objs = t.staff
+    quotas, _ = compute_quota(objs, period, sum(demand.values()), lucky, random.Random(seed))
+    for s, q in zip(objs, quotas):
+        s.quota = q
+    assign_types_within_quota(objs, period, quotas, dict(demand), [], solver)
+    return objs, quotas
+
+@pytest.mark.parametrize("seed", range(400))
+def test_solver_invariants_and_flow_optimal(seed):
+    rng = random.Random(seed)
+    case = make_case(rng)
+    names, masks, period, demand = case[:4]
+    filled = {}
+    for solver in ("greedy", "flow"):
+        objs, quotas = run(*case, solver, seed)
+        check_invariants(objs, quotas, demand, period)
+        filled[solver] = sum(s.total_assigned for s in objs)
+    assert filled["flow"] == max_fill(masks, quotas, demand)
+    assert filled["greedy"] <= filled["flow"]
+
+def spread_1m(objs, quotas):
+    """1M 자격 + quota 있는 사람들의 1M 최대 - 최소"""
+    ones = [s.assigned_counts["1M"] for s, q in zip(objs, quotas) if q > 0 and s.elig & TYPE_BIT["1M"]]
+    return max(ones) - min(ones) if ones else 0
+
+@pytest.mark.parametrize("seed", range(400))
+def test_flow_spreads_1m_at_least_as_evenly_as_greedy(seed):
+    """같은 수를 채웠으면 flow 의 1M 최대-최소 ≤ greedy (flow 가 더 채웠으면 1M 이 몰릴 수 있음)"""
+    case = make_case(random.Random(seed))
+    res = {solver: run(*case, solver, seed) for solver in ("greedy", "flow")}
+    filled = {k: sum(s.total_assigned for s in objs) for k, (objs, _) in res.items()}
+    if filled["flow"] == filled["greedy"]:
+        assert spread_1m(*res["flow"]) <= spread_1m(*res["greedy"])
+
+def test_flow_does_not_pile_1m_on_first_people():
+    t = StaffTable(["가나", "다라", "마바", "사아"], [ALL_MASK] * 4)
+    t.weight[:] = [0, 0, 0, 1]
+    demand = {"1M": 3, "2M": 5}
+    assign_types_within_quota(t.staff, 3, [2, 2, 2, 2], demand, [], "flow")
+    assert [s.assigned_counts["1M"] for s in t.staff] == [1, 1, 1, 0]   # 가중치 있는 사람은 마지막
+    assert [s.total_assigned for s in t.staff] == [2, 2, 2, 2]
+
+def test_unknown_solver():
+    with pytest.raises(ValueError):
+        assign_types_within_quota(StaffTable(["가나"], [ALL_MASK]).staff, 1, [1], {"1M": 1}, [], "magic")
+
+def test_bare_staff_does_no_file_io(monkeypatch):
+    import roadauto.quals as quals
+
+    def boom(*a, **kw):
+        raise AssertionError("자격 파일을 읽으면 안 됨")
+    monkeypatch.setattr(quals, "load_quals", boom)
+    assert Staff("가나").elig == ALL_MASK
+    assert Staff("가나", AUTO_MASK).elig == AUTO_MASK
+    assert StaffTable(["가나", "다라"]).elig == [ALL_MASK, ALL_MASK]